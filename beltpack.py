@@ -3,95 +3,244 @@ LanComm Pro Beltpack Firmware
 Hardware-optimized intercom belt pack for SBCs with RGB LED buttons
 """
 
+import time
+STARTUP_T0 = time.perf_counter()  # Reference point for the boot timeline
+
+import os
 import sys
+import tempfile
 import asyncio
 import pyaudio
 import numpy as np
 import json
-import time
-import queue
+import math
+import importlib.util
 import logging
-from collections import defaultdict
-from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
-    QPushButton, QComboBox, QListWidget, QListWidgetItem, QProgressBar
-)
-from PyQt6.QtCore import QTimer, Qt
-from PyQt6.QtGui import QFont
+from collections import defaultdict, deque
+from functools import partial
 import socket
+import struct
 import threading
 
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')  # Before the first import warning
+
+# Qt touchscreen UI - skipped entirely on headless packs (saves its memory and CPU)
+HEADLESS = '--headless' in sys.argv or '--boot-benchmark' in sys.argv
+if not HEADLESS:
+    try:
+        from PyQt6.QtWidgets import (
+            QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
+            QListWidget, QListWidgetItem, QProgressBar
+        )
+        from PyQt6.QtCore import Qt, pyqtSignal
+    except ImportError:
+        logging.warning("PyQt6 not available - running headless")
+        HEADLESS = True
+if HEADLESS:
+    QMainWindow = object  # BeltpackApp is defined but never built
+    pyqtSignal = lambda *types: None
+
 # Hardware imports for SBC deployment
 HARDWARE_AVAILABLE = False
 try:
     import smbus2  # type: ignore
     import gpiod  # type: ignore
-    from gpiod import LINE_REQ_DIR_IN, LINE_REQ_EV_RISING_EDGE, LINE_REQ_EV_FALLING_EDGE  # type: ignore
+    from gpiod import LINE_REQ_DIR_IN, LINE_REQ_EV_RISING_EDGE, LINE_REQ_EV_FALLING_EDGE, LINE_REQ_EV_BOTH_EDGES  # type: ignore
     HARDWARE_AVAILABLE = True
 except ImportError:
     logging.warning("Hardware libraries not available - running in simulation mode")
 
-# mDNS discovery
-try:
-    from zeroconf import ServiceBrowser, Zeroconf, ServiceListener
-    MDNS_AVAILABLE = True
-except ImportError:
+# mDNS discovery - zeroconf itself is imported when the browser starts (off the boot path)
+MDNS_AVAILABLE = importlib.util.find_spec('zeroconf') is not None
+if not MDNS_AVAILABLE:
     logging.warning("zeroconf not available - using hardcoded server IP")
-    MDNS_AVAILABLE = False
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+# ===== BOOT TIMELINE =====
+# Seconds since launch for each startup phase. "Launch" is when the process was
+# created - for the PyInstaller onefile build, when the bootloader that unpacks
+# us started - so interpreter start-up and extraction are included.
+
+
+def launch_offset():
+    """Seconds between process launch and STARTUP_T0 (0 where /proc is unavailable)"""
+    try:
+        # Onefile: the parent is the bootloader that extracted the bundle before starting us
+        pid = os.getppid() if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS') else os.getpid()
+        with open(f'/proc/{pid}/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK') - (time.perf_counter() - STARTUP_T0))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+LAUNCH_OFFSET = launch_offset()
+startup_marks = {'python_started': LAUNCH_OFFSET}
+startup_done = threading.Event()  # Set at audio_ready (profile loaded and the sound card playing it)
+
+
+def mark_startup(phase, t=None):
+    """Record (once) how long after launch a startup phase was reached (t: a perf_counter() value)"""
+    if phase not in startup_marks:
+        startup_marks[phase] = LAUNCH_OFFSET + (t if t is not None else time.perf_counter()) - STARTUP_T0
+        logging.info(f"⏱ Startup: {phase} at {startup_marks[phase] * 1000:.1f} ms")
+        if phase == 'audio_ready':
+            startup_done.set()
+
+
+mark_startup('imports_done')
 
 # ===== mDNS DISCOVERY =====
+# One browser runs for the life of the pack. Every _lancomm._tcp.local. server it
+# sees (including address changes) is kept in memory and in SERVER_CACHE_FILE, so
+# boot and reconnect resolve from the cache instead of waiting on mDNS.
 
-class ServerListener(ServiceListener):
-    """mDNS service listener for server discovery"""
-    def __init__(self):
-        self.server_found = False
-        self.server_ip = None
-        self.server_port = None
+SERVICE_TYPE = "_lancomm._tcp.local."
+
+
+class ServerDirectory:
+    """Long-lived mDNS browser with an on-disk cache of known servers
     
-    def add_service(self, zc, type_, name):
+    Zeroconf calls add/update/remove_service from its own thread; lookups and
+    waits are safe from any thread or event loop.
+    """
+    
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.servers = {}  # {service name: {'host', 'port', 'seen', 'live'}}
+        self.lock = threading.Lock()
+        self.waiters = []  # [(loop, asyncio.Event)] woken when a live server appears
+        self.zeroconf = None
+        self.browser = None
+        self.start_lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        try:
+            with open(self.cache_file) as f:
+                cached = json.load(f)
+            for name, entry in cached.items():
+                self.servers[name] = {'host': entry['host'], 'port': int(entry['port']),
+                                      'seen': float(entry.get('seen', 0)), 'live': False}
+            if self.servers:
+                logging.info(f"Loaded {len(self.servers)} cached server(s) from {self.cache_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable server cache {self.cache_file}: {e}")
+    
+    def save(self):
+        """Atomically rewrite the cache (temp file + rename)"""
+        with self.lock:
+            data = {name: {'host': e['host'], 'port': e['port'], 'seen': e['seen']}
+                    for name, e in self.servers.items()}
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix='.server_cache.', suffix='.tmp',
+                                            dir=os.path.dirname(os.path.abspath(self.cache_file)))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_file)
+            tmp_path = None
+        except Exception as e:
+            logging.debug(f"Server cache save failed: {e}")
+        finally:
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+    
+    def start(self):
+        """Start browsing (idempotent, blocking); no-op without zeroconf - run it off the event loop"""
+        with self.start_lock:
+            if self.zeroconf is not None or not MDNS_AVAILABLE:
+                return
+            try:
+                from zeroconf import ServiceBrowser, Zeroconf
+                self.zeroconf = Zeroconf()
+                self.browser = ServiceBrowser(self.zeroconf, SERVICE_TYPE, self)
+                mark_startup('mdns_browsing')
+            except Exception as e:
+                logging.error(f"mDNS browser failed to start: {e}")
+                self.zeroconf = None
+    
+    def close(self):
+        if self.zeroconf is not None:
+            try:
+                self.zeroconf.close()
+            except Exception:
+                pass
+            self.zeroconf = None
+    
+    def lookup(self, live_only=False):
+        """(host, port) of the most recently seen server - live ones before cached ones"""
+        with self.lock:
+            entries = [e for e in self.servers.values() if e['live'] or not live_only]
+        if not entries:
+            return None
+        best = max(entries, key=lambda e: (e['live'], e['seen']))
+        return best['host'], best['port']
+    
+    async def wait_for_live(self, timeout):
+        """Wait up to timeout for the browser to see a server; returns (host, port) or None"""
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self.lock:
+            self.waiters.append(waiter)
+        try:
+            if self.lookup(live_only=True) is None:
+                await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self.lock:
+                self.waiters.remove(waiter)
+        return self.lookup(live_only=True)
+    
+    def resolve(self, zc, type_, name):
         info = zc.get_service_info(type_, name)
-        if info:
-            self.server_ip = socket.inet_ntoa(info.addresses[0])
-            self.server_port = info.port
-            self.server_found = True
-            logging.info(f"🌐 Server discovered: {self.server_ip}:{self.server_port}")
+        if not info or not info.addresses:
+            return
+        host = socket.inet_ntoa(info.addresses[0])
+        with self.lock:
+            previous = self.servers.get(name)
+            moved = previous is None or (previous['host'], previous['port']) != (host, info.port)
+            self.servers[name] = {'host': host, 'port': info.port, 'seen': time.time(), 'live': True}
+            waiters = list(self.waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+        if moved:
+            logging.info(f"🌐 Server discovered: {host}:{info.port}")
+        self.save()
     
-    def remove_service(self, zc, type_, name):
-        logging.warning(f"Server service removed: {name}")
+    def add_service(self, zc, type_, name):
+        self.resolve(zc, type_, name)
     
     def update_service(self, zc, type_, name):
-        pass
+        self.resolve(zc, type_, name)
+    
+    def remove_service(self, zc, type_, name):
+        # Keep the cached address - it is still the best guess if the server comes back
+        with self.lock:
+            if name in self.servers:
+                self.servers[name]['live'] = False
+        logging.warning(f"Server service removed: {name}")
 
 
 async def discover_server_async(timeout=10.0):
-    """Discover server via mDNS with timeout"""
+    """Resolve the server from the background browser, waiting up to timeout for one to appear"""
     if not MDNS_AVAILABLE:
         logging.info(f"mDNS not available, using hardcoded: {SERVER_HOST}:{TCP_PORT}")
         return SERVER_HOST, TCP_PORT
     
-    try:
-        zeroconf = Zeroconf()
-        listener = ServerListener()
-        browser = ServiceBrowser(zeroconf, "_lancomm._tcp.local.", listener)
-        
-        # Wait for discovery
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if listener.server_found:
-                zeroconf.close()
-                return listener.server_ip, listener.server_port
-            await asyncio.sleep(0.1)
-        
-        # Timeout - use fallback
-        zeroconf.close()
-        logging.warning(f"mDNS discovery timeout, using fallback: {SERVER_HOST}:{TCP_PORT}")
-        return SERVER_HOST, TCP_PORT
-        
-    except Exception as e:
-        logging.error(f"mDNS discovery error: {e}, using fallback")
-        return SERVER_HOST, TCP_PORT
+    await asyncio.get_running_loop().run_in_executor(None, server_directory.start)
+    server = await server_directory.wait_for_live(timeout)
+    if server:
+        return server
+    logging.warning(f"mDNS discovery timeout, using fallback: {SERVER_HOST}:{TCP_PORT}")
+    return SERVER_HOST, TCP_PORT
 
 
 # ===== CONFIGURATION =====
@@ -101,14 +250,122 @@ UDP_PORT = 6001  # HelixNet standard port
 RATE = 48000
 CHUNK = 960
 MAX_NODE_CHANNELS = 10  # Increased to support all 10 channels
-JITTER_BUFFER_SIZE = 6  # Increased to 128ms for HelixNet parity
+JITTER_BUFFER_SIZE = 6  # Increased to 128ms for HelixNet parity - upper bound for the adaptive playout depth
+PLAYOUT_MAX_CONCEAL = 3  # Consecutive missing frames filled by fading the last one before playout stops
+UPLINK_HEADER = struct.Struct('!III')  # [UPLINK_MULTI_FLAG | channel bitmask][user_id][seq]
+UPLINK_MULTI_FLAG = 0x80000000  # Server fans one talk packet in to every channel in the bitmask
+DOWNLINK_HEADER = struct.Struct('!III')  # [channel][timestamp: server clock in samples][seq: per-channel frame counter]
 SIDETONE_LEVEL = 0.18  # Local sidetone gain (0.0-1.0)
+SIDETONE_HPF_HZ = 150  # Sidetone high-pass corner (Hz) - drops handling noise and breath thumps; None = off
+UPLINK_DTX = True  # Talk latched but mic quiet (VAD closed): send no PCM, only keepalives
+DTX_KEEPALIVE_INTERVAL = 1.0  # Seconds between header-only uplink packets during DTX
+VAD_MARGIN_DB = 9.0  # Speech: loudest sub-block this far above the tracked noise floor...
+VAD_MIN_DB = -55.0  # ...and above this absolute level (dBFS)
+VAD_HANGOVER_MS = 400  # Keep sending through pauses shorter than this
+VAD_FLOOR_RISE_DB = 6.0  # Noise floor climbs at most this fast (dB/s), so steady noise is learned
 AUTH_KEY = "lancomm-secure-2025"  # Must match server
+SERVER_CACHE_FILE = 'server_cache.json'  # Last known mDNS servers, for instant connects
 
 # Headset Configuration
 HEADSET_MODE = 'electret'  # 'electret' or 'dynamic' - set per deployment
 MIC_BIAS_ENABLED = True  # Enable bias for electret mics (disable for dynamic Clear-Com)
 
+server_directory = ServerDirectory(SERVER_CACHE_FILE)
+
+# ===== CONTROL PROTOCOL =====
+# TCP control messages are framed as [type:1][length:4][payload] (big-endian), so
+# several commands can share one segment and payloads have no size ceiling.
+# The payload is the UTF-8 argument text, e.g. TOGGLE_TALK -> "2:1".
+
+CONTROL_HEADER = struct.Struct('!BI')
+CONTROL_READ_SIZE = 65536
+MAX_CONTROL_FRAME = 1024 * 1024  # Larger than any real message - means the stream is desynced
+CONTROL_MESSAGES = (
+    'AUTH_CHALLENGE', 'AUTH_RESPONSE', 'AUTH_FAIL', 'USER_ID',
+    'GET_USERS', 'USERS', 'SELECT_USER', 'CONFIG', 'ERROR',
+    'TOGGLE_TALK', 'ASSIGN_USER', 'PING', 'PONG',
+    'SET_UDP', 'UDP_OK', 'UDP_FAIL', 'UPDATE_CONFIG', 'FLASH_PACK',
+    'CONFIG_RESYNC', 'TALLY_SUBSCRIBE', 'TALLY', 'AUTH_RESUME',
+)  # Wire type = position + 1 (append only - must match server.py/beltpack.py)
+CONTROL_TYPES = {name: code for code, name in enumerate(CONTROL_MESSAGES, 1)}
+
+
+def encode_frame(name, payload=b''):
+    """Build one control frame (payload may be str or bytes)"""
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return CONTROL_HEADER.pack(CONTROL_TYPES[name], len(payload)) + payload
+
+
+class FrameDecoder:
+    """Incremental parser for control frames
+    
+    feed() appends received bytes; next_frame() returns (name, payload) for the
+    next complete frame, or None. The payload is a memoryview into the receive
+    buffer (no per-frame copy) - consumed bytes are never overwritten, so views
+    stay valid after later feeds.
+    """
+    
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offset = 0  # Start of the first unconsumed frame
+    
+    def feed(self, data):
+        if self.offset:
+            # Carry over only the partial tail; outstanding views keep the old buffer alive
+            self.buffer = self.buffer[self.offset:]
+            self.offset = 0
+        self.buffer += data
+    
+    def next_frame(self):
+        buffer = self.buffer
+        if len(buffer) - self.offset < CONTROL_HEADER.size:
+            return None
+        code, length = CONTROL_HEADER.unpack_from(buffer, self.offset)
+        if length > MAX_CONTROL_FRAME:
+            raise ValueError(f"Control frame too large ({length} bytes)")
+        start = self.offset + CONTROL_HEADER.size
+        end = start + length
+        if end > len(buffer):
+            return None
+        self.offset = end
+        name = CONTROL_MESSAGES[code - 1] if 0 < code <= len(CONTROL_MESSAGES) else None
+        return name, memoryview(buffer)[start:end]
+
+
+# Tally payload per channel: [ch:1][count:1] then count x [user_id:4][level:1]
+TALLY_CHANNEL = struct.Struct('!BB')
+TALLY_TALKER = struct.Struct('!iB')  # Signed: 4-wire interfaces talk as negative user_ids
+
+
+def decode_tally(payload):
+    """{ch: {user_id: level}} from a TALLY payload (channels listed have no other talkers)"""
+    tally = {}
+    offset = 0
+    while offset < len(payload):
+        ch, count = TALLY_CHANNEL.unpack_from(payload, offset)
+        offset += TALLY_CHANNEL.size
+        talkers = {}
+        for _ in range(count):
+            uid, level = TALLY_TALKER.unpack_from(payload, offset)
+            offset += TALLY_TALKER.size
+            talkers[uid] = level
+        tally[ch] = talkers
+    return tally
+
+
+async def read_frame(reader, decoder):
+    """Next (name, payload) from the stream, or None at EOF; pipelined frames stay buffered"""
+    while True:
+        frame = decoder.next_frame()
+        if frame is not None:
+            return frame
+        data = await reader.read(CONTROL_READ_SIZE)
+        if not data:
+            return None
+        decoder.feed(data)
+
+
 # ===== ORANGE PI 5 PRO HARDWARE CONFIGURATION =====
 # Platform: Orange Pi 5 Pro 16GB (RK3588S) + Waveshare PoE HAT
 # Benefits: 8-core CPU (4xA76 + 4xA55), BUILT-IN Audio I/O (ES8388 codec), native 2.5G Ethernet
@@ -119,6 +376,12 @@ MIC_BIAS_ENABLED = True  # Enable bias for electret mics (disable for dynamic Cl
 # Hardware I2C Addresses (DFRobotics DFR0785 - Gravity I2C RGB LED Button Module)
 # LED States: Yellow = Assigned channel (listening), Red = Active talk
 RGB_BUTTON_ADDRESSES = [0x23, 0x24, 0x25, 0x26]  # 4 RGB LED buttons on I2C bus 3
+BUTTON_INT_GPIO = None  # GPIO wired to the modules' shared INT line (active low); None = adaptive-rate scan
+BUTTON_RESCAN_INTERVAL = 1.0  # Interrupt mode: rescan this often anyway in case an edge was missed
+BUTTON_SCAN_IDLE = 0.05  # Scan mode: seconds between scans while nothing is happening - idle I2C traffic stays low
+BUTTON_SCAN_ACTIVE = 0.005  # Scan mode: while a button is held or was used in the last BUTTON_ACTIVE_HOLD s
+BUTTON_ACTIVE_HOLD = 2.0
+I2C_LED_TICK = 0.02  # LED color changes are batched and written at most once per tick
 
 # Rotary Encoder GPIO Pins (avoiding I2S: 18,19,20,21)
 # Using EC11 rotary encoders with quadrature output
@@ -133,6 +396,8 @@ ROTARY_ENCODER_PINS = [
 MENU_ENCODER_GPIO_CLK = 17  # Menu rotary encoder CLK pin
 MENU_ENCODER_GPIO_DT = 27   # Menu rotary encoder DT pin
 MENU_ENCODER_GPIO_SW = 22   # Menu rotary encoder button pin
+ENCODER_ACCELERATION = [(0.03, 5), (0.08, 2)]  # (seconds since previous detent, step multiplier) - volume only
+MENU_BUTTON_DEBOUNCE = 0.05  # A press must follow this long after the button's previous edge (seconds)
 
 # Microphone Bias Control (for 4-pin XLR headset compatibility)
 MIC_BIAS_GPIO = 23  # GPIO to control bias power relay/switch
@@ -148,13 +413,14 @@ class RGBButton:
         self.addr = address
         self.pressed = False
         self.last_state = 0
-        
+    
     def set_color(self, r, g, b):
-        """Set RGB LED color (0-255 each)"""
+        """Set RGB LED color (0-255 each); False if the write failed (e.g. NAK)"""
         try:
             self.bus.write_i2c_block_data(self.addr, 0x00, [r, g, b])
+            return True
         except:
-            pass
+            return False
     
     def read_button(self):
         """Read button state (True if pressed)"""
@@ -172,69 +438,253 @@ class RGBButton:
 
 
 class RotaryEncoder:
-    """Rotary encoder for volume control (GPIO-based)
+    """Quadrature state for one rotary encoder (decoded by EncoderService)
     
     Hardware: EC11 rotary encoder with quadrature output
     Wiring: CLK and DT pins to GPIO, common to GND
     Internal pull-ups enabled via gpiod
+    
+    Every CLK/DT edge goes through a full state table, so contact bounce
+    (A->B->A) cancels out and invalid jumps count for nothing. One detent is
+    a full cycle back to the rest state (both high).
     """
-    def __init__(self, clk_pin, dt_pin, min_val=0, max_val=100):
+    # (previous state << 2 | new state) -> direction; state = clk << 1 | dt
+    TRANSITIONS = (0, -1, 1, 0,
+                   1, 0, 0, -1,
+                   -1, 0, 0, 1,
+                   0, 1, -1, 0)
+    
+    def __init__(self, clk_pin, dt_pin, accelerate=True):
         self.clk_pin = clk_pin
         self.dt_pin = dt_pin
-        self.value = 50  # Default mid-range
-        self.min_val = min_val
-        self.max_val = max_val
-        self.last_clk = 1
-        
-        if HARDWARE_AVAILABLE:
-            # Orange Pi 5 uses gpiochip1 for main GPIO (verify with: gpioinfo)
-            self.chip = gpiod.Chip('gpiochip1')  # Orange Pi 5 GPIO chip
-            self.clk_line = self.chip.get_line(clk_pin)
-            self.dt_line = self.chip.get_line(dt_pin)
-            self.clk_line.request(consumer='rotary', type=LINE_REQ_DIR_IN)
-            self.dt_line.request(consumer='rotary', type=LINE_REQ_DIR_IN)
-    
-    def read(self):
-        """Read current position"""
-        if not HARDWARE_AVAILABLE:
-            return self.value
-        
-        try:
-            clk = self.clk_line.get_value()
-            dt = self.dt_line.get_value()
-            
-            if clk != self.last_clk and clk == 0:
-                if dt != clk:
-                    self.value = min(self.max_val, self.value + 1)
-                else:
-                    self.value = max(self.min_val, self.value - 1)
-            
-            self.last_clk = clk
-            return self.value
-        except:
-            return self.value
+        self.accelerate = accelerate
+        self.state = 0b11
+        self.accum = 0  # Transitions since the last detent
+        self.last_detent = 0.0
+    
+    def edge(self, pin, level, t):
+        """Apply one edge at time t (seconds) - returns detent steps (accelerated), usually 0"""
+        bit = 0b10 if pin == self.clk_pin else 0b01
+        new_state = (self.state | bit) if level else (self.state & ~bit)
+        self.accum += self.TRANSITIONS[(self.state << 2) | new_state]
+        self.state = new_state
+        
+        if new_state != 0b11 or abs(self.accum) < 2:
+            return 0
+        step = 1 if self.accum > 0 else -1
+        self.accum = 0
+        
+        if self.accelerate:
+            interval = t - self.last_detent
+            for threshold, multiplier in ENCODER_ACCELERATION:
+                if interval < threshold:
+                    step *= multiplier
+                    break
+        self.last_detent = t
+        return step
 
 
 class MenuRotaryEncoder(RotaryEncoder):
     """Menu rotary encoder with push button"""
     def __init__(self, clk_pin, dt_pin, sw_pin):
-        super().__init__(clk_pin, dt_pin, 0, 10)
+        super().__init__(clk_pin, dt_pin, accelerate=False)
         self.sw_pin = sw_pin
-        self.button_pressed = False
-        
-        if HARDWARE_AVAILABLE:
-            self.sw_line = self.chip.get_line(sw_pin)
-            self.sw_line.request(consumer='menu_button', type=LINE_REQ_DIR_IN)
+        self.last_edge = float('-inf')
     
-    def read_button(self):
-        """Read button press"""
-        if not HARDWARE_AVAILABLE:
-            return False
+    def button_edge(self, level, t):
+        """True on a debounced press (active low)
         
+        Debounced on the time since the previous edge of either polarity, so
+        the contact bounce when the button is released is not a new press.
+        """
+        quiet = t - self.last_edge >= MENU_BUTTON_DEBOUNCE
+        self.last_edge = t
+        return not level and quiet
+
+
+class EncoderService:
+    """One thread decoding every encoder from gpiod edge events
+    
+    All CLK/DT lines (and the menu button) are requested as one bulk with
+    both-edge events, so the thread sleeps in the kernel until something
+    turns; if that fails, each encoder is requested on its own and only the
+    ones whose pins are unavailable are lost. The kernel timestamps and
+    queues each edge, so steps are not lost even if the thread is late;
+    events are replayed in timestamp order and the steps from one wakeup are
+    published together:
+    on_volume(i, steps), on_menu(steps), on_menu_button().
+    """
+    def __init__(self, volume_encoders, menu_encoder):
+        self.volume_encoders = volume_encoders
+        self.menu_encoder = menu_encoder
+        self.on_volume = None
+        self.on_menu = None
+        self.on_menu_button = None
+        
+        # (offsets, encoder, slot) per encoder; slot is the volume index or 'menu'
+        groups = [((enc.clk_pin, enc.dt_pin), enc, i) for i, enc in enumerate(volume_encoders)]
+        groups.append(((menu_encoder.clk_pin, menu_encoder.dt_pin, menu_encoder.sw_pin), menu_encoder, 'menu'))
+        
+        self.chip = gpiod.Chip('gpiochip1')  # Orange Pi 5 GPIO chip (verify with: gpioinfo)
         try:
-            return self.sw_line.get_value() == 0  # Active low
-        except:
-            return False
+            self.lines = self.request_lines([o for offsets, _, _ in groups for o in offsets])
+        except Exception as e:
+            # One busy or misconfigured pin fails the whole bulk - retry per encoder so the rest still work
+            logging.warning(f"Encoder bulk request failed ({e}) - requesting each encoder separately")
+            lines = []
+            working = []
+            for group in groups:
+                offsets, _, slot = group
+                try:
+                    lines.extend(self.request_lines(offsets).to_list())
+                    working.append(group)
+                except Exception as e:
+                    name = 'Menu encoder' if slot == 'menu' else f'Volume encoder {slot + 1}'
+                    logging.error(f"{name} unavailable (GPIO {', '.join(map(str, offsets))}): {e}")
+            if not working:
+                raise RuntimeError("no encoder GPIO lines could be requested")
+            groups = working
+            self.lines = gpiod.LineBulk(lines)
+        
+        # GPIO offset -> (encoder, slot) for the CLK/DT lines we hold
+        self.pins = {}
+        for offsets, enc, slot in groups:
+            self.pins[enc.clk_pin] = self.pins[enc.dt_pin] = (enc, slot)
+        
+        # Start from the real pin levels
+        levels = dict(zip([line.offset() for line in self.lines.to_list()], self.lines.get_values()))
+        for enc, _ in self.pins.values():
+            enc.state = (levels[enc.clk_pin] << 1) | levels[enc.dt_pin]
+    
+    def request_lines(self, offsets):
+        lines = self.chip.get_lines(list(offsets))
+        lines.request(consumer='encoders', type=LINE_REQ_EV_BOTH_EDGES)
+        return lines
+    
+    def start(self, on_volume, on_menu, on_menu_button):
+        self.on_volume = on_volume
+        self.on_menu = on_menu
+        self.on_menu_button = on_menu_button
+        threading.Thread(target=self.run, daemon=True).start()
+    
+    def run(self):
+        while True:
+            try:
+                ready = self.lines.event_wait(sec=1)
+                if not ready:
+                    continue
+                
+                events = []
+                for line in ready:
+                    offset = line.offset()
+                    for ev in line.event_read_multiple():
+                        events.append((ev.sec + ev.nsec / 1e9, offset, ev.type == gpiod.LineEvent.RISING_EDGE))
+                events.sort()
+                
+                steps = defaultdict(int)
+                pressed = False
+                for t, offset, level in events:
+                    if offset == self.menu_encoder.sw_pin:
+                        pressed |= self.menu_encoder.button_edge(level, t)
+                    else:
+                        enc, slot = self.pins[offset]
+                        steps[slot] += enc.edge(offset, level, t)
+                
+                for slot, delta in steps.items():
+                    if not delta:
+                        continue
+                    if slot == 'menu':
+                        self.on_menu(delta)
+                    else:
+                        self.on_volume(slot, delta)
+                if pressed:
+                    self.on_menu_button()
+            except Exception as e:
+                logging.error(f"Encoder service error: {e}")
+                time.sleep(0.1)
+
+
+class I2CWorker:
+    """Single owner of the button I2C bus
+    
+    Every transaction runs on this one thread. Button reads (PTT) always go
+    first: they are served before any LED write and checked for between
+    writes, so cosmetic LED traffic never delays talk detection. LED colors
+    are kept as a target plus a shadow of what the modules currently show;
+    only changed buttons are written, batched at most once per I2C_LED_TICK.
+    """
+    def __init__(self, buttons):
+        self.buttons = buttons  # RGBButton or None per slot
+        self.cond = threading.Condition()
+        self.read_request = False
+        self.read_seq = 0
+        self.read_result = [False] * len(buttons)
+        self.led_target = {}  # {button_id: (r, g, b)} wanted
+        self.led_shadow = {i: (0, 0, 0) for i, btn in enumerate(buttons) if btn}  # Shown (worker thread only)
+        self.led_override = None  # (r, g, b) on every button, e.g. while flashing
+        threading.Thread(target=self.run, daemon=True).start()
+    
+    def read_buttons(self):
+        """Read every button - blocks until the worker has done it (ahead of any LED write)"""
+        with self.cond:
+            seq = self.read_seq
+            self.read_request = True
+            self.cond.notify_all()
+            while self.read_seq == seq:
+                self.cond.wait()
+            return self.read_result
+    
+    def set_color(self, button_id, rgb):
+        with self.cond:
+            if self.led_target.get(button_id) != rgb:
+                self.led_target[button_id] = rgb
+                self.cond.notify_all()
+    
+    def set_override(self, rgb):
+        """Show rgb on every button (None = back to the target colors)"""
+        with self.cond:
+            self.led_override = rgb
+            self.cond.notify_all()
+    
+    def pending_leds(self):
+        """[(button_id, rgb)] whose shown color differs from the wanted one"""
+        pending = []
+        for i, btn in enumerate(self.buttons):
+            rgb = self.led_override or self.led_target.get(i)
+            if btn and rgb is not None and self.led_shadow.get(i) != rgb:
+                pending.append((i, rgb))
+        return pending
+    
+    def run(self):
+        next_led = 0.0
+        while True:
+            with self.cond:
+                while not self.read_request:
+                    if self.pending_leds():
+                        delay = next_led - time.monotonic()
+                        if delay <= 0:
+                            break
+                        self.cond.wait(delay)
+                    else:
+                        self.cond.wait()
+                reading = self.read_request
+                self.read_request = False
+                pending = [] if reading else self.pending_leds()
+            
+            if reading:
+                states = [btn.read_button() if btn else False for btn in self.buttons]
+                with self.cond:
+                    self.read_result = states
+                    self.read_seq += 1
+                    self.cond.notify_all()
+                continue
+            
+            for i, rgb in pending:
+                if self.read_request:
+                    break  # PTT read waiting - the rest go out next pass
+                if self.buttons[i].set_color(*rgb):
+                    self.led_shadow[i] = rgb  # A failed write stays pending and is retried next tick
+            next_led = time.monotonic() + I2C_LED_TICK
 
 
 # ===== HARDWARE MANAGER =====
@@ -246,7 +696,10 @@ class HardwareManager:
         self.rgb_buttons = []
         self.volume_encoders = []
         self.menu_encoder = None
+        self.encoder_service = None  # Edge-event decoder for all encoders (hardware only)
         self.flashing = False
+        self.i2c = None  # I2CWorker - owns the button bus once it is open
+        self.button_int_line = None  # gpiod line for the buttons' INT output, if wired
         self.bias_line = None
         self.bias_enabled = MIC_BIAS_ENABLED
         
@@ -266,20 +719,26 @@ class HardwareManager:
                     except Exception as e:
                         logging.error(f"Failed to init RGB button at 0x{addr:02X}: {e}")
                         self.rgb_buttons.append(None)
+                self.i2c = I2CWorker(self.rgb_buttons)
                 
-                # Initialize volume rotary encoders using ROTARY_ENCODER_PINS
-                for clk, dt in ROTARY_ENCODER_PINS:
+                # Button interrupt line: PTT edges wake the button thread instead of I2C polling
+                if BUTTON_INT_GPIO is not None:
                     try:
-                        enc = RotaryEncoder(clk, dt)
-                        self.volume_encoders.append(enc)
-                        logging.info(f"Volume encoder initialized on GPIO {clk}/{dt}")
+                        self.button_int_line = gpiod.Chip('gpiochip1').get_line(BUTTON_INT_GPIO)
+                        self.button_int_line.request(consumer='button_int', type=LINE_REQ_EV_FALLING_EDGE)
+                        logging.info(f"Button interrupt on GPIO {BUTTON_INT_GPIO}")
                     except Exception as e:
-                        logging.error(f"Failed to init encoder: {e}")
-                        self.volume_encoders.append(None)
+                        logging.error(f"Button interrupt unavailable, scanning instead: {e}")
+                        self.button_int_line = None
                 
-                # Initialize menu rotary encoder
+                # Volume encoders (ROTARY_ENCODER_PINS) and menu encoder, decoded from edge events
+                self.volume_encoders = [RotaryEncoder(clk, dt) for clk, dt in ROTARY_ENCODER_PINS]
                 self.menu_encoder = MenuRotaryEncoder(MENU_ENCODER_GPIO_CLK, MENU_ENCODER_GPIO_DT, MENU_ENCODER_GPIO_SW)
-                logging.info("Menu encoder initialized")
+                try:
+                    self.encoder_service = EncoderService(self.volume_encoders, self.menu_encoder)
+                    logging.info(f"Encoders initialized on GPIO {sorted(self.encoder_service.pins)}")
+                except Exception as e:
+                    logging.error(f"Failed to init encoders: {e}")
                 
                 # Initialize microphone bias control
                 try:
@@ -290,7 +749,7 @@ class HardwareManager:
                         logging.info(f"Mic bias control initialized: {'ON' if MIC_BIAS_ENABLED else 'OFF'} ({HEADSET_MODE} mode)")
                 except Exception as e:
                     logging.error(f"Failed to init mic bias control: {e}")
-                
+            
             except Exception as e:
                 logging.error(f"Hardware initialization failed: {e}")
         else:
@@ -301,21 +760,31 @@ class HardwareManager:
             self.menu_encoder = MenuRotaryEncoder(0, 0, 0)
     
     def set_button_color(self, button_id, r, g, b):
-        """Set RGB button color"""
-        if 0 <= button_id < len(self.rgb_buttons) and self.rgb_buttons[button_id]:
-            self.rgb_buttons[button_id].set_color(r, g, b)
-    
-    def read_button(self, button_id):
-        """Read button state"""
-        if 0 <= button_id < len(self.rgb_buttons) and self.rgb_buttons[button_id]:
-            return self.rgb_buttons[button_id].read_button()
-        return False
-    
-    def read_volume(self, encoder_id):
-        """Read volume encoder value"""
-        if 0 <= encoder_id < len(self.volume_encoders) and self.volume_encoders[encoder_id]:
-            return self.volume_encoders[encoder_id].read()
-        return 50.0
+        """Set RGB button color (queued; no I2C traffic if it already shows this color)"""
+        if self.i2c:
+            self.i2c.set_color(button_id, (r, g, b))
+    
+    def read_buttons(self):
+        """Read every button (one I2C read each, ahead of queued LED writes)"""
+        if self.i2c:
+            return self.i2c.read_buttons()
+        return [False] * len(self.rgb_buttons)
+    
+    def wait_button_interrupt(self, timeout):
+        """Block until the INT line fires or timeout passes
+        
+        Returns the kernel timestamp (CLOCK_MONOTONIC seconds, as time.monotonic)
+        of the first queued edge, or None on timeout.
+        """
+        line = self.button_int_line
+        if not line.event_wait(sec=int(timeout), nsec=int((timeout % 1) * 1e9)):
+            return None
+        first = None
+        while line.event_wait(sec=0, nsec=0):
+            ev = line.event_read()  # Drain - one scan covers every queued edge
+            if first is None:
+                first = ev.sec + ev.nsec / 1e9
+        return first
     
     def flash_all_buttons(self):
         """Flash all RGB buttons for identification"""
@@ -327,15 +796,13 @@ class HardwareManager:
     
     def _flash_sequence(self):
         """Flash sequence for visual identification"""
-        for _ in range(3):
-            for btn in self.rgb_buttons:
-                if btn:
-                    btn.set_color(255, 255, 255)
-            time.sleep(0.2)
-            for btn in self.rgb_buttons:
-                if btn:
-                    btn.set_color(0, 0, 0)
-            time.sleep(0.2)
+        if self.i2c:
+            for _ in range(3):
+                self.i2c.set_override((255, 255, 255))
+                time.sleep(0.2)
+                self.i2c.set_override((0, 0, 0))
+                time.sleep(0.2)
+            self.i2c.set_override(None)  # Back to the channel colors
         self.flashing = False
     
     def set_mic_bias(self, enable):
@@ -361,41 +828,343 @@ class HardwareManager:
 # ===== AUDIO MANAGER =====
 
 class VOXGate:
-    """Voice-Operated Transmit gate - HelixNet equivalent"""
-    def __init__(self, threshold_db=-40, hold_time_ms=500):
-        self.threshold = 10 ** (threshold_db / 20)  # Convert dB to linear
-        self.hold_time = hold_time_ms / 1000.0
+    """Voice activity detector gating the uplink (DTX)
+    
+    Each frame is split into BLOCKS sub-blocks whose energies come from one
+    vectorized pass. The noise floor drops straight to the quietest sub-block
+    and climbs back at most VAD_FLOOR_RISE_DB per second, so steady fan or
+    crowd noise is learned while speech (which always has quiet gaps) is not.
+    A frame is speech when its loudest sub-block is VAD_MARGIN_DB over the
+    floor and above VAD_MIN_DB; the gate then stays open for the hangover so
+    word endings and short pauses still go out.
+    """
+    BLOCKS = 8  # 2.5 ms each at CHUNK=960
+    
+    def __init__(self, margin_db=VAD_MARGIN_DB, min_db=VAD_MIN_DB, hangover_ms=VAD_HANGOVER_MS,
+                 floor_rise_db=VAD_FLOOR_RISE_DB):
+        self.margin = 10 ** (margin_db / 10)  # Power ratios - energies are mean squares
+        self.min_power = 10 ** (min_db / 10)
+        self.floor_rise = 10 ** (floor_rise_db / 10 * CHUNK / RATE)  # Per frame
+        self.hangover_frames = max(1, round(hangover_ms / 1000 * RATE / CHUNK))
+        self.floor = self.min_power  # Rises to the real floor within seconds; errs towards sending
+        self.hangover = 0
         self.gate_open = False
-        self.last_open_time = 0
-        self.enabled = False  # Toggle via config
     
-    def process(self, audio_chunk, current_time):
-        """Process audio through VOX gate"""
-        if not self.enabled:
-            return audio_chunk  # VOX disabled, pass through
-        
-        # Calculate RMS level
-        rms = np.sqrt(np.mean(audio_chunk ** 2))
-        
-        # Gate logic
-        if rms > self.threshold:
-            self.gate_open = True
-            self.last_open_time = current_time
-        elif current_time - self.last_open_time > self.hold_time:
-            self.gate_open = False
+    def process(self, frame):
+        """Feed one float frame; returns True while speech (or its hangover) is present"""
+        blocks = frame.reshape(self.BLOCKS, -1)
+        powers = np.einsum('ij,ij->i', blocks, blocks) / blocks.shape[1]
+        loudest = float(powers.max())
+        self.floor = min(self.floor * self.floor_rise, max(float(powers.min()), 1e-10))
+        
+        if loudest > self.floor * self.margin and loudest > self.min_power:
+            self.hangover = self.hangover_frames
+        elif self.hangover:
+            self.hangover -= 1
+        self.gate_open = self.hangover > 0
+        return self.gate_open
+
+
+class AudioRing:
+    """Single-producer/single-consumer ring of int16 samples
+    
+    One thread only writes, one only reads. Each side owns its own index, so
+    no lock is needed (index stores are atomic under the GIL) and the
+    PortAudio callback never blocks. Indices count samples forever; position
+    in the array is index % capacity.
+    """
+    
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity, dtype=np.int16)
+        self.capacity = capacity
+        self.write_index = 0  # Owned by the producer
+        self.read_index = 0  # Owned by the consumer
+        self.overruns = 0  # Writes dropped because the ring was full (producer side)
+        self.underruns = 0  # Reads that found less than a frame (consumer side)
+    
+    @property
+    def fill(self):
+        """Samples currently buffered"""
+        return self.write_index - self.read_index
+    
+    def write(self, samples):
+        """Copy samples in; drops the whole block (and counts an overrun) if it does not fit"""
+        n = len(samples)
+        if self.capacity - (self.write_index - self.read_index) < n:
+            self.overruns += 1
+            return False
+        pos = self.write_index % self.capacity
+        first = min(n, self.capacity - pos)
+        self.data[pos:pos + first] = samples[:first]
+        if first < n:
+            self.data[:n - first] = samples[first:]
+        self.write_index += n
+        return True
+    
+    def read_into(self, out):
+        """Fill out exactly, or leave it untouched and count an underrun"""
+        n = len(out)
+        if self.write_index - self.read_index < n:
+            self.underruns += 1
+            return False
+        pos = self.read_index % self.capacity
+        first = min(n, self.capacity - pos)
+        out[:first] = self.data[pos:pos + first]
+        if first < n:
+            out[first:] = self.data[:n - first]
+        self.read_index += n
+        return True
+    
+    def stats(self):
+        return {'fill': self.fill, 'overruns': self.overruns, 'underruns': self.underruns}
+
+
+class PlayoutBuffer:
+    """Adaptive playout buffer for one downlink channel
+    
+    put() runs on the network loop, pop() once per playback period in the
+    audio callback. Frames are keyed by server seq, so reordering is free and
+    gaps are real loss. Downlink jitter is estimated from arrival time vs the
+    server timestamp (RFC 3550), and playout waits for that many frames of
+    depth before starting. Missing frames are concealed by fading the last
+    one; backlog beyond the target is dropped so latency follows the jitter.
+    Both sides only do single dict operations, which are atomic under the GIL.
+    """
+    
+    FRAME_SECONDS = CHUNK / RATE
+    
+    def __init__(self):
+        self.frames = {}  # {seq: float32 frame}
+        self.next_seq = None  # Next seq to play; None while buffering (consumer owned)
+        self.last_frame = None
+        self.conceal_frame = np.zeros(CHUNK, dtype=np.float32)
+        self.concealing = 0  # Consecutive concealed periods
+        self.jitter = 0.0  # Seconds (producer owned)
+        self.target = 1  # Frames of depth to build before playing
+        self.last_arrival = None
+        self.last_timestamp = None
+        self.received = 0
+        self.late = 0  # Arrived after their slot was played or concealed
+        self.lost = 0  # Missing while later frames were buffered (concealed)
+        self.underruns = 0  # Buffer ran dry while playing (concealed; includes the end of each burst)
+        self.discarded = 0  # Dropped as stale backlog
+    
+    def put(self, seq, timestamp, frame, arrival):
+        next_seq = self.next_seq
+        if next_seq is not None and ((seq - next_seq) & 0xFFFFFFFF) >= 0x80000000:
+            self.late += 1
+            return
+        self.frames[seq] = frame
+        self.received += 1
+        
+        if self.last_arrival is not None:
+            sent_delta = (((timestamp - self.last_timestamp) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+            transit_delta = (arrival - self.last_arrival) - sent_delta / RATE
+            self.jitter += (abs(transit_delta) - self.jitter) / 16
+            self.target = min(JITTER_BUFFER_SIZE, max(1, math.ceil(3 * self.jitter / self.FRAME_SECONDS)))
+        self.last_arrival = arrival
+        self.last_timestamp = timestamp
+    
+    def pop(self):
+        """Next frame to play, a concealment frame, or None (silence)"""
+        frames = self.frames
+        if self.next_seq is None:
+            if len(frames) < self.target:
+                return None
+            self.next_seq = min(frames)
+            self.concealing = 0
+        
+        frame = frames.pop(self.next_seq, None)
+        if frame is None:
+            if self.concealing >= PLAYOUT_MAX_CONCEAL or self.last_frame is None:
+                # Stream ended (or long outage): rebuffer before playing again
+                self.next_seq = None
+                self.last_frame = None
+                return None
+            self.concealing += 1
+            if frames:
+                # Later frames are here, this one is lost: skip its slot
+                self.lost += 1
+                self.next_seq = (self.next_seq + 1) & 0xFFFFFFFF
+            else:
+                # Ran dry: keep waiting for this seq, which adds a frame of playout delay
+                self.underruns += 1
+            np.multiply(self.last_frame, 0.5 ** self.concealing, out=self.conceal_frame)
+            return self.conceal_frame
+        
+        self.next_seq = (self.next_seq + 1) & 0xFFFFFFFF
+        self.last_frame = frame
+        self.concealing = 0
+        
+        # Drop stale backlog (bursts, clock drift) down to the jitter target
+        if len(frames) > self.target + 2:
+            next_seq = self.next_seq
+            ordered = sorted(frames, key=lambda s: ((s - next_seq + 0x80000000) & 0xFFFFFFFF) - 0x80000000)
+            keep = len(ordered) - self.target
+            for seq in ordered[:keep]:
+                frames.pop(seq, None)
+                self.discarded += 1
+            self.next_seq = ordered[keep]
+        return frame
+    
+    def stats(self):
+        return {
+            'depth': len(self.frames), 'target': self.target, 'jitter_ms': round(self.jitter * 1000, 1),
+            'received': self.received, 'lost': self.lost, 'late': self.late,
+            'discarded': self.discarded, 'underruns': self.underruns,
+        }
+
+
+class LatencyTracker:
+    """Rolling window of latency samples (seconds) with a percentile summary"""
+    
+    def __init__(self, size=500):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+    
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+    
+    def summary(self):
+        if not self.samples:
+            return {'count': self.count}
+        ms = np.array(self.samples) * 1000
+        return {'count': self.count, 'p50_ms': round(float(np.percentile(ms, 50)), 2),
+                'p99_ms': round(float(np.percentile(ms, 99)), 2), 'max_ms': round(float(ms.max()), 2)}
+    
+    def histogram(self, bounds_ms=(5, 10, 20, 50)):
+        """Sample counts per bucket: <= each bound, then above the last"""
+        ms = np.array(self.samples) * 1000
+        return np.bincount(np.searchsorted(bounds_ms, ms), minlength=len(bounds_ms) + 1).tolist()
+
+
+class ChannelMixer:
+    """One playback period of channel audio, driven by a precompiled mix plan
+    
+    set_plan() (any thread) compiles channel_names/volumes into slot -> channel
+    rows and a gain vector; it only runs when those change. mix() (audio
+    callback) pops at most one frame per planned channel into a stacked 2-D
+    buffer and reduces it with a single gains @ stack product. Sidetone is
+    not mixed here - AudioManager adds it in the callback from the same period's
+    capture.
+    """
+    
+    def __init__(self, buffers):
+        self.buffers = buffers  # {ch: PlayoutBuffer}
+        self.stack = np.zeros((MAX_NODE_CHANNELS, CHUNK), dtype=np.float32)
+        self.frame_gains = np.zeros(MAX_NODE_CHANNELS, dtype=np.float32)  # Plan gains, zeroed for rows without a frame
+        self.plan = ((), np.zeros(0, dtype=np.float32))  # (((row, ch, buffer), ...), gains)
+    
+    def set_plan(self, channel_names, volumes):
+        """Slot i (button/encoder/volume i) is the i-th channel in sorted order"""
+        channels = sorted(channel_names)[:MAX_NODE_CHANNELS]
+        slots = tuple((row, ch, self.buffers[ch]) for row, ch in enumerate(channels))
+        gains = np.array([volumes[row] / 100.0 for row in range(len(channels))], dtype=np.float32)
+        self.plan = (slots, gains)  # One reference swap - the callback sees the old plan or the new one
+    
+    def mix(self, out):
+        """Mix into out (float32[CHUNK], clipped); False if there was nothing to play"""
+        slots, gains = self.plan
+        stack = self.stack
+        frame_gains = self.frame_gains
+        frame_gains.fill(0)
+        playing = False
+        for row, ch, buf in slots:
+            frame = buf.pop()
+            if frame is None:
+                continue
+            stack[row] = frame
+            frame_gains[row] = gains[row]
+            playing = True
+        if not playing:
+            return False
         
-        # Return audio if gate open, else silence
-        return audio_chunk if self.gate_open else np.zeros_like(audio_chunk)
+        np.matmul(frame_gains, stack, out=out)
+        np.clip(out, -1, 1, out=out)  # In-place clip
+        return True
+
+
+class Sidetone:
+    """Mic-to-earpiece monitor: gain and an optional first-order high-pass
+    
+    Runs inside the audio callback on the period that was just captured, so the
+    talker hears themself one device period late instead of after the network
+    round trip. The high-pass y[n] = a*(y[n-1] + x[n] - x[n-1]) is evaluated
+    for the whole period at once in closed form,
+    y[n] = a^(n+1) * (y[-1] + sum_k<=n a^-k * d[k]), which stays well inside
+    float64 range for one period at any sensible corner frequency.
+    """
+    
+    def __init__(self, gain=SIDETONE_LEVEL, hpf_hz=SIDETONE_HPF_HZ):
+        self.gain = gain
+        self.hpf_hz = hpf_hz
+        self.frame = np.zeros(CHUNK, dtype=np.float32)
+        self.alpha_pow = None  # a^(n+1), n = 0..CHUNK-1; None = no high-pass
+        self.alpha_inv_pow = None  # a^-n
+        if hpf_hz:
+            rc = 1.0 / (2 * np.pi * hpf_hz)
+            alpha = rc / (rc + 1.0 / RATE)
+            n = np.arange(CHUNK, dtype=np.float64)
+            self.alpha_pow = alpha ** (n + 1)
+            self.alpha_inv_pow = alpha ** -n
+        self.reset()
+    
+    def reset(self):
+        """Forget filter history - call when sidetone restarts after a gap"""
+        self.x_prev = None
+        self.y_prev = 0.0
+    
+    def process(self, pcm):
+        """int16 capture period -> float32 sidetone (view of an internal buffer)"""
+        n = len(pcm)
+        out = self.frame[:n]
+        if self.alpha_pow is None:
+            np.multiply(pcm, np.float32(self.gain / 32767.0), out=out)
+            return out
+        x = pcm * (self.gain / 32767.0)  # float64
+        d = np.diff(x, prepend=x[0] if self.x_prev is None else self.x_prev)
+        y = self.alpha_pow[:n] * (self.y_prev + np.cumsum(self.alpha_inv_pow[:n] * d))
+        self.x_prev = x[-1]
+        self.y_prev = y[-1]
+        out[:] = y
+        return out
 
 
-p = pyaudio.PyAudio()
 class AudioManager:
+    """Duplex sound card stream, clocked by the card
+    
+    Capture is copied into a lock-free ring (converted to float on the network
+    side in get_input) only while capture_waker is set, and each frame then
+    calls it - the uplink sleeps until woken, so an idle pack does no capture
+    work at all. Playback is pulled: each period the callback asks
+    `mixer` for exactly one frame, so mixing can never drift from the device
+    clock the way a sleep-driven mixer thread does. While sidetone_on is set the
+    callback also adds the period it just captured (through Sidetone) to the
+    period it is about to play.
+    """
+    
+    RING_FRAMES = 10  # Capture capacity, in CHUNK frames
+    
     def __init__(self):
-        self.input_buffer = queue.Queue(maxsize=10)
-        self.output_buffer = queue.Queue(maxsize=10)
+        self.capture_ring = AudioRing(CHUNK * self.RING_FRAMES)
+        self.mixer = None  # mixer(out float32[CHUNK]) -> True if it wrote audio; called from the callback
+        self.mix_buffer = np.zeros(CHUNK, dtype=np.float32)  # Callback scratch (callback thread only)
+        self.out_frame = np.zeros(CHUNK, dtype=np.int16)
+        self.in_frame = np.zeros(CHUNK, dtype=np.int16)  # get_input scratch (consumer only)
+        self.capture_waker = None  # Called from the callback after each captured frame; None = capture off
+        self.capture_time = 0.0  # perf_counter() when the newest frame was captured
+        self.sidetone = Sidetone()  # Callback thread only
+        self.sidetone_on = False  # Set from any thread (while talking)
+        self.sidetone_live = False  # Callback's view of sidetone_on last period
+        self.periods = 0  # Playback periods served
+        self.silent_periods = 0  # Periods with nothing to play
+        self.mix_errors = 0
+        self.pa = None
         self.stream = None
         try:
-            self.stream = p.open(format=pyaudio.paInt16, channels=1, rate=RATE, input=True, output=True, 
+            self.pa = pyaudio.PyAudio()  # Enumerates every ALSA device - the slow part of audio init
+            self.stream = self.pa.open(format=pyaudio.paInt16, channels=1, rate=RATE, input=True, output=True, 
                                 frames_per_buffer=CHUNK, stream_callback=self.callback)
             logging.info("Audio device initialized")
         except Exception as e:
@@ -404,136 +1173,181 @@ class AudioManager:
     def callback(self, in_data, frame_count, time_info, status):
         if status:
             logging.debug(f"Audio status: {status}")
+        pcm = np.frombuffer(in_data, dtype=np.int16)
+        waker = self.capture_waker
+        if waker is not None:
+            self.capture_time = time.perf_counter()
+            self.capture_ring.write(pcm)
+            waker()
+        
+        self.periods += 1
+        out_frame = self.out_frame[:frame_count]
+        mixer = self.mixer
         try:
-            np_int16 = np.frombuffer(in_data, dtype=np.int16)
-            self.input_buffer.put_nowait(np_int16.astype(np.float32) / 32767.0)
-        except queue.Full:
-            pass
+            played = mixer is not None and mixer(self.mix_buffer)
+        except Exception as e:
+            # Never let an exception escape - PortAudio would stop the stream
+            self.mix_errors += 1
+            logging.debug(f"Mix error: {e}")
+            played = False
+        
+        sidetone_on = self.sidetone_on
+        if sidetone_on and len(pcm) == frame_count:
+            if not self.sidetone_live:
+                self.sidetone.reset()
+            mix = self.mix_buffer[:frame_count]
+            sidetone = self.sidetone.process(pcm)
+            if played:
+                mix += sidetone
+                np.clip(mix, -1, 1, out=mix)
+            else:
+                mix[:] = sidetone
+                played = True
+        self.sidetone_live = sidetone_on
         
-        try:
-            out_data = self.output_buffer.get_nowait()
-        except queue.Empty:
-            out_data = np.zeros(CHUNK, dtype=np.int16).tobytes()
-        return (out_data, pyaudio.paContinue)
+        if played:
+            np.multiply(self.mix_buffer[:frame_count], 32767, out=out_frame, casting='unsafe')
+        else:
+            self.silent_periods += 1
+            out_frame.fill(0)
+        return (out_frame.tobytes(), pyaudio.paContinue)
     
     def get_input(self):
-        try:
-            return self.input_buffer.get_nowait()
-        except queue.Empty:
-            return None
+        """Next captured frame as float32 (-1..1), or None if a full frame is not ready"""
+        if self.capture_ring.fill < CHUNK:
+            return None  # Polled - an empty ring here is normal, not an underrun
+        self.capture_ring.read_into(self.in_frame)
+        return self.in_frame * np.float32(1 / 32767.0)
     
-    def queue_output(self, data):
-        np_int16 = (data * 32767).clip(-32768, 32767).astype(np.int16)
-        try:
-            self.output_buffer.put_nowait(np_int16.tobytes())
-        except queue.Full:
-            pass
+    def stats(self):
+        """Capture ring fill level (samples) and xrun counters, playback period counters"""
+        return {
+            'capture': self.capture_ring.stats(),
+            'playback': {'periods': self.periods, 'silent': self.silent_periods, 'errors': self.mix_errors},
+        }
     
     def close(self):
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
+        if self.pa:
+            self.pa.terminate()
 
 
-# ===== MAIN APPLICATION =====
+# ===== BELTPACK CORE =====
 
-class BeltpackApp(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("LanComm Pro Beltpack")
-        self.setGeometry(0, 0, 480, 320)
+class BeltpackCore:
+    """Beltpack runtime without any UI: network, audio, hardware and the menu state machine
+    
+    Runs on its own threads (asyncio network loop, audio callback, button and
+    encoder threads) and needs neither Qt nor a display. A view renders it:
+    the core calls view.post(event, data) from whichever thread made the
+    change, and the view reads what it needs back from the core.
+    
+    Events: 'state' (gui_state changed), 'users' (user_list arrived),
+    'highlight' (menu_index/settings_index moved), 'volume' (data = slot),
+    'setting' (data = SETTINGS_ITEMS entry changed), 'error' (data = message).
+    """
+    SETTINGS_ITEMS = ['bias', 'screen_brightness', 'button_brightness', 'ptt_latency']
+    
+    def __init__(self, view=None, user_name=None):
+        self.view = view or HeadlessView()
+        self.view.core = self
         
-        # GUI State Machine
+        # Menu State Machine (rendered by the view)
         self.gui_state = 'boot'  # 'boot' -> 'user_select' -> 'main' -> 'settings'
         self.menu_index = 0
         self.settings_index = 0
         self.user_list = []
-        self.user_list_widget = None
         self.screen_brightness = 100
         self.button_brightness = 100
         
-        # Apply dark theme
-        self.setStyleSheet("""
-            QMainWindow, QWidget { background-color: #19191c; color: #e6e6eb; }
-            QLabel { color: #e6e6eb; font-size: 14pt; }
-            QPushButton {
-                background-color: #2d2d32; border: 1px solid #4a4a50; border-radius: 4px;
-                padding: 12px; color: #e6e6eb; font-size: 12pt; font-weight: bold;
-            }
-            QPushButton:pressed { background-color: #5096ff; }
-            QListWidget {
-                background-color: #232326; border: 1px solid #3a3a3f; color: #e6e6eb;
-                font-size: 14pt; padding: 8px;
-            }
-            QListWidget::item { padding: 12px; border-radius: 4px; }
-            QListWidget::item:selected { background-color: #5096ff; color: #ffffff; }
-        """)
-        
-        self.central = QWidget()
-        self.setCentralWidget(self.central)
-        self.main_layout = QVBoxLayout()
-        self.central.setLayout(self.main_layout)
-        
-        # Initialize hardware
-        self.hardware = HardwareManager()
-        self.audio = AudioManager()
-        
         # Network state
         self.tcp_reader = None
         self.tcp_writer = None
+        self.tcp_decoder = None
         self.udp_sock = None
+        self.udp_dest = None  # (server IP, UDP_PORT) for talk packets, resolved once per connection
         self.user_id = None
-        self.user_name = None
+        self.user_name = user_name  # Preset: selected on first connect (headless packs)
         self.channel_names = {}
         self.active_talk = set()
+        self.capture_event = None  # Set (via the audio callback) when a captured frame is ready
+        self.send_latency = LatencyTracker()  # Capture -> uplink sendto, seconds
+        self.ptt_latency = LatencyTracker()  # Button press (INT edge / scan midpoint) -> TOGGLE_TALK written, seconds
+        self.pending_toggles = []  # [(ch, enable, edge perf_counter or None)] - event loop only
+        self.button_channels = []  # Slot i -> channel (sorted), refreshed with the mix plan
         self.button_modes = {}  # {slot: 'latch' or 'non-latch'}
+        self.config_version = 0  # Version of the last config applied (server deltas build on it)
+        self.tally = {}  # {ch: {user_id: level 0-7}} - who else is talking, from server TALLY
+        self.tally_channels = set()  # Channels we are subscribed to for tally
         self.button_states = [False] * 10  # Track latch button states (increased to 10)
         self.volumes = [50.0] * MAX_NODE_CHANNELS
-        self.channel_buffers = defaultdict(lambda: queue.Queue(maxsize=10))
-        self.last_mic_chunk = np.zeros(CHUNK, dtype=np.float32)
+        self.channel_buffers = defaultdict(PlayoutBuffer)  # Filled by receive_udp_async, drained by mix_frame
+        self.channel_mixer = ChannelMixer(self.channel_buffers)
         self.last_downlink_time = 0.0
         self.reconnecting = False
+        self.server_addr = None  # (host, port) of the last server we reached - tried before discovery
+        self.session_token = None  # Lets a reconnect resume user_id, profile and talk state
+        self.disconnected_at = None
         self.loop = None
-        self.command_queue = queue.Queue()
         self.last_heartbeat = time.time()
         self.tcp_rx_queue = None
         self.tcp_reader_task = None
         
-        # VOX gates for each channel
-        self.vox_gates = [VOXGate(threshold_db=-40, hold_time_ms=500) for _ in range(MAX_NODE_CHANNELS)]
-        self.vox_enabled = False  # Master VOX enable/disable
+        # Uplink DTX: one VAD for the mic (the same audio goes to every talk channel)
+        self.vox_gate = VOXGate()
+        self.dtx_enabled = UPLINK_DTX
         
-        # Start async network thread
+        # Network first: discovery and the TCP handshake overlap hardware and audio
+        # init; the session waits on devices_ready before it can touch them
+        self.hardware = None
+        self.audio = None
+        self.devices_ready = threading.Event()
+        self.boot_pending = True  # Until the first playback period with a profile loaded
         self.async_thread = threading.Thread(target=self.run_async, daemon=True)
         self.async_thread.start()
         
-        # Show boot screen first
-        self.show_boot_screen()
+        # Initialize hardware and audio in parallel (I2C/GPIO setup vs. PyAudio device scan)
+        audio_thread = threading.Thread(target=self.init_audio, daemon=True)
+        audio_thread.start()
+        self.hardware = HardwareManager()
+        mark_startup('hardware_ready')
+        audio_thread.join()
+        self.devices_ready.set()
         
         # Start hardware polling
-        threading.Thread(target=self.hardware_poll, daemon=True).start()
-        threading.Thread(target=self.menu_encoder_poll, daemon=True).start()
+        threading.Thread(target=self.button_watch, daemon=True).start()
+        if self.hardware.encoder_service:
+            self.hardware.encoder_service.start(self.on_volume_step, self.on_menu_step, self.on_menu_button_press)
         
         # Initialize button LEDs
         self.update_button_leds()
         
-        # Command processor timer
-        self.cmd_timer = QTimer()
-        self.cmd_timer.timeout.connect(self.process_commands)
-        self.cmd_timer.start(100)
-        
-        # Audio mixer timer (runs in main thread or separate thread? Better separate)
-        # Actually, let's run a mixer thread
-        self.mixer_thread = threading.Thread(target=self.audio_mixer_loop, daemon=True)
-        self.mixer_thread.start()
+        # Mixing is pulled by the sound card: one frame per playback period
+        self.audio.mixer = self.mix_frame
+    
+    def init_audio(self):
+        self.audio = AudioManager()
+        mark_startup('audio_open')
+    
+    def post(self, event, data=None):
+        """Tell the view something changed (any thread)"""
+        try:
+            self.view.post(event, data)
+        except Exception as e:
+            logging.debug(f"View post error ({event}): {e}")
     
     def update_button_leds(self):
-        """Update button LED colors based on channel assignments and talk state
+        """Update button LED colors based on channel assignments, talk state and tally
         
         LED States (DFRobotics DFR0785):
         - Yellow (255, 255, 0): Channel assigned (listening)
+        - Green: Someone else is talking on this channel (brighter = louder)
         - Red (255, 0, 0): Active talk on this channel
         - Off (0, 0, 0): No channel assigned to this slot
+        
+        Safe to call often - the I2C worker only writes buttons whose color changed.
         """
         try:
             # Get sorted channel list
@@ -548,9 +1362,13 @@ class BeltpackApp(QMainWindow):
             for i in range(4):
                 if i < len(sorted_channels):
                     ch = sorted_channels[i]
+                    others = [level for uid, level in self.tally.get(ch, {}).items() if uid != self.user_id]
                     if ch in self.active_talk:
                         # Red = actively talking on this channel
                         self.hardware.set_button_color(i, 255, 0, 0)
+                    elif others:
+                        # Green = incoming talk, brightness from the loudest talker's level (0-7)
+                        self.hardware.set_button_color(i, 0, 80 + 25 * max(others), 0)
                     else:
                         # Yellow = channel assigned (listening)
                         self.hardware.set_button_color(i, 255, 255, 0)
@@ -559,45 +1377,23 @@ class BeltpackApp(QMainWindow):
                     self.hardware.set_button_color(i, 0, 0, 0)
         except Exception as e:
             logging.debug(f"LED update error: {e}")
-
-    def audio_mixer_loop(self):
-        """Mix audio from all channels and push to output"""
-        # Pre-allocate arrays for efficiency
-        mixed_buffer = np.zeros(CHUNK, dtype=np.float32)
-        
-        while True:
-            try:
-                mixed_buffer.fill(0)  # Reset buffer (faster than creating new)
-                active_sources = 0
-                
-                # Mix channels
-                for ch, buf in list(self.channel_buffers.items()):
-                    try:
-                        chunk = buf.get_nowait()
-                        # Find channel index for volume control
-                        ch_idx = list(self.channel_names.keys()).index(ch) if ch in self.channel_names else -1
-                        if ch_idx >= 0:
-                            vol = self.volumes[ch_idx] / 100.0
-                            mixed_buffer += chunk * vol
-                            active_sources += 1
-                    except (queue.Empty, ValueError):
-                        pass
-                
-                # Add sidetone if talking
-                if self.active_talk:
-                    mixed_buffer += (self.last_mic_chunk * SIDETONE_LEVEL)
-                    active_sources += 1
-                
-                if active_sources > 0:
-                    np.clip(mixed_buffer, -1, 1, out=mixed_buffer)  # In-place clip
-                    self.audio.queue_output(mixed_buffer)
-                    self.last_downlink_time = time.time()
-                
-                time.sleep(0.02) # 20ms cycle
-            except Exception as e:
-                logging.error(f"Mixer error: {e}")
-                time.sleep(0.02)
-
+    
+    def mix_frame(self, mixed_buffer):
+        """Mix one playback period into mixed_buffer (runs in the audio callback)"""
+        if self.boot_pending and self.channel_names and self.loop:
+            # First period that can play our channels - log it from the network thread
+            self.boot_pending = False
+            self.loop.call_soon_threadsafe(mark_startup, 'audio_ready', time.perf_counter())
+        if not self.channel_mixer.mix(mixed_buffer):
+            return False
+        self.last_downlink_time = time.time()
+        return True
+    
+    def rebuild_mix_plan(self):
+        """Recompile the mix plan and button slot map - call whenever channel_names or volumes change"""
+        self.channel_mixer.set_plan(self.channel_names, self.volumes)
+        self.button_channels = sorted(self.channel_names)
+    
     def run_async(self):
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
@@ -607,78 +1403,96 @@ class BeltpackApp(QMainWindow):
             logging.error(f"Async error: {e}")
         finally:
             self.loop.close()
-
+    
     async def async_main(self):
+        # Browse in the background from boot (zeroconf import included); connects read its cache meanwhile
+        asyncio.get_running_loop().run_in_executor(None, server_directory.start)
         await self.connect_async()
+        if self.gui_state == 'boot' and not self.user_name:
+            self.show_user_select()
         await asyncio.gather(
             self.receive_udp_async(), 
             self.record_send_async(),
             self.heartbeat_async(),
             return_exceptions=True
         )
-
+    
     async def connect_async(self):
+        backoff = 0.25  # First retry is immediate-ish; doubles up to 5 s while the server is away
         while True:
             if self.reconnecting:
                 await asyncio.sleep(1)
                 continue
             
             try:
-                # Discover server via mDNS
-                discovered_host, discovered_port = await discover_server_async(timeout=10.0)
-                server_host = discovered_host if discovered_host else SERVER_HOST
-                server_port = discovered_port if discovered_port else TCP_PORT
-                
-                self.tcp_reader, self.tcp_writer = await asyncio.open_connection(server_host, server_port)
+                self.tcp_reader, self.tcp_writer = await self.open_server_connection()
+                self.tcp_decoder = FrameDecoder()
+                udp_port = self.ensure_udp_socket()
+                self.set_udp_destination()
                 
                 # Handle authentication challenge
                 import hashlib
-                auth_data = await asyncio.wait_for(self.tcp_reader.read(1024), timeout=5.0)
-                if auth_data.startswith(b"AUTH_CHALLENGE:"):
-                    challenge = auth_data[15:]  # Remove "AUTH_CHALLENGE:" prefix
-                    response = hashlib.sha256(challenge + AUTH_KEY.encode()).hexdigest().encode()
-                    self.tcp_writer.write(response)
+                frame = await asyncio.wait_for(read_frame(self.tcp_reader, self.tcp_decoder), timeout=5.0)
+                if frame and frame[0] == 'AUTH_CHALLENGE':
+                    challenge = bytes(frame[1])
+                    response = hashlib.sha256(challenge + AUTH_KEY.encode()).hexdigest()
+                    if self.session_token:
+                        # Resume: server restores our state and answers in the same round trip
+                        resume = {
+                            'auth': response,
+                            'token': self.session_token,
+                            'user': self.user_name,
+                            'talk': sorted(self.active_talk),
+                            'udp_port': udp_port,
+                        }
+                        self.tcp_writer.write(encode_frame('AUTH_RESUME', json.dumps(resume)))
+                    else:
+                        self.tcp_writer.write(encode_frame('AUTH_RESPONSE', response))
                     await self.tcp_writer.drain()
                 else:
                     logging.error("No authentication challenge received")
                     await asyncio.sleep(5)
                     continue
                 
-                # Get user ID
-                resp = await asyncio.wait_for(self.tcp_reader.read(1024), timeout=5.0)
-                if resp.startswith(b"AUTH_FAIL"):
+                # Get user ID: "<user_id>:<session token>[:1 if resumed]"
+                frame = await asyncio.wait_for(read_frame(self.tcp_reader, self.tcp_decoder), timeout=5.0)
+                if not frame or frame[0] != 'USER_ID':
                     logging.error("Authentication failed - check AUTH_KEY")
+                    self.session_token = None
                     await asyncio.sleep(10)
                     continue
-                    
-                self.user_id = int(resp.decode().split(':')[1])
-                
-                self.udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                self.udp_sock.setblocking(False)
-                try:
-                    # Bind immediately so we advertise a real port to the server
-                    self.udp_sock.bind(("0.0.0.0", 0))
-                except Exception as e:
-                    logging.error(f"UDP bind failed, downstream audio will break: {e}")
                 
-                # Add QoS for audio priority
-                try:
-                    self.udp_sock.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, 0x88)
-                    logging.info("✓ QoS enabled on beltpack")
-                except Exception as e:
-                    logging.debug(f"QoS setup: {e}")
+                fields = str(frame[1], 'utf-8').split(':')
+                self.user_id = int(fields[0])
+                resumed = len(fields) > 2 and fields[2] == '1'
+                self.session_token = fields[1] if len(fields) > 1 else None
                 
                 self.last_heartbeat = time.time()
+                mark_startup('connected')
+                if not self.devices_ready.is_set():
+                    await asyncio.get_running_loop().run_in_executor(None, self.devices_ready.wait)
+                self.tally = {}
+                self.tally_channels = set()
                 self.tcp_rx_queue = asyncio.Queue()
                 self.tcp_reader_task = asyncio.create_task(self.tcp_reader_loop())
-                # Advertise UDP port for downstream audio before first talk packet
-                try:
-                    udp_port = self.udp_sock.getsockname()[1]
-                    self.tcp_writer.write(f"SET_UDP:{udp_port}".encode())
-                    await self.tcp_writer.drain()
-                except Exception as e:
-                    logging.debug(f"SET_UDP failed: {e}")
-                logging.info(f"Connected with user_id {self.user_id}")
+                if not resumed:
+                    # Advertise UDP port for downstream audio before first talk packet
+                    try:
+                        self.tcp_writer.write(encode_frame('SET_UDP', str(udp_port)))
+                        await self.tcp_writer.drain()
+                    except Exception as e:
+                        logging.debug(f"SET_UDP failed: {e}")
+                    if self.user_name:
+                        # Server lost our session (restart/expiry) - reselect the profile ourselves
+                        asyncio.create_task(self.restore_profile_async())
+                
+                if self.disconnected_at is not None:
+                    logging.info(f"Reconnected with user_id {self.user_id} in "
+                                 f"{(time.time() - self.disconnected_at) * 1000:.0f} ms"
+                                 f"{' (session resumed)' if resumed else ''}")
+                    self.disconnected_at = None
+                else:
+                    logging.info(f"Connected with user_id {self.user_id}")
                 break
             except Exception as e:
                 logging.error(f"Connect error: {e}")
@@ -688,7 +1502,65 @@ class BeltpackApp(QMainWindow):
                         await self.tcp_writer.wait_closed()
                     except:
                         pass
-                await asyncio.sleep(5)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+    
+    async def open_server_connection(self):
+        """Connect to the server the directory knows (or the last one that answered), else discover"""
+        server_addr = server_directory.lookup() or self.server_addr
+        if server_addr:
+            try:
+                connection = await asyncio.wait_for(asyncio.open_connection(*server_addr), timeout=1.0)
+                self.server_addr = server_addr
+                return connection
+            except (OSError, asyncio.TimeoutError) as e:
+                logging.info(f"Known server {server_addr[0]}:{server_addr[1]} unreachable ({e!r}), rediscovering")
+        
+        discovered_host, discovered_port = await discover_server_async(timeout=10.0)
+        server_addr = (discovered_host or SERVER_HOST, discovered_port or TCP_PORT)
+        connection = await asyncio.open_connection(*server_addr)
+        self.server_addr = server_addr
+        return connection
+    
+    def ensure_udp_socket(self):
+        """Create the audio socket once; reconnects keep it (and its port) so the UDP path survives"""
+        if self.udp_sock is not None and self.udp_sock.fileno() != -1:
+            return self.udp_sock.getsockname()[1]
+        
+        udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp_sock.setblocking(False)
+        try:
+            # Bind immediately so we advertise a real port to the server
+            udp_sock.bind(("0.0.0.0", 0))
+        except Exception as e:
+            logging.error(f"UDP bind failed, downstream audio will break: {e}")
+        
+        # Add QoS for audio priority
+        try:
+            udp_sock.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, 0x88)
+            logging.info("✓ QoS enabled on beltpack")
+        except Exception as e:
+            logging.debug(f"QoS setup: {e}")
+        
+        self.udp_sock = udp_sock  # receive_udp_async picks up the new socket on its next read
+        return udp_sock.getsockname()[1]
+    
+    def set_udp_destination(self):
+        """Address talk packets to the server IP the TCP session reached (numeric - no lookup per send)
+        
+        The socket itself stays unconnected: a multi-homed server may send
+        downlink from a different address than the one we talk to, and a
+        connect()ed UDP socket would silently drop those datagrams.
+        """
+        peer = self.tcp_writer.get_extra_info('peername') if self.tcp_writer else None
+        host = peer[0] if peer else self.server_addr[0]
+        self.udp_dest = (host, UDP_PORT)
+    
+    async def restore_profile_async(self):
+        """Reselect our profile and talk state on a fresh (non-resumed) session"""
+        await self.select_user_async()
+        if self.active_talk and self.tcp_writer:
+            await self.send_toggles([(ch, True) for ch in sorted(self.active_talk)])
     
     async def tcp_reader_loop(self):
         """Single consumer of TCP stream; dispatches flash and enqueues responses"""
@@ -696,61 +1568,610 @@ class BeltpackApp(QMainWindow):
             return
         try:
             while True:
-                data = await self.tcp_reader.read(1024)
-                if not data:
+                frame = await read_frame(self.tcp_reader, self.tcp_decoder)
+                if frame is None:
                     raise ConnectionResetError("TCP stream closed")
-                if data == b"FLASH_PACK":
+                name, payload = frame
+                if name == 'FLASH_PACK':
                     logging.info("Received flash command from server")
                     self.hardware.flash_all_buttons()
                     continue
-                if data == b"PONG":
+                if name == 'PONG':
                     self.last_heartbeat = time.time()
                     continue
-                if data.startswith(b"UPDATE_CONFIG:"):
-                    # Live config update from server
+                if name == 'TALLY':
+                    self.tally.update(decode_tally(payload))
+                    self.update_button_leds()
+                    continue
+                if name == 'ASSIGN_USER':
+                    # Server assigned this pack a profile; its config follows
+                    self.tally_channels = set()  # Server dropped our tally subscription
+                    self.user_name = str(payload, 'utf-8')
+                    logging.info(f"Profile assigned by server: {self.user_name}")
+                    continue
+                if name == 'UPDATE_CONFIG':
+                    # Live config update from server (full snapshot or delta)
                     try:
-                        config_str = data.decode().split(':', 1)[1]
-                        config_data = json.loads(config_str)
-                        
-                        # Update local config
-                        if isinstance(config_data, dict) and 'channels' in config_data:
-                            raw_channels = config_data['channels']
-                            self.button_modes = config_data.get('button_modes', {})
-                        else:
-                            raw_channels = config_data
-                            self.button_modes = {}
-                        
-                        self.channel_names = {int(k): v for k, v in raw_channels.items()}
+                        if not self.apply_config(json.loads(str(payload, 'utf-8'))):
+                            logging.info("Config delta out of sequence - requesting full config")
+                            self.tcp_writer.write(encode_frame('CONFIG_RESYNC'))
+                            await self.tcp_writer.drain()
+                            continue
                         
                         logging.info(f"Config updated from server: {len(self.channel_names)} channels")
+                        mark_startup('profile_loaded')
                         self.update_button_leds()  # Update LED colors for new config
-                        self.command_queue.put(('show_main_gui', None))  # Refresh GUI
+                        self.set_state('main')  # Refresh the view
+                        await self.sync_tally_subscription()
                     except Exception as e:
                         logging.error(f"Failed to parse UPDATE_CONFIG: {e}")
                     continue
                 if self.tcp_rx_queue:
-                    await self.tcp_rx_queue.put(data)
+                    await self.tcp_rx_queue.put((name, bytes(payload)))
         except Exception as e:
             logging.debug(f"TCP reader loop ended: {e}")
             await self.reconnect_async()
-
-    async def wait_for_prefix(self, prefix, timeout: float = 5.0):
-        """Wait for next TCP message with any of the given prefix/prefixes"""
-        prefixes = tuple(prefix) if isinstance(prefix, (list, tuple, set)) else (prefix,)
+    
+    async def sync_tally_subscription(self):
+        """Subscribe to tally for exactly the channels on our buttons"""
+        chs = set(self.channel_names)
+        if chs == self.tally_channels or not self.tcp_writer:
+            return
+        self.tally_channels = chs
+        self.tally = {ch: talkers for ch, talkers in self.tally.items() if ch in chs}
+        self.tcp_writer.write(encode_frame('TALLY_SUBSCRIBE', ','.join(str(ch) for ch in sorted(chs))))
+        await self.tcp_writer.drain()
+    
+    def apply_config(self, config_data):
+        """Apply config from the server: full snapshot, versioned delta or legacy channel dict
+        
+        Returns False if a delta does not build on the version we hold (caller
+        should request a resync).
+        """
+        if not isinstance(config_data, dict) or not ('channels' in config_data or 'base' in config_data):
+            # Backwards compatibility: old server sends just channel dict
+            self.channel_names = {int(k): v for k, v in config_data.items()}
+            self.button_modes = {}
+            self.config_version = 0
+            self.rebuild_mix_plan()
+            return True
+        
+        if 'base' in config_data:
+            if config_data['base'] != self.config_version:
+                return False
+            for k, v in config_data.get('channels', {}).items():
+                self.channel_names[int(k)] = v
+            self.button_modes.update(config_data.get('button_modes', {}))
+            removed = config_data.get('removed', {})
+            for k in removed.get('channels', []):
+                self.channel_names.pop(int(k), None)
+            for k in removed.get('button_modes', []):
+                self.button_modes.pop(k, None)
+        else:
+            self.channel_names = {int(k): v for k, v in config_data['channels'].items()}
+            self.button_modes = config_data.get('button_modes', {})
+        
+        self.config_version = config_data.get('version', 0)
+        self.rebuild_mix_plan()
+        return True
+    
+    async def wait_for_message(self, names, timeout: float = 5.0):
+        """Wait for next TCP message of any of the given type(s); returns (name, payload)"""
+        names = tuple(names) if isinstance(names, (list, tuple, set)) else (names,)
         if not self.tcp_rx_queue:
             raise ConnectionError("TCP queue not ready")
         try:
             while True:
-                data = await asyncio.wait_for(self.tcp_rx_queue.get(), timeout=timeout)
-                if any(data.startswith(p) for p in prefixes):
-                    return data
+                name, payload = await asyncio.wait_for(self.tcp_rx_queue.get(), timeout=timeout)
+                if name in names:
+                    return name, payload
                 # Ignore unrelated messages (already handled flash/pong in reader)
         except Exception as e:
             raise e
+    
+    def set_state(self, state):
+        """Switch menu screen ('boot', 'user_select', 'main', 'settings'); the highlight starts at the top"""
+        self.gui_state = state
+        self.menu_index = 0
+        self.settings_index = 0
+        self.post('state', state)
+    
+    def show_user_select(self):
+        """Go to profile selection and fetch the profile list"""
+        self.set_state('user_select')
+        if self.loop:
+            asyncio.run_coroutine_threadsafe(self.get_users_async(), self.loop)
+    
+    def select_user(self, user_name):
+        """Select a profile (any thread)"""
+        self.user_name = user_name
+        if self.loop:
+            asyncio.run_coroutine_threadsafe(self.select_user_async(), self.loop)
+    
+    async def get_users_async(self):
+        if not self.tcp_writer:
+            await self.reconnect_async()
+            return
+        try:
+            self.tcp_writer.write(encode_frame('GET_USERS'))
+            await self.tcp_writer.drain()
+            name, payload = await self.wait_for_message('USERS', timeout=5.0)
+            if name == 'USERS':
+                self.user_list = payload.decode().split(',')
+                self.post('users')
+        except Exception as e:
+            logging.error(f"Get users error: {e}")
+            await self.reconnect_async()
+    
+    async def select_user_async(self):
+        if not self.user_name or not self.tcp_writer:
+            return
+        try:
+            self.tcp_writer.write(encode_frame('SELECT_USER', self.user_name))
+            await self.tcp_writer.drain()
+            name, payload = await self.wait_for_message(['CONFIG', 'ERROR'], timeout=5.0)
+            if name == 'ERROR':
+                logging.error("User selection failed: ERROR")
+                self.post('error', 'User unavailable')
+                # Profile renamed or deleted (preset or restored) - let the encoder pick another
+                self.user_name = None
+                self.show_user_select()
+                return
+            
+            # Parse config - server sends {channels: {...}, button_modes: {...}, version}
+            self.apply_config(json.loads(payload.decode()))
+            mark_startup('profile_loaded')
+            self.update_button_leds()
+            self.set_state('main')
+            self.tally_channels = set()  # Selecting a profile resets the server-side subscription
+            await self.sync_tally_subscription()
+        except Exception as e:
+            logging.error(f"Select user error: {e}")
+            await self.reconnect_async()
+    
+    def toggle_talk(self, ch, enable, edge_time=None):
+        """Toggle talk state for channel (any thread); edge_time = button edge, for PTT latency"""
+        if enable:
+            self.active_talk.add(ch)
+        else:
+            self.active_talk.discard(ch)
+        self.update_capture()
+        
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.queue_toggle, ch, enable, edge_time)
+    
+    def queue_toggle(self, ch, enable, edge_time):
+        """Event loop side of toggle_talk: changes queued in one loop pass go out as one write"""
+        if not self.pending_toggles:
+            asyncio.ensure_future(self.flush_toggles())
+        self.pending_toggles.append((ch, enable, edge_time))
+    
+    async def flush_toggles(self):
+        toggles, self.pending_toggles = self.pending_toggles, []
+        await self.send_toggles([(ch, enable) for ch, enable, _ in toggles])
+        written = time.perf_counter()
+        for _, _, edge_time in toggles:
+            if edge_time is not None:
+                self.ptt_latency.add(written - edge_time)
+    
+    async def send_toggles(self, toggles):
+        """Send a batch of (ch, enable) talk changes as pipelined frames with one drain"""
+        if not self.tcp_writer:
+            await self.reconnect_async()
+            return
+        try:
+            self.tcp_writer.write(b''.join(encode_frame('TOGGLE_TALK', f"{ch}:{'1' if checked else '0'}")
+                                           for ch, checked in toggles))
+            await self.tcp_writer.drain()
+        except Exception as e:
+            logging.error(f"Send toggle error: {e}")
+            await self.reconnect_async()
+    
+    async def reconnect_async(self):
+        if self.reconnecting:
+            return
+        self.reconnecting = True
+        logging.info("Reconnecting...")
+        
+        
+        if self.tcp_writer:
+            try:
+                self.tcp_writer.close()
+                await self.tcp_writer.wait_closed()
+            except:
+                pass
+        
+        self.tcp_reader = None
+        self.tcp_writer = None
+        if self.disconnected_at is None:
+            self.disconnected_at = time.time()
+        # No settle delay: the cached server and session token make an immediate retry cheap
+        self.reconnecting = False
+        await self.connect_async()
+    
+    async def heartbeat_async(self):
+        """Send periodic heartbeat to server"""
+        while True:
+            await asyncio.sleep(10)
+            playout = {ch: buf.stats() for ch, buf in list(self.channel_buffers.items())}
+            logging.debug(f"Audio: {self.audio.stats()}, playout: {playout}, "
+                          f"uplink send latency: {self.send_latency.summary()}")
+            gap = time.time() - self.last_heartbeat
+            if gap > 30:
+                await self.reconnect_async()
+                continue
+            if self.tcp_writer and gap > 10:
+                try:
+                    self.tcp_writer.write(encode_frame('PING'))
+                    await self.tcp_writer.drain()
+                    # last_heartbeat updated on PONG
+                except:
+                    await self.reconnect_async()
+    
+    # ===== HARDWARE POLLING =====
+    
+    def button_watch(self):
+        """Turn PTT button presses into talk changes
+        
+        With the modules' INT line wired (BUTTON_INT_GPIO) this sleeps in gpiod
+        until a button changes; otherwise it scans at BUTTON_SCAN_IDLE, speeding
+        up to BUTTON_SCAN_ACTIVE while buttons are in use.
+        
+        edge_time (the start of PTT latency) is the press itself as near as we
+        know it: the kernel's INT edge timestamp, or in scan mode the midpoint
+        of the two scans that bracket the change, so detection delay counts.
+        """
+        last_scan = time.perf_counter()
+        last_states = self.hardware.read_buttons()
+        last_activity = 0.0
+        
+        while True:
+            try:
+                stamp = None
+                if self.hardware.button_int_line is not None:
+                    # Timeout rescan catches an edge lost while we were reading
+                    stamp = self.hardware.wait_button_interrupt(BUTTON_RESCAN_INTERVAL)
+                else:
+                    active = any(last_states) or time.monotonic() - last_activity < BUTTON_ACTIVE_HOLD
+                    time.sleep(BUTTON_SCAN_ACTIVE if active else BUTTON_SCAN_IDLE)
+                
+                scan = time.perf_counter()
+                if stamp is not None:
+                    edge_time = scan - max(time.monotonic() - stamp, 0.0)  # Kernel edge time on the perf_counter clock
+                else:
+                    edge_time = (last_scan + scan) / 2
+                last_scan = scan
+                states = self.hardware.read_buttons()
+                for i, pressed in enumerate(states):
+                    if pressed != last_states[i]:
+                        last_activity = time.monotonic()
+                        self.on_button_edge(i, pressed, edge_time)
+                last_states = states
+            except Exception as e:
+                logging.error(f"Button watch error: {e}")
+                time.sleep(0.1)
+    
+    def on_button_edge(self, i, pressed, edge_time):
+        """Apply one button press/release according to its latch/non-latch mode"""
+        button_channels = self.button_channels
+        if i >= len(button_channels):
+            return
+        ch = button_channels[i]
+        mode = self.button_modes.get(str(i), 'latch')
+        
+        if pressed:
+            if mode == 'latch':
+                # Toggle mode
+                self.button_states[i] = not self.button_states[i]
+                self.toggle_talk(ch, self.button_states[i], edge_time)
+            else:
+                # Push-to-talk mode - enable on press
+                self.toggle_talk(ch, True, edge_time)
+        elif mode == 'non-latch':
+            # Non-latch mode - disable on release
+            self.toggle_talk(ch, False, edge_time)
+    
+    def on_volume_step(self, i, steps):
+        """Volume encoder i turned by steps (1% each, already accelerated)"""
+        if i >= len(self.channel_names):
+            return
+        self.volumes[i] = min(100.0, max(0.0, self.volumes[i] + steps))
+        self.rebuild_mix_plan()
+        self.post('volume', i)
+    
+    def on_menu_step(self, steps):
+        """Menu encoder turned by steps detents - move the highlight"""
+        if self.gui_state == 'user_select':
+            self.menu_index = (self.menu_index + steps) % max(1, len(self.user_list))
+        
+        elif self.gui_state == 'main':
+            # Rotate through: User name, Channels..., Settings gear
+            max_items = 1 + len(self.channel_names) + 1  # User name + channels + settings gear
+            self.menu_index = (self.menu_index + steps) % max_items
+        
+        elif self.gui_state == 'settings':
+            self.settings_index = (self.settings_index + steps) % len(self.SETTINGS_ITEMS)
+        
+        else:
+            return
+        self.post('highlight')
+    
+    def on_menu_button_press(self):
+        """Handle menu button press based on current state"""
+        if self.gui_state == 'user_select':
+            # Select user
+            if len(self.user_list) > 0:
+                self.select_user(self.user_list[self.menu_index])
+        
+        elif self.gui_state == 'main':
+            # Check what's selected: 0=user name, 1..N=channels, N+1=settings gear
+            if self.menu_index == 0:
+                # User name selected - return to profile selection
+                self.show_user_select()
+            elif self.menu_index == len(self.channel_names) + 1:
+                # Settings gear selected
+                self.set_state('settings')
+        
+        elif self.gui_state == 'settings':
+            # Toggle/adjust selected setting
+            setting_type = self.SETTINGS_ITEMS[self.settings_index]
+            
+            if setting_type == 'bias':
+                current_state = self.hardware.get_mic_bias_state()
+                self.hardware.set_mic_bias(not current_state)
+                logging.info(f"Bias toggled: {'ON' if not current_state else 'OFF'}")
+            
+            elif setting_type == 'screen_brightness':
+                # Cycle through brightness levels
+                self.screen_brightness = (self.screen_brightness + 25) % 125
+                if self.screen_brightness == 0:
+                    self.screen_brightness = 25
+                # TODO: Apply brightness to display
+                logging.info(f"Screen brightness: {self.screen_brightness}%")
+            
+            elif setting_type == 'button_brightness':
+                # Cycle through brightness levels
+                self.button_brightness = (self.button_brightness + 25) % 125
+                if self.button_brightness == 0:
+                    self.button_brightness = 25
+                self.apply_button_brightness()
+                logging.info(f"Button brightness: {self.button_brightness}%")
+            
+            # ptt_latency is read-only: pressing just refreshes it
+            self.post('setting', setting_type)
+    
+    def apply_button_brightness(self):
+        """Apply brightness to RGB LED buttons"""
+        scale = self.button_brightness / 100.0
+        for i, ch in enumerate(self.button_channels[:4]):
+            if ch in self.active_talk:
+                # Red scaled
+                self.hardware.set_button_color(i, int(255 * scale), 0, 0)
+            else:
+                # Yellow scaled
+                self.hardware.set_button_color(i, int(255 * scale), int(255 * scale), 0)
+    
+    def update_capture(self):
+        """Capture (and wake the uplink) and sidetone only while talking"""
+        self.audio.sidetone_on = bool(self.active_talk)
+        if self.active_talk and self.loop is not None and self.capture_event is not None:
+            self.audio.capture_waker = partial(self.loop.call_soon_threadsafe, self.capture_event.set)
+        else:
+            self.audio.capture_waker = None
+    
+    async def record_send_async(self):
+        loop = asyncio.get_running_loop()
+        self.capture_event = asyncio.Event()
+        self.update_capture()
+        seq = 0
+        last_keepalive = 0.0
+        while True:
+            try:
+                # Sleeps until the audio callback hands over a frame - no polling
+                await self.capture_event.wait()
+                self.capture_event.clear()
+                
+                while True:
+                    audio_np = self.audio.get_input()
+                    if audio_np is None:
+                        break
+                    
+                    if not self.active_talk or self.user_id is None or self.udp_sock is None or self.udp_dest is None:
+                        continue
+                    
+                    mask = 0
+                    for ch in list(self.active_talk):
+                        mask |= 1 << ch
+                    
+                    if self.dtx_enabled and not self.vox_gate.process(audio_np):
+                        # DTX: nobody speaking - header-only keepalive now and then, seq not consumed
+                        now = time.monotonic()
+                        if now - last_keepalive >= DTX_KEEPALIVE_INTERVAL:
+                            last_keepalive = now
+                            try:
+                                await loop.sock_sendto(self.udp_sock, UPLINK_HEADER.pack(UPLINK_MULTI_FLAG | mask, self.user_id, seq), self.udp_dest)
+                            except Exception as e:
+                                logging.debug(f"Keepalive send error (mask {mask:#x}): {e}")
+                        continue
+                    last_keepalive = 0.0  # Next silence announces itself straight away
+                    
+                    # One packet for every talk channel: bitmask header + raw PCM int16 (no container)
+                    packet = UPLINK_HEADER.pack(UPLINK_MULTI_FLAG | mask, self.user_id, seq) + \
+                        (audio_np * 32767).clip(-32768, 32767).astype(np.int16).tobytes()
+                    try:
+                        # Numeric destination resolved at connect - no address lookup per packet
+                        await loop.sock_sendto(self.udp_sock, packet, self.udp_dest)
+                    except Exception as e:
+                        logging.debug(f"Send error (mask {mask:#x}): {e}")
+                    
+                    # Newest-frame capture time; exact whenever we keep up (one frame per wakeup)
+                    self.send_latency.add(time.perf_counter() - self.audio.capture_time)
+                    seq = (seq + 1) % 65536
+            except Exception as e:
+                logging.error(f"Record/send error: {e}")
+                await asyncio.sleep(0.01)
+    
+    async def receive_udp_async(self):
+        loop = asyncio.get_running_loop()
+        if self.udp_sock is None:
+            return
+        while True:
+            try:
+                # Re-read the attribute every time: ensure_udp_socket() may have replaced it
+                data, _ = await loop.sock_recvfrom(self.udp_sock, 8192)
+                if len(data) < DOWNLINK_HEADER.size:
+                    continue
+                
+                # Server sends: [ch:4][timestamp:4][seq:4][PCM]
+                ch, timestamp, seq = DOWNLINK_HEADER.unpack_from(data)
+                if ch not in self.channel_names:
+                    continue
+                
+                encoded = data[DOWNLINK_HEADER.size:]
+                if len(encoded) < 10:
+                    continue
+                
+                try:
+                    # Decode raw PCM int16 directly
+                    audio_data = np.frombuffer(encoded, dtype=np.int16).astype(np.float32) / 32767.0
+                except Exception as e:
+                    logging.error(f"PCM decode error: {e}")
+                    continue
+                
+                if len(audio_data) < CHUNK:
+                    audio_data = np.pad(audio_data, (0, CHUNK - len(audio_data)))
+                elif len(audio_data) > CHUNK:
+                    audio_data = audio_data[:CHUNK]
+                
+                # Hand to the channel's playout buffer for the callback mixer
+                self.channel_buffers[ch].put(seq, timestamp, audio_data, loop.time())
+            
+            except Exception as e:
+                logging.error(f"UDP receive error: {e}")
+                await asyncio.sleep(0.01)
+    
+    def close(self):
+        """Clean shutdown"""
+        logging.info("Shutting down beltpack...")
+        self.audio.close()
+        server_directory.close()
+        if self.tcp_writer:
+            try:
+                self.tcp_writer.close()
+            except:
+                pass
+    
+    def run_forever(self):
+        """Block until Ctrl+C / SIGINT (headless main thread) - returns an exit code"""
+        try:
+            while self.async_thread.is_alive():
+                self.async_thread.join(1.0)
+        except KeyboardInterrupt:
+            pass
+        self.close()
+        return 0
+
+
+class HeadlessView:
+    """View for packs without a screen: logs what a display would show
+    
+    Profiles are picked with the menu encoder (or preset with --user) and
+    everything else works from the buttons. Subclass and override post() to
+    drive a small framebuffer/OLED panel; it is called from core threads.
+    """
+    def __init__(self):
+        self.core = None  # Set by BeltpackCore
+    
+    def post(self, event, data):
+        core = self.core
+        if event == 'state':
+            logging.info(f"Menu: {data}")
+        elif event == 'users':
+            logging.info(f"Profiles: {', '.join(core.user_list)} - turn and press the menu encoder to select")
+        elif event == 'highlight' and core.gui_state == 'user_select' and core.user_list:
+            logging.info(f"Profile: {core.user_list[core.menu_index]}")
+        elif event == 'error':
+            logging.error(f"Beltpack: {data}")
 
+
+# ===== QT USER INTERFACE =====
+
+class BeltpackApp(QMainWindow):
+    """Touchscreen view of a BeltpackCore (480x320 fullscreen)"""
+    posted = pyqtSignal(str, object)
+    
+    def __init__(self, user_name=None):
+        super().__init__()
+        self.setWindowTitle("LanComm Pro Beltpack")
+        self.setGeometry(0, 0, 480, 320)
+        
+        self.user_list_widget = None
+        
+        # Apply dark theme
+        self.setStyleSheet("""
+            QMainWindow, QWidget { background-color: #19191c; color: #e6e6eb; }
+            QLabel { color: #e6e6eb; font-size: 14pt; }
+            QPushButton {
+                background-color: #2d2d32; border: 1px solid #4a4a50; border-radius: 4px;
+                padding: 12px; color: #e6e6eb; font-size: 12pt; font-weight: bold;
+            }
+            QPushButton:pressed { background-color: #5096ff; }
+            QListWidget {
+                background-color: #232326; border: 1px solid #3a3a3f; color: #e6e6eb;
+                font-size: 14pt; padding: 8px;
+            }
+            QListWidget::item { padding: 12px; border-radius: 4px; }
+            QListWidget::item:selected { background-color: #5096ff; color: #ffffff; }
+        """)
+        
+        self.central = QWidget()
+        self.setCentralWidget(self.central)
+        self.main_layout = QVBoxLayout()
+        self.central.setLayout(self.main_layout)
+        
+        # Core threads post here; the signal hands each event to the GUI thread
+        self.posted.connect(self.handle)
+        self.show_boot_screen()
+        self.core = BeltpackCore(self, user_name)
+    
+    def post(self, event, data):
+        self.posted.emit(event, data)
+    
+    def handle(self, event, data):
+        """Render a core event (GUI thread)"""
+        core = self.core
+        if event == 'state':
+            {'boot': self.show_boot_screen, 'user_select': self.show_user_select,
+             'main': self.show_main_gui, 'settings': self.show_settings_menu}[data]()
+        
+        elif event == 'users':
+            self.show_user_list()
+        
+        elif event == 'highlight':
+            if core.gui_state == 'user_select' and self.user_list_widget and core.user_list:
+                self.user_list_widget.setCurrentRow(core.menu_index)
+            elif core.gui_state == 'main':
+                self.update_main_highlight()
+            elif core.gui_state == 'settings':
+                self.update_settings_highlight()
+        
+        elif event == 'volume':
+            # Update GUI volume bar if in main screen
+            if core.gui_state == 'main' and data < len(self.channel_widgets):
+                _, vol_bar = self.channel_widgets[data]
+                vol_bar.setValue(int(core.volumes[data]))
+        
+        elif event == 'setting':
+            if core.gui_state == 'settings':
+                self.refresh_setting(data)
+        
+        elif event == 'error':
+            error_label = QLabel(f"Error: {data}")
+            error_label.setStyleSheet("color: #ff5555; font-size: 12pt; padding: 10px;")
+            self.main_layout.addWidget(error_label)
+    
     def show_boot_screen(self):
         """Show boot/startup screen"""
-        self.gui_state = 'boot'
         self.clear_layout()
         
         boot_label = QLabel("Booting...")
@@ -762,83 +2183,41 @@ class BeltpackApp(QMainWindow):
         status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         status_label.setStyleSheet("font-size: 12pt; color: #a0a0a5;")
         self.main_layout.addWidget(status_label)
-        
-        # Wait for network connection, then show user select
-        QTimer.singleShot(2000, self.show_user_select)
     
     def show_user_select(self):
         """Show user profile selection with rotary encoder navigation"""
-        self.gui_state = 'user_select'
-        self.menu_index = 0
+        self.user_list_widget = None
         self.clear_layout()
         
         title = QLabel("Select User Profile")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         title.setStyleSheet("font-size: 18pt; font-weight: bold; color: #5096ff; padding: 10px;")
         self.main_layout.addWidget(title)
-        
-        # Queue command for async thread
-        self.command_queue.put(('get_users', None))
-
-    async def get_users_async(self):
-        if not self.tcp_writer:
-            await self.reconnect_async()
-            return
-        try:
-            self.tcp_writer.write(b"GET_USERS")
-            await self.tcp_writer.drain()
-            resp = await self.wait_for_prefix(b"USERS:", timeout=5.0)
-            if resp.decode().startswith("USERS:"):
-                user_list = resp.decode().split(':')[1].split(',')
-                # Update GUI from main thread
-                self.command_queue.put(('update_user_list', user_list))
-        except Exception as e:
-            logging.error(f"Get users error: {e}")
-            await self.reconnect_async()
-
-    async def select_user_async(self):
-        if not self.user_name or not self.tcp_writer:
+    
+    def show_user_list(self):
+        """Fill the profile selection screen once the list arrives"""
+        if self.core.gui_state != 'user_select':
             return
-        try:
-            self.tcp_writer.write(f"SELECT_USER:{self.user_name}".encode())
-            await self.tcp_writer.drain()
-            resp = await self.wait_for_prefix([b"CONFIG:", b"ERROR"], timeout=5.0)
-            if resp.startswith(b"ERROR"):
-                logging.error("User selection failed: ERROR")
-                self.command_queue.put(('show_error', 'User unavailable'))
-                return
-            
-            config_str = resp.decode().split(':', 1)[1]
-            # Parse config - server sends {channels: {...}, button_modes: {...}}
-            config_data = json.loads(config_str)
-            
-            # Handle both old format (just channels) and new format (with button_modes)
-            if isinstance(config_data, dict) and 'channels' in config_data:
-                raw_channels = config_data['channels']
-                self.button_modes = config_data.get('button_modes', {})
-            else:
-                # Backwards compatibility: old server sends just channel dict
-                raw_channels = config_data
-                self.button_modes = {}
-            
-            self.channel_names = {int(k): v for k, v in raw_channels.items()}
-            self.update_button_leds()
-            self.command_queue.put(('show_main_gui', None))
-        except Exception as e:
-            logging.error(f"Select user error: {e}")
-            await self.reconnect_async()
+        # Persist list for rotary navigation and selection
+        self.user_list_widget = QListWidget()
+        self.user_list_widget.setStyleSheet("font-size: 16pt; padding: 8px;")
+        for user in self.core.user_list:
+            item = QListWidgetItem(user)
+            self.user_list_widget.addItem(item)
+        if self.core.user_list:
+            self.user_list_widget.setCurrentRow(self.core.menu_index % len(self.core.user_list))
+        self.user_list_widget.itemClicked.connect(self.on_user_selected)
+        self.main_layout.addWidget(self.user_list_widget)
     
     def show_main_gui(self):
         """Show main GUI with channel status and settings gear"""
-        self.gui_state = 'main'
-        self.menu_index = 0
         self.clear_layout()
         
         # Header with user name and settings gear
         header_layout = QHBoxLayout()
         
         # User name label (selectable - returns to profile selection)
-        self.user_name_label = QLabel(self.user_name)
+        self.user_name_label = QLabel(self.core.user_name)
         self.user_name_label.setStyleSheet("font-size: 10pt; color: #a0a0a5; padding: 5px; border-radius: 3px;")
         header_layout.addWidget(self.user_name_label)
         
@@ -854,7 +2233,7 @@ class BeltpackApp(QMainWindow):
         
         # Channel status displays with volume indicators
         self.channel_widgets = []
-        for i, (ch, name) in enumerate(sorted(self.channel_names.items())):
+        for i, (ch, name) in enumerate(sorted(self.core.channel_names.items())):
             ch_frame = QWidget()
             ch_frame.setStyleSheet("background-color: #232326; border-radius: 4px; padding: 8px; margin: 4px;")
             ch_layout = QHBoxLayout(ch_frame)
@@ -871,7 +2250,7 @@ class BeltpackApp(QMainWindow):
             vol_bar.setOrientation(Qt.Orientation.Horizontal)
             vol_bar.setMinimum(0)
             vol_bar.setMaximum(100)
-            vol_bar.setValue(int(self.volumes[i]))
+            vol_bar.setValue(int(self.core.volumes[i]))
             vol_bar.setMaximumWidth(120)
             vol_bar.setMaximumHeight(20)
             vol_bar.setTextVisible(True)
@@ -925,8 +2304,6 @@ class BeltpackApp(QMainWindow):
     
     def show_settings_menu(self):
         """Show settings menu with bias, brightness controls"""
-        self.gui_state = 'settings'
-        self.settings_index = 0
         self.clear_layout()
         
         # Header
@@ -948,9 +2325,9 @@ class BeltpackApp(QMainWindow):
         bias_layout.addWidget(bias_label)
         bias_layout.addStretch()
         
-        self.bias_status_label = QLabel("ON" if self.hardware.get_mic_bias_state() else "OFF")
-        self.bias_status_label.setStyleSheet("font-size: 12pt; font-weight: bold; color: #2a2;" if self.hardware.get_mic_bias_state() else "font-size: 12pt; font-weight: bold; color: #d22;")
+        self.bias_status_label = QLabel()
         bias_layout.addWidget(self.bias_status_label)
+        self.refresh_setting('bias')
         
         self.settings_widgets.append(('bias', bias_frame))
         self.main_layout.addWidget(bias_frame)
@@ -965,7 +2342,8 @@ class BeltpackApp(QMainWindow):
         screen_layout.addWidget(screen_label)
         screen_layout.addStretch()
         
-        self.screen_brightness_label = QLabel(f"{self.screen_brightness}%")
+        self.screen_brightness_label = QLabel()
+        self.refresh_setting('screen_brightness')
         self.screen_brightness_label.setStyleSheet("font-size: 12pt; font-weight: bold; color: #5096ff;")
         screen_layout.addWidget(self.screen_brightness_label)
         
@@ -982,13 +2360,33 @@ class BeltpackApp(QMainWindow):
         button_layout.addWidget(button_label)
         button_layout.addStretch()
         
-        self.button_brightness_label = QLabel(f"{self.button_brightness}%")
+        self.button_brightness_label = QLabel()
+        self.refresh_setting('button_brightness')
         self.button_brightness_label.setStyleSheet("font-size: 12pt; font-weight: bold; color: #5096ff;")
         button_layout.addWidget(self.button_brightness_label)
         
         self.settings_widgets.append(('button_brightness', button_frame))
         self.main_layout.addWidget(button_frame)
         
+        # 4. PTT Latency (read-only - press to refresh)
+        ptt_frame = QWidget()
+        ptt_frame.setStyleSheet("background-color: #232326; border-radius: 4px; padding: 12px; margin: 4px;")
+        ptt_layout = QHBoxLayout(ptt_frame)
+        
+        ptt_label = QLabel("PTT Latency")
+        ptt_label.setStyleSheet("font-size: 12pt; color: #e6e6eb;")
+        ptt_layout.addWidget(ptt_label)
+        ptt_layout.addStretch()
+        
+        self.ptt_latency_label = QLabel()
+        self.ptt_latency_label.setStyleSheet("font-size: 10pt; font-weight: bold; color: #5096ff;")
+        self.ptt_latency_label.setAlignment(Qt.AlignmentFlag.AlignRight)
+        ptt_layout.addWidget(self.ptt_latency_label)
+        self.refresh_setting('ptt_latency')
+        
+        self.settings_widgets.append(('ptt_latency', ptt_frame))
+        self.main_layout.addWidget(ptt_frame)
+        
         self.main_layout.addStretch()
         
         # Highlight first option
@@ -1000,200 +2398,29 @@ class BeltpackApp(QMainWindow):
         hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.main_layout.addWidget(hint)
     
-    def toggle_talk(self, ch, enable):
-        """Toggle talk state for channel"""
-        if enable:
-            self.active_talk.add(ch)
-        else:
-            self.active_talk.discard(ch)
-        
-        self.command_queue.put(('send_toggle', (ch, enable)))
-
-    async def send_toggle(self, ch, checked):
-        if not self.tcp_writer:
-            await self.reconnect_async()
-            return
-        try:
-            self.tcp_writer.write(f"TOGGLE_TALK:{ch}:{'1' if checked else '0'}".encode())
-            await self.tcp_writer.drain()
-        except Exception as e:
-            logging.error(f"Send toggle error: {e}")
-            await self.reconnect_async()
-
-    async def reconnect_async(self):
-        if self.reconnecting:
-            return
-        self.reconnecting = True
-        logging.info("Reconnecting...")
-
-
-        if self.tcp_writer:
-            try:
-                self.tcp_writer.close()
-                await self.tcp_writer.wait_closed()
-            except:
-                pass
-        
-        self.tcp_reader = None
-        self.tcp_writer = None
-        await asyncio.sleep(2)
-        self.reconnecting = False
-        await self.connect_async()
-    
-    async def heartbeat_async(self):
-        """Send periodic heartbeat to server"""
-        while True:
-            await asyncio.sleep(10)
-            gap = time.time() - self.last_heartbeat
-            if gap > 30:
-                await self.reconnect_async()
-                continue
-            if self.tcp_writer and gap > 10:
-                try:
-                    self.tcp_writer.write(b"PING")
-                    await self.tcp_writer.drain()
-                    # last_heartbeat updated on PONG
-                except:
-                    await self.reconnect_async()
-    
-    # ===== HARDWARE POLLING =====
-    
-    def hardware_poll(self):
-        """Poll hardware buttons and encoders"""
-        last_button_states = [False] * 4
-        
-        while True:
-            try:
-                # Read RGB buttons
-                for i in range(min(4, len(self.channel_names))):
-                    button_pressed = self.hardware.read_button(i)
-                    
-                    # Detect button press (edge trigger)
-                    if button_pressed and not last_button_states[i]:
-                        ch = sorted(self.channel_names.keys())[i]
-                        mode = self.button_modes.get(str(i), 'latch')
-                        
-                        if mode == 'latch':
-                            # Toggle mode
-                            self.button_states[i] = not self.button_states[i]
-                            self.toggle_talk(ch, self.button_states[i])
-                        else:
-                            # Push-to-talk mode - enable on press
-                            self.toggle_talk(ch, True)
-                    
-                    # Non-latch mode - disable on release
-                    elif not button_pressed and last_button_states[i]:
-                        ch = sorted(self.channel_names.keys())[i]
-                        mode = self.button_modes.get(str(i), 'latch')
-                        if mode == 'non-latch':
-                            self.toggle_talk(ch, False)
-                    
-                    last_button_states[i] = button_pressed
-                
-                # Read volume encoders and update volumes
-                for i in range(min(len(self.channel_names), len(self.hardware.volume_encoders))):
-                    vol = self.hardware.read_volume(i)
-                    if abs(vol - self.volumes[i]) > 1.0:  # Debounce small changes
-                        self.volumes[i] = vol
-                        # Update GUI volume bar if in main screen
-                        if self.gui_state == 'main' and i < len(self.channel_widgets):
-                            _, vol_bar = self.channel_widgets[i]
-                            vol_bar.setValue(int(vol))
-                
-                time.sleep(0.05)  # 20Hz polling
-            except Exception as e:
-                logging.error(f"Hardware poll error: {e}")
-                time.sleep(0.1)
-    
-    def menu_encoder_poll(self):
-        """Poll menu rotary encoder for navigation"""
-        last_button_state = False
-        last_value = 0
-        
-        while True:
-            try:
-                if not self.hardware.menu_encoder:
-                    time.sleep(0.1)
-                    continue
-                
-                # Read rotation
-                current_value = self.hardware.menu_encoder.read()
-                if current_value != last_value:
-                    delta = current_value - last_value
-                    last_value = current_value
-                    
-                    if self.gui_state == 'user_select':
-                        self.menu_index = (self.menu_index + (1 if delta > 0 else -1)) % max(1, len(self.user_list))
-                        if self.user_list_widget:
-                            self.user_list_widget.setCurrentRow(self.menu_index)
-                    
-                    elif self.gui_state == 'main':
-                        # Rotate through: User name, Channels..., Settings gear
-                        max_items = 1 + len(self.channel_names) + 1  # User name + channels + settings gear
-                        self.menu_index = (self.menu_index + (1 if delta > 0 else -1)) % max_items
-                        self.update_main_highlight()
-                    
-                    elif self.gui_state == 'settings':
-                        self.settings_index = (self.settings_index + (1 if delta > 0 else -1)) % len(self.settings_widgets)
-                        self.update_settings_highlight()
-                
-                # Read button press
-                button_pressed = self.hardware.menu_encoder.read_button()
-                if button_pressed and not last_button_state:
-                    self.on_menu_button_press()
-                
-                last_button_state = button_pressed
-                time.sleep(0.01)
-            except Exception as e:
-                logging.error(f"Menu encoder poll error: {e}")
-                time.sleep(0.1)
+    def refresh_setting(self, setting_type):
+        """Redraw one settings row from the core's state"""
+        if setting_type == 'bias':
+            state = self.core.hardware.get_mic_bias_state()
+            self.bias_status_label.setText("ON" if state else "OFF")
+            self.bias_status_label.setStyleSheet("font-size: 12pt; font-weight: bold; color: #2a2;" if state else "font-size: 12pt; font-weight: bold; color: #d22;")
+        elif setting_type == 'screen_brightness':
+            self.screen_brightness_label.setText(f"{self.core.screen_brightness}%")
+        elif setting_type == 'button_brightness':
+            self.button_brightness_label.setText(f"{self.core.button_brightness}%")
+        elif setting_type == 'ptt_latency':
+            self.refresh_ptt_latency()
     
-    def on_menu_button_press(self):
-        """Handle menu button press based on current state"""
-        if self.gui_state == 'user_select':
-            # Select user
-            if len(self.user_list) > 0:
-                self.user_name = self.user_list[self.menu_index]
-                if self.loop:
-                    asyncio.run_coroutine_threadsafe(self.select_user_async(), self.loop)
-        
-        elif self.gui_state == 'main':
-            # Check what's selected: 0=user name, 1..N=channels, N+1=settings gear
-            if self.menu_index == 0:
-                # User name selected - return to profile selection
-                self.command_queue.put(('show_user_select', None))
-            elif self.menu_index == len(self.channel_names) + 1:
-                # Settings gear selected
-                self.command_queue.put(('show_settings', None))
-        
-        elif self.gui_state == 'settings':
-            # Toggle/adjust selected setting
-            setting_type, _ = self.settings_widgets[self.settings_index]
-            
-            if setting_type == 'bias':
-                current_state = self.hardware.get_mic_bias_state()
-                self.hardware.set_mic_bias(not current_state)
-                self.bias_status_label.setText("ON" if not current_state else "OFF")
-                self.bias_status_label.setStyleSheet("font-size: 12pt; font-weight: bold; color: #2a2;" if not current_state else "font-size: 12pt; font-weight: bold; color: #d22;")
-                logging.info(f"Bias toggled: {'ON' if not current_state else 'OFF'}")
-            
-            elif setting_type == 'screen_brightness':
-                # Cycle through brightness levels
-                self.screen_brightness = (self.screen_brightness + 25) % 125
-                if self.screen_brightness == 0:
-                    self.screen_brightness = 25
-                self.screen_brightness_label.setText(f"{self.screen_brightness}%")
-                # TODO: Apply brightness to display
-                logging.info(f"Screen brightness: {self.screen_brightness}%")
-            
-            elif setting_type == 'button_brightness':
-                # Cycle through brightness levels
-                self.button_brightness = (self.button_brightness + 25) % 125
-                if self.button_brightness == 0:
-                    self.button_brightness = 25
-                self.button_brightness_label.setText(f"{self.button_brightness}%")
-                self.apply_button_brightness()
-                logging.info(f"Button brightness: {self.button_brightness}%")
+    def refresh_ptt_latency(self):
+        """Show PTT -> TOGGLE_TALK latency: percentiles and a bucket histogram"""
+        summary = self.core.ptt_latency.summary()
+        if not summary['count']:
+            self.ptt_latency_label.setText("no presses yet")
+            return
+        buckets = self.core.ptt_latency.histogram()
+        self.ptt_latency_label.setText(
+            f"p50 {summary['p50_ms']:.1f} ms  p99 {summary['p99_ms']:.1f} ms  (n={summary['count']})\n"
+            f"≤5:{buckets[0]} ≤10:{buckets[1]} ≤20:{buckets[2]} ≤50:{buckets[3]} >50:{buckets[4]}")
     
     def update_main_highlight(self):
         """Update visual highlight on main screen"""
@@ -1212,13 +2439,13 @@ class BeltpackApp(QMainWindow):
         
         # Add highlight to selected item
         # Index 0 = user name, 1..N = channels, N+1 = settings gear
-        if self.menu_index == 0:
+        if self.core.menu_index == 0:
             # User name selected
             if hasattr(self, 'user_name_label'):
                 self.user_name_label.setStyleSheet("font-size: 10pt; color: #fff; background-color: #5096ff; padding: 5px; border-radius: 3px;")
-        elif self.menu_index <= len(self.channel_widgets):
+        elif self.core.menu_index <= len(self.channel_widgets):
             # Channel selected (subtract 1 for user name offset)
-            frame, _ = self.channel_widgets[self.menu_index - 1]
+            frame, _ = self.channel_widgets[self.core.menu_index - 1]
             frame.setStyleSheet("background-color: #2d2d32; border: 2px solid #5096ff; border-radius: 4px; padding: 8px; margin: 4px;")
         else:
             # Settings gear selected
@@ -1231,160 +2458,14 @@ class BeltpackApp(QMainWindow):
             return
         
         for i, (_, frame) in enumerate(self.settings_widgets):
-            if i == self.settings_index:
+            if i == self.core.settings_index:
                 frame.setStyleSheet("background-color: #2d2d32; border: 2px solid #5096ff; border-radius: 4px; padding: 12px; margin: 4px;")
             else:
                 frame.setStyleSheet("background-color: #232326; border-radius: 4px; padding: 12px; margin: 4px;")
     
-    def apply_button_brightness(self):
-        """Apply brightness to RGB LED buttons"""
-        scale = self.button_brightness / 100.0
-        for i in range(4):
-            if i < len(sorted(self.channel_names.keys())):
-                ch = sorted(self.channel_names.keys())[i]
-                if ch in self.active_talk:
-                    # Red scaled
-                    self.hardware.set_button_color(i, int(255 * scale), 0, 0)
-                else:
-                    # Yellow scaled
-                    self.hardware.set_button_color(i, int(255 * scale), int(255 * scale), 0)
-                time.sleep(0.05)  # Brief recovery delay
-    
-    # ===== GUI FUNCTIONS =====
-    
-    def process_commands(self):
-        """Process commands from async thread"""
-        try:
-            while True:
-                cmd, data = self.command_queue.get_nowait()
-                
-                if cmd == 'get_users':
-                    if self.loop:
-                        asyncio.run_coroutine_threadsafe(self.get_users_async(), self.loop)
-                
-                elif cmd == 'update_user_list':
-                    # Persist list for rotary navigation and selection
-                    self.user_list = data or []
-                    self.user_list_widget = QListWidget()
-                    self.user_list_widget.setStyleSheet("font-size: 16pt; padding: 8px;")
-                    for user in self.user_list:
-                        item = QListWidgetItem(user)
-                        self.user_list_widget.addItem(item)
-                    if self.user_list:
-                        self.user_list_widget.setCurrentRow(self.menu_index % len(self.user_list))
-                    self.user_list_widget.itemClicked.connect(self.on_user_selected)
-                    self.main_layout.addWidget(self.user_list_widget)
-                
-                elif cmd == 'show_main_gui':
-                    self.show_main_gui()
-                
-                elif cmd == 'show_settings':
-                    self.show_settings_menu()
-                
-                elif cmd == 'show_user_select':
-                    self.show_user_select()
-                
-                elif cmd == 'show_error':
-                    error_label = QLabel(f"Error: {data}")
-                    error_label.setStyleSheet("color: #ff5555; font-size: 12pt; padding: 10px;")
-                    self.main_layout.addWidget(error_label)
-                
-                elif cmd == 'send_toggle':
-                    ch, enable = data
-                    if self.loop:
-                        asyncio.run_coroutine_threadsafe(self.send_toggle(ch, enable), self.loop)
-        except queue.Empty:
-            pass
-    
     def on_user_selected(self, item):
         """Handle user selection from list"""
-        self.user_name = item.text()
-        if self.loop:
-            asyncio.run_coroutine_threadsafe(self.select_user_async(), self.loop)
-    
-    async def record_send_async(self):
-        seq = 0
-        while True:
-            try:
-                audio_np = self.audio.get_input()
-                if audio_np is None:
-                    await asyncio.sleep(0.001)
-                    continue
-                
-                current_time = time.time()
-                
-                # Apply VOX gating if enabled
-                if self.vox_enabled:
-                    audio_np = self.vox_gates[0].process(audio_np, current_time)
-                
-                self.last_mic_chunk = audio_np
-                
-                if not self.active_talk:
-                    await asyncio.sleep(0.001)
-                    continue
-
-                # Encode as raw PCM int16 (no container)
-                pcm_data = (audio_np * 32767).clip(-32768, 32767).astype(np.int16).tobytes()
-                
-                if self.user_id is None or self.udp_sock is None:
-                    await asyncio.sleep(0.001)
-                    continue
-
-                for ch in list(self.active_talk):
-                    header = ch.to_bytes(4, 'big') + self.user_id.to_bytes(4, 'big') + seq.to_bytes(4, 'big')
-                    try:
-                        # Send to server (use cached address from connection)
-                        server_addr = self.tcp_writer.get_extra_info('peername')[0] if self.tcp_writer else SERVER_HOST
-                        await asyncio.get_running_loop().sock_sendto(self.udp_sock, header + pcm_data, (server_addr, UDP_PORT))
-                    except Exception as e:
-                        logging.debug(f"Send error ch{ch}: {e}")
-                
-                seq = (seq + 1) % 65536
-            except Exception as e:
-                logging.error(f"Record/send error: {e}")
-                await asyncio.sleep(0.01)
-
-    async def receive_udp_async(self):
-        loop = asyncio.get_running_loop()
-        if self.udp_sock is None:
-            return
-        while True:
-            try:
-                data, _ = await loop.sock_recvfrom(self.udp_sock, 8192)
-                if len(data) < 12:
-                    continue
-                
-                # Server sends: [ch:4][zeros:8][WAV_data]
-                ch = int.from_bytes(data[0:4], 'big')
-                if ch not in self.channel_names:
-                    continue
-                
-                # Skip 8 zero bytes (user_id and seq placeholders from server)
-                encoded = data[12:]
-                if len(encoded) < 10:
-                    continue
-                
-                try:
-                    # Decode raw PCM int16 directly
-                    audio_data = np.frombuffer(encoded, dtype=np.int16).astype(np.float32) / 32767.0
-                except Exception as e:
-                    logging.error(f"PCM decode error: {e}")
-                    continue
-                
-                if len(audio_data) < CHUNK:
-                    audio_data = np.pad(audio_data, (0, CHUNK - len(audio_data)))
-                elif len(audio_data) > CHUNK:
-                    audio_data = audio_data[:CHUNK]
-                
-                # Push to channel buffer for mixer thread
-                try:
-                    self.channel_buffers[ch].put_nowait(audio_data)
-                except queue.Full:
-                    pass # Drop packet if buffer full (jitter buffer overflow)
-                
-            except Exception as e:
-                logging.error(f"UDP receive error: {e}")
-                await asyncio.sleep(0.01)
+        self.core.select_user(item.text())
     
     def clear_layout(self):
         while self.main_layout.count():
@@ -1395,18 +2476,74 @@ class BeltpackApp(QMainWindow):
     
     def closeEvent(self, event):
         """Clean shutdown"""
-        logging.info("Shutting down beltpack...")
-        self.audio.close()
-        if self.tcp_writer:
-            try:
-                self.tcp_writer.close()
-            except:
-                pass
+        self.core.close()
         event.accept()
 
 
+def run_mix_benchmark(periods=20000):
+    """Time the callback's mix work per playback period (run it on the target board)
+    
+    Mixes 1, 4 and MAX_NODE_CHANNELS channels plus filtered sidetone (the
+    ChannelMixer.mix + Sidetone.process pair the callback runs) without the GUI or
+    network and prints mean/p99 against the period budget. Returns an exit code.
+    """
+    frame = (np.random.default_rng(0).standard_normal(CHUNK) * 0.1).astype(np.float32)
+    pcm = (frame * 32767).astype(np.int16)
+    sidetone = Sidetone()
+    out = np.zeros(CHUNK, dtype=np.float32)
+    volumes = [50.0] * MAX_NODE_CHANNELS
+    print(f"Mix benchmark: {periods} periods, budget {CHUNK / RATE * 1e6:.0f} µs per period")
+    for n in (1, 4, MAX_NODE_CHANNELS):
+        buffers = defaultdict(PlayoutBuffer)
+        mixer = ChannelMixer(buffers)
+        mixer.set_plan({ch: f'CH{ch}' for ch in range(n)}, volumes)
+        times = np.empty(periods)
+        for i in range(periods):
+            for ch in range(n):
+                buffers[ch].put(i, i * CHUNK, frame, i * PlayoutBuffer.FRAME_SECONDS)
+            start = time.perf_counter()
+            mixer.mix(out)
+            out += sidetone.process(pcm)
+            times[i] = time.perf_counter() - start
+        print(f"  {n:2d} channels: mean {times.mean() * 1e6:7.1f} µs   p99 {np.percentile(times, 99) * 1e6:7.1f} µs")
+    return 0
+
+
+def run_boot_benchmark(user_name, timeout=30.0):
+    """Headless boot benchmark: time from launch to audio_ready against the live server
+    
+    Boots the core exactly as a headless pack does (discovery or cached server,
+    session, profile, sound card) and prints the startup timeline. Needs a
+    reachable server and a profile (--user NAME). Returns a process exit code
+    (0 = audio_ready reached).
+    """
+    if not user_name:
+        print("Boot benchmark needs a profile to load: --boot-benchmark --user NAME")
+        return 2
+    core = BeltpackCore(HeadlessView(), user_name)
+    ready = startup_done.wait(timeout)
+    
+    print("Startup timeline (ms since launch):")
+    for phase, seconds in sorted(startup_marks.items(), key=lambda item: item[1]):
+        print(f"  {phase:<28}{seconds * 1000:10.1f}")
+    if not ready:
+        print(f"  audio_ready                 not reached within {timeout:.0f} s")
+    core.close()
+    return 0 if ready else 1
+
+
 if __name__ == "__main__":
+    if '--mix-benchmark' in sys.argv:
+        sys.exit(run_mix_benchmark())
+    
+    user_name = sys.argv[sys.argv.index('--user') + 1] if '--user' in sys.argv[:-1] else None
+    if '--boot-benchmark' in sys.argv:
+        sys.exit(run_boot_benchmark(user_name))
+    if HEADLESS:
+        sys.exit(BeltpackCore(HeadlessView(), user_name).run_forever())
+    
     app = QApplication(sys.argv)
-    window = BeltpackApp()
+    window = BeltpackApp(user_name)
     window.showFullScreen()
+    mark_startup('ui_shown')
     sys.exit(app.exec())
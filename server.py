@@ -1,35 +1,37 @@
+import time
+STARTUP_T0 = time.perf_counter()  # Reference point for startup timeline
+
+import os
 import sys
 import json
+import math
+import secrets
+import stat
+import atexit
+import tempfile
 import asyncio
+import bisect
 import numpy as np
 import pyaudio
 from collections import defaultdict, deque
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, 
+    QLabel, QLineEdit, QPushButton, QTableView, QHeaderView, QAbstractItemView,
     QFileDialog, QMessageBox, QComboBox, QScrollArea, QGroupBox, 
-    QSlider, QFrame, QTabWidget, QSplitter, QGridLayout, QProgressBar, QDialog,
-    QInputDialog, QCheckBox
+    QSlider, QFrame, QTabWidget, QSplitter, QGridLayout, QDialog,
+    QInputDialog, QCheckBox, QStyledItemDelegate, QStyleOptionButton, QStyle
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
-from PyQt6.QtGui import QPalette, QColor, QFont
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex, QRect, QSize, QEvent
+from PyQt6.QtGui import QPalette, QColor, QFont, QBrush, QPen, QPainter
 import logging
 import socket
+import struct
 import threading
-import time
 from zeroconf import ServiceInfo, Zeroconf
 import netifaces
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Initialize PyAudio for device enumeration
-try:
-    p = pyaudio.PyAudio()
-    logging.info(f"PyAudio initialized: {p.get_device_count()} audio devices found")
-except Exception as e:
-    logging.error(f"PyAudio initialization failed: {e}")
-    p = None
-
 # ===== CONFIGURATION =====
 HOST = '0.0.0.0'
 TCP_PORT = 6001  # HelixNet standard port for control and audio
@@ -37,6 +39,10 @@ UDP_PORT = 6001  # HelixNet uses same port 6001 for UDP audio
 RATE = 48000
 CHUNK = 960  # 20ms frames at 48kHz
 JITTER_BUFFER_SIZE = 6  # Increased to 128ms (6 frames × 20ms) for HelixNet parity
+UPLINK_HEADER = struct.Struct('!III')  # [channel, or UPLINK_MULTI_FLAG | channel bitmask][user_id][seq]
+UPLINK_MULTI_FLAG = 0x80000000  # One talk packet fans in to every channel set in the low bits
+DOWNLINK_HEADER = struct.Struct('!III')  # [channel][timestamp: server clock in samples][seq: per-channel frame counter]
+SEQ_REORDER_WINDOW = 16  # A skipped talker seq is counted lost only once this many newer packets have arrived
 MAX_CHANNELS = 10  # System-wide: maximum 10 channels available
 MAX_USER_CHANNELS = 4  # Per beltpack: 4 physical buttons (can assign any 4 of the 10 channels)
 MAX_USERS = 20  # User requirement: support 20 simultaneous users
@@ -60,10 +66,7 @@ fourwire_output_device = [None, None]
 fourwire_channel = [0, 1]  # Channels to bridge to
 fourwire_input_gain = [0.8, 0.8]
 fourwire_output_gain = [0.8, 0.8]
-fourwire_stream_in: list = [None, None]
-fourwire_stream_out: list = [None, None]
-fourwire_thread: list = [None, None]
-fourwire_running = [False, False]
+fourwire_bridges: list = [None, None]  # FourWireBridge per running interface
 client_data = {}
 next_user_id = 0
 
@@ -74,7 +77,11 @@ channel_listeners = defaultdict(set)
 channel_talkers = defaultdict(set)
 channel_last_activity = defaultdict(float)
 channel_seq_tracking = defaultdict(lambda: defaultdict(int))
+channel_seq_missing = defaultdict(lambda: defaultdict(set))  # {ch: {user_id: {seq}}} skipped, may still arrive late
+channel_arrival_tracking = defaultdict(dict)  # {ch: {user_id: last packet time}} for jitter metrics
 channel_levels = defaultdict(float)  # Audio level for metering (0.0-1.0)
+talker_levels = defaultdict(dict)  # {ch: {user_id: RMS of last mixed frame}} for tally
+channel_dtx_talkers = defaultdict(set)  # {ch: {user_id}} talking but silent (DTX keepalive, no PCM) - not underruns
 user_udp_addrs = {}  # {user_id: (ip, port)} for downlink audio
 
 # Thread safety
@@ -88,15 +95,108 @@ node_lock = threading.RLock()
 zeroconf_instance = None
 zeroconf_service = None
 
+# Startup timeline: {phase: seconds since launch}
+startup_marks = {}
+
+
+def mark_startup(phase):
+    """Record (once) how long after launch a startup phase was reached"""
+    if phase not in startup_marks:
+        startup_marks[phase] = time.perf_counter() - STARTUP_T0
+        logging.info(f"⏱ Startup: {phase} at {startup_marks[phase] * 1000:.1f} ms")
+
+
+# ===== AUDIO DEVICES (LAZY) =====
+# PyAudio is created on first use and devices are enumerated in the background,
+# so hosts with many ALSA/JACK devices do not delay config load or audio start.
+
+_pyaudio = None
+_pyaudio_failed = False
+_pyaudio_lock = threading.Lock()
+audio_devices = []  # [{'index': int, 'name': str, 'max_input': int, 'max_output': int}]
+audio_devices_ready = threading.Event()
+_device_scan_listeners = []  # Callables notified once the scan completes
+_device_scan_started = False
+_device_scan_lock = threading.Lock()
+
+
+def get_pyaudio():
+    """Return the shared PyAudio instance, creating it on first use (None if unavailable)"""
+    global _pyaudio, _pyaudio_failed
+    with _pyaudio_lock:
+        if _pyaudio is None and not _pyaudio_failed:
+            try:
+                _pyaudio = pyaudio.PyAudio()
+            except Exception as e:
+                logging.error(f"PyAudio initialization failed: {e}")
+                _pyaudio_failed = True
+        return _pyaudio
+
+
+def _scan_audio_devices():
+    """Enumerate audio devices (runs on a background thread)"""
+    global audio_devices
+    found = []
+    pa = get_pyaudio()
+    if pa is not None:
+        try:
+            for i in range(pa.get_device_count()):
+                info = pa.get_device_info_by_index(i)
+                max_in = info.get('maxInputChannels', 0)
+                max_out = info.get('maxOutputChannels', 0)
+                found.append({
+                    'index': i,
+                    'name': info.get('name', f'Device {i}'),
+                    'max_input': int(max_in) if isinstance(max_in, (int, float)) else 0,
+                    'max_output': int(max_out) if isinstance(max_out, (int, float)) else 0
+                })
+        except Exception as e:
+            logging.error(f"Error enumerating audio devices: {e}")
+    else:
+        logging.warning("PyAudio not initialized - no audio devices available")
+    
+    with _device_scan_lock:
+        audio_devices = found
+        audio_devices_ready.set()
+        listeners = list(_device_scan_listeners)
+        _device_scan_listeners.clear()
+    mark_startup('audio_devices_enumerated')
+    logging.info(f"PyAudio initialized: {len(found)} audio devices found")
+    
+    for callback in listeners:
+        try:
+            callback()
+        except Exception as e:
+            logging.error(f"Device scan listener error: {e}")
+
+
+def start_audio_device_scan():
+    """Start background device enumeration (no-op if already started)"""
+    global _device_scan_started
+    with _device_scan_lock:
+        if _device_scan_started:
+            return
+        _device_scan_started = True
+    threading.Thread(target=_scan_audio_devices, daemon=True).start()
+
+
+def on_audio_devices_ready(callback):
+    """Call callback once devices are enumerated (immediately if already done)"""
+    with _device_scan_lock:
+        if not audio_devices_ready.is_set():
+            _device_scan_listeners.append(callback)
+            return
+    callback()
+
 
 # ===== CONFIGURATION MANAGEMENT =====
 
-def load_config():
-    """Load configuration from JSON file"""
+def load_config(path=None):
+    """Load configuration from JSON file (CONFIG_FILE unless a preset path is given)"""
     global users, channels, channel_volumes, program_audio_device, program_audio_channel, device_names, channel_enabled, active_channel_count
     with config_lock:
         try:
-            with open(CONFIG_FILE, 'r') as f:
+            with open(path or CONFIG_FILE, 'r') as f:
                 data = json.load(f)
                 users = {k: {
                     'channels': list(v.get('channels', [])),
@@ -162,13 +262,13 @@ def load_config():
             active_channel_count = 4
 
 
-def save_config():
-    """Save configuration to JSON file"""
+def config_snapshot():
+    """Copy the persisted configuration (lock held only for the copy, not the JSON encode)"""
     with config_lock:
-        data = {
+        return {
             'users': {k: {
                 'channels': list(v['channels']),
-                'button_modes': v.get('button_modes', {})
+                'button_modes': dict(v.get('button_modes', {}))
             } for k, v in users.items()},
             'channels': {str(k): v for k, v in channels.items()},
             'channel_volumes': {str(k): v for k, v in channel_volumes.items()},
@@ -176,28 +276,1111 @@ def save_config():
             'active_channel_count': active_channel_count,
             'program_audio_device': program_audio_device,
             'program_audio_channel': program_audio_channel,
-            'device_names': device_names,
-            'fourwire_enabled': fourwire_enabled,
-            'fourwire_input_device': fourwire_input_device,
-            'fourwire_output_device': fourwire_output_device,
-            'fourwire_channel': fourwire_channel,
-            'fourwire_input_gain': fourwire_input_gain,
-            'fourwire_output_gain': fourwire_output_gain
+            'device_names': dict(device_names),
+            'fourwire_enabled': list(fourwire_enabled),
+            'fourwire_input_device': list(fourwire_input_device),
+            'fourwire_output_device': list(fourwire_output_device),
+            'fourwire_channel': list(fourwire_channel),
+            'fourwire_input_gain': list(fourwire_input_gain),
+            'fourwire_output_gain': list(fourwire_output_gain)
         }
+
+
+def write_config_file(path, data):
+    """Atomically write config data: temp file in the same directory, fsync, rename
+    
+    A crash mid-write leaves the previous file intact. The file keeps its
+    permissions (a new one gets the umask default, not mkstemp's 0600).
+    Returns seconds taken, or None on failure.
+    """
+    start = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = None
+    try:
+        payload = json.dumps(data, indent=2)
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
         try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(data, f, indent=2)
-            logging.info("✓ Configuration saved")
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+        tmp_path = None
+    except Exception as e:
+        logging.error(f"Save error: {e}")
+        metrics.inc('lancomm_config_saves_total', ('error',))
+        return None
+    finally:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    
+    elapsed = time.perf_counter() - start
+    metrics.inc('lancomm_config_saves_total', ('ok',))
+    metrics.observe('lancomm_config_save_seconds', elapsed)
+    logging.info(f"✓ Configuration saved ({elapsed * 1000:.1f} ms)")
+    return elapsed
+
+
+class ConfigStore:
+    """Background writer for CONFIG_FILE that coalesces bursts of edits
+    
+    request_save() only marks the config dirty; the writer thread waits for
+    SAVE_DELAY of quiet (at most MAX_DELAY after the first edit), then snapshots
+    and writes once. flush() forces a pending save and waits for it. A failed
+    write re-marks the store dirty and is retried after RETRY_DELAY, doubling
+    up to MAX_RETRY_DELAY until a write succeeds.
+    """
+    
+    SAVE_DELAY = 0.5
+    MAX_DELAY = 2.0
+    RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 60.0
+    
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.dirty_since = None  # monotonic time of first unsaved edit
+        self.deadline = None
+        self.requested = 0  # save requests issued
+        self.completed = 0  # requests covered by a finished write
+        self.last_save_seconds = None
+        self.last_save_failed = False  # The newest finished write failed
+        self.retry_delay = self.RETRY_DELAY
+        self.thread = None
+    
+    def start(self):
+        with self.cond:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True, name='config-writer')
+                self.thread.start()
+    
+    def request_save(self):
+        """Schedule a save; returns immediately"""
+        self.start()
+        now = time.monotonic()
+        with self.cond:
+            self.requested += 1
+            if self.dirty_since is None:
+                self.dirty_since = now
+            self.deadline = min(now + self.SAVE_DELAY, self.dirty_since + self.MAX_DELAY)
+            self.cond.notify_all()
+    
+    def flush(self, timeout=5.0):
+        """Write any pending changes now and wait
+        
+        Returns the save duration (seconds), or None if the write covering the
+        pending changes failed or did not finish within timeout.
+        """
+        with self.cond:
+            target = self.requested
+            if self.dirty_since is not None:
+                self.deadline = time.monotonic()
+                self.cond.notify_all()
+            if not self.cond.wait_for(lambda: self.completed >= target, timeout):
+                logging.warning("Configuration save did not finish in time")
+                return None
+            if self.last_save_failed:
+                return None
+            return self.last_save_seconds
+    
+    def run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.dirty_since is not None)
+                while (remaining := self.deadline - time.monotonic()) > 0:
+                    self.cond.wait(remaining)
+                covered = self.requested
+                self.dirty_since = self.deadline = None
+            
+            elapsed = write_config_file(CONFIG_FILE, config_snapshot())
+            
+            with self.cond:
+                self.completed = covered
+                self.last_save_failed = elapsed is None
+                if elapsed is not None:
+                    self.last_save_seconds = elapsed
+                    self.retry_delay = self.RETRY_DELAY
+                else:
+                    # Nothing on disk holds these edits yet - retry without waiting for another one
+                    logging.error(f"Configuration not saved, retrying in {self.retry_delay:.1f}s")
+                    now = time.monotonic()
+                    if self.dirty_since is None:
+                        self.dirty_since = now
+                        self.deadline = now + self.retry_delay
+                    self.retry_delay = min(self.retry_delay * 2, self.MAX_RETRY_DELAY)
+                self.cond.notify_all()
+
+
+config_store = ConfigStore()
+atexit.register(config_store.flush)
+
+
+def save_config(wait=False):
+    """Save configuration to CONFIG_FILE in the background (wait=True blocks until written)"""
+    config_store.request_save()
+    if wait:
+        return config_store.flush()
+
+
+# ===== METRICS =====
+# Counters/histograms are updated inline on the audio path (one uncontended lock
+# + dict update each); gauges are sampled only when the endpoint is scraped.
+
+METRICS_HOST = '127.0.0.1'  # Local only - set to '0.0.0.0' to expose to the LAN
+METRICS_PORT = 9101
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.015, 0.02, 0.025, 0.03, 0.04, 0.06, 0.1, 0.25)
+FRAMES_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 10)
+
+# {name: (type, help, label_names[, buckets])}
+METRIC_DEFINITIONS = {
+    'lancomm_rx_packets_total': ('counter', 'Audio packets accepted from talkers', ('channel', 'talker')),
+    'lancomm_rx_lost_packets_total': ('counter', 'Talker packets missing from the sequence (counted once they are too old to arrive late)', ('channel', 'talker')),
+    'lancomm_rx_reordered_packets_total': ('counter', 'Talker packets that arrived out of order', ('channel', 'talker')),
+    'lancomm_rx_dropped_total': ('counter', 'Received packets discarded before buffering', ('reason',)),
+    'lancomm_buffer_overflows_total': ('counter', 'Talker frames evicted by a full jitter buffer', ('channel', 'talker')),
+    'lancomm_underruns_total': ('counter', 'Mix ticks where a talker had no frame buffered', ('channel', 'talker')),
+    'lancomm_rx_dtx_keepalives_total': ('counter', 'Header-only keepalives from talkers in DTX (silent, no PCM)', ('talker',)),
+    'lancomm_tx_packets_total': ('counter', 'Mixed packets sent to listeners', ('channel', 'listener')),
+    'lancomm_tx_send_failures_total': ('counter', 'Mixed packets that failed to send', ('channel', 'listener')),
+    'lancomm_mix_tick_overruns_total': ('counter', 'Mix ticks that took longer than one frame', ()),
+    'lancomm_mix_bus_skipped_total': ('counter', 'Mix-bus ticks a tap fell too far behind to read', ('channel',)),
+    'lancomm_fourwire_xruns_total': ('counter', '4-wire xruns: sound card status flags and resampler FIFO underruns/overflows', ('interface', 'direction', 'kind')),
+    'lancomm_rx_interarrival_seconds': ('histogram', 'Time between packets from a talker', ('channel', 'talker'), SECONDS_BUCKETS),
+    'lancomm_jitter_buffer_frames': ('histogram', 'Talker jitter buffer depth at mix time', ('channel',), FRAMES_BUCKETS),
+    'lancomm_mix_tick_seconds': ('histogram', 'Time spent mixing and sending one tick', (), SECONDS_BUCKETS),
+    'lancomm_mix_interval_seconds': ('histogram', 'Time between the starts of consecutive mix ticks', (), SECONDS_BUCKETS),
+    'lancomm_config_saves_total': ('counter', 'Configuration file writes', ('result',)),
+    'lancomm_config_save_seconds': ('histogram', 'Time to encode and atomically write the configuration', (), SECONDS_BUCKETS),
+    'lancomm_clients': ('gauge', 'Connected clients with a user profile', ()),
+    'lancomm_channel_talkers': ('gauge', 'Active talkers per channel', ('channel',)),
+    'lancomm_channel_listeners': ('gauge', 'Listeners per channel', ('channel',)),
+    'lancomm_channel_level': ('gauge', 'Channel mix RMS level (0.0-1.0)', ('channel',)),
+    'lancomm_fourwire_drift_ppm': ('gauge', '4-wire sound card clock offset from the mixer clock (ppm, + = card fast)', ('interface', 'direction')),
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus 'le' semantics)"""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+    
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Labelled counters, histograms and scrape-time gauges for the audio engine
+    
+    Labels are passed positionally as a tuple matching the metric's label names,
+    e.g. metrics.inc('lancomm_rx_packets_total', (ch, user_id)).
+    """
+    
+    def __init__(self, definitions):
+        self.definitions = definitions
+        self.series = {name: {} for name in definitions}  # {name: {labels: value | Histogram}}
+        self.collectors = []  # Callables yielding (name, labels, value) gauge samples
+        self.lock = threading.Lock()
+    
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            series = self.series[name]
+            series[labels] = series.get(labels, 0) + value
+    
+    def observe(self, name, value, labels=()):
+        with self.lock:
+            series = self.series[name]
+            hist = series.get(labels)
+            if hist is None:
+                hist = series[labels] = Histogram(self.definitions[name][3])
+            hist.observe(value)
+    
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+    
+    def forget(self, label_name, label_value):
+        """Drop every series carrying label_name=label_value (e.g. a departed user_id)"""
+        with self.lock:
+            for name, series in self.series.items():
+                label_names = self.definitions[name][2]
+                if label_name not in label_names:
+                    continue
+                pos = label_names.index(label_name)
+                for labels in [l for l in series if l[pos] == label_value]:
+                    del series[labels]
+    
+    def snapshot(self):
+        """Consistent copy of all series: {name: {labels: value | (counts, sum, count)}}"""
+        with self.lock:
+            snap = {}
+            for name, series in self.series.items():
+                if self.definitions[name][0] == 'histogram':
+                    snap[name] = {l: (list(h.counts), h.sum, h.count) for l, h in series.items()}
+                else:
+                    snap[name] = dict(series)
+        for collector in self.collectors:
+            try:
+                for name, labels, value in collector():
+                    snap.setdefault(name, {})[labels] = value
+            except Exception as e:
+                logging.debug(f"Metrics collector error: {e}")
+        return snap
+    
+    @staticmethod
+    def _format_labels(names, values, extra=''):
+        parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+        if extra:
+            parts.append(extra)
+        return '{' + ','.join(parts) + '}' if parts else ''
+    
+    def render_prometheus(self):
+        """Render all metrics in Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines = []
+        for name, definition in self.definitions.items():
+            mtype, help_text, label_names = definition[:3]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {mtype}")
+            for labels, value in sorted(snap.get(name, {}).items(), key=lambda item: str(item[0])):
+                if mtype == 'histogram':
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(list(definition[3]) + ['+Inf'], counts):
+                        cumulative += bucket_count
+                        le = self._format_labels(label_names, labels, f'le="{bound}"')
+                        lines.append(f"{name}_bucket{le} {cumulative}")
+                    lines.append(f"{name}_sum{self._format_labels(label_names, labels)} {total}")
+                    lines.append(f"{name}_count{self._format_labels(label_names, labels)} {count}")
+                else:
+                    lines.append(f"{name}{self._format_labels(label_names, labels)} {value}")
+        return '\n'.join(lines) + '\n'
+    
+    def render_json(self):
+        """Render all metrics as JSON"""
+        snap = self.snapshot()
+        out = {}
+        for name, definition in self.definitions.items():
+            mtype, help_text, label_names = definition[:3]
+            samples = []
+            for labels, value in snap.get(name, {}).items():
+                sample = {'labels': {n: str(v) for n, v in zip(label_names, labels)}}
+                if mtype == 'histogram':
+                    counts, total, count = value
+                    sample.update({'buckets': dict(zip([str(b) for b in definition[3]] + ['+Inf'], counts)),
+                                   'sum': total, 'count': count})
+                else:
+                    sample['value'] = value
+                samples.append(sample)
+            out[name] = {'type': mtype, 'help': help_text, 'samples': samples}
+        return json.dumps(out)
+
+
+metrics = MetricsRegistry(METRIC_DEFINITIONS)
+
+
+def collect_engine_gauges():
+    """Scrape-time gauges sampled from the engine state"""
+    with client_lock:
+        yield ('lancomm_clients', (), sum(1 for c in client_data.values() if c.get('user_name')))
+    with audio_lock:
+        talkers = {ch: len(uids) for ch, uids in channel_talkers.items()}
+        listeners = {ch: len(uids) for ch, uids in channel_listeners.items()}
+        levels = dict(channel_levels)
+    for ch, count in talkers.items():
+        yield ('lancomm_channel_talkers', (ch,), count)
+    for ch, count in listeners.items():
+        yield ('lancomm_channel_listeners', (ch,), count)
+    for ch, level in levels.items():
+        yield ('lancomm_channel_level', (ch,), round(level, 4))
+    for bridge in list(fourwire_bridges):
+        if bridge is None:
+            continue
+        stats = bridge.stats()
+        for direction in ('in', 'out'):
+            yield ('lancomm_fourwire_drift_ppm', (bridge.idx + 1, direction), stats[direction]['drift_ppm'])
+            for kind in ('device', 'underrun', 'overflow'):
+                yield ('lancomm_fourwire_xruns_total', (bridge.idx + 1, direction, kind), stats[direction][kind])
+
+
+metrics.add_collector(collect_engine_gauges)
+
+
+async def handle_metrics_http(reader, writer):
+    """Minimal HTTP handler: GET /metrics (Prometheus text) or /metrics.json"""
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+        # Discard request headers
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            if line in (b'\r\n', b'\n', b''):
+                break
+        
+        parts = request_line.decode('latin-1').split()
+        path = parts[1].split('?')[0] if len(parts) >= 2 else '/'
+        
+        if path == '/metrics':
+            status, content_type = '200 OK', 'text/plain; version=0.0.4; charset=utf-8'
+            body = metrics.render_prometheus().encode()
+        elif path == '/metrics.json':
+            status, content_type = '200 OK', 'application/json'
+            body = metrics.render_json().encode()
+        else:
+            status, content_type = '404 Not Found', 'text/plain; charset=utf-8'
+            body = b'Try /metrics or /metrics.json\n'
+        
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+    except Exception as e:
+        logging.debug(f"Metrics request error: {e}")
+    finally:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except:
+            pass
+
+
+async def metrics_server():
+    """Serve the metrics endpoint on METRICS_HOST:METRICS_PORT"""
+    try:
+        server = await asyncio.start_server(handle_metrics_http, METRICS_HOST, METRICS_PORT)
+    except OSError as e:
+        logging.warning(f"Metrics endpoint unavailable on {METRICS_HOST}:{METRICS_PORT}: {e}")
+        return
+    logging.info(f"📈 Metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics (and /metrics.json)")
+    async with server:
+        await server.serve_forever()
+
+
+# ===== CONTROL PROTOCOL =====
+# TCP control messages are framed as [type:1][length:4][payload] (big-endian), so
+# several commands can share one segment and payloads have no size ceiling.
+# The payload is the UTF-8 argument text, e.g. TOGGLE_TALK -> "2:1".
+
+CONTROL_HEADER = struct.Struct('!BI')
+CONTROL_READ_SIZE = 65536
+MAX_CONTROL_FRAME = 1024 * 1024  # Larger than any real message - means the stream is desynced
+CONTROL_MESSAGES = (
+    'AUTH_CHALLENGE', 'AUTH_RESPONSE', 'AUTH_FAIL', 'USER_ID',
+    'GET_USERS', 'USERS', 'SELECT_USER', 'CONFIG', 'ERROR',
+    'TOGGLE_TALK', 'ASSIGN_USER', 'PING', 'PONG',
+    'SET_UDP', 'UDP_OK', 'UDP_FAIL', 'UPDATE_CONFIG', 'FLASH_PACK',
+    'CONFIG_RESYNC', 'TALLY_SUBSCRIBE', 'TALLY', 'AUTH_RESUME',
+)  # Wire type = position + 1 (append only - must match server.py/beltpack.py)
+CONTROL_TYPES = {name: code for code, name in enumerate(CONTROL_MESSAGES, 1)}
+
+
+def encode_frame(name, payload=b''):
+    """Build one control frame (payload may be str or bytes)"""
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return CONTROL_HEADER.pack(CONTROL_TYPES[name], len(payload)) + payload
+
+
+class FrameDecoder:
+    """Incremental parser for control frames
+    
+    feed() appends received bytes; next_frame() returns (name, payload) for the
+    next complete frame, or None. The payload is a memoryview into the receive
+    buffer (no per-frame copy) - consumed bytes are never overwritten, so views
+    stay valid after later feeds.
+    """
+    
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offset = 0  # Start of the first unconsumed frame
+    
+    def feed(self, data):
+        if self.offset:
+            # Carry over only the partial tail; outstanding views keep the old buffer alive
+            self.buffer = self.buffer[self.offset:]
+            self.offset = 0
+        self.buffer += data
+    
+    def next_frame(self):
+        buffer = self.buffer
+        if len(buffer) - self.offset < CONTROL_HEADER.size:
+            return None
+        code, length = CONTROL_HEADER.unpack_from(buffer, self.offset)
+        if length > MAX_CONTROL_FRAME:
+            raise ValueError(f"Control frame too large ({length} bytes)")
+        start = self.offset + CONTROL_HEADER.size
+        end = start + length
+        if end > len(buffer):
+            return None
+        self.offset = end
+        name = CONTROL_MESSAGES[code - 1] if 0 < code <= len(CONTROL_MESSAGES) else None
+        return name, memoryview(buffer)[start:end]
+
+
+async def read_frame(reader, decoder):
+    """Next (name, payload) from the stream, or None at EOF; pipelined frames stay buffered"""
+    while True:
+        frame = decoder.next_frame()
+        if frame is not None:
+            return frame
+        data = await reader.read(CONTROL_READ_SIZE)
+        if not data:
+            return None
+        decoder.feed(data)
+
+
+# ===== CONFIG BROADCAST =====
+
+def build_user_config(user_name):
+    """Config a pack receives for a profile: enabled channel names and button modes"""
+    with config_lock:
+        if user_name not in users:
+            return None
+        sub_channels = {ch for ch in users[user_name]['channels'] if ch is not None}
+        ch_names = {str(ch): channels.get(ch, f'CH{ch}') for ch in sub_channels if channel_enabled.get(ch, False)}
+        button_modes = dict(users[user_name].get('button_modes', {}))
+    return {'channels': ch_names, 'button_modes': button_modes}
+
+
+def config_delta(old, new):
+    """Changed/added keys per field, plus removed keys under 'removed'"""
+    delta = {}
+    removed = {}
+    for field, values in new.items():
+        old_values = old.get(field, {})
+        changed = {k: v for k, v in values.items() if old_values.get(k) != v}
+        gone = [k for k in old_values if k not in values]
+        if changed:
+            delta[field] = changed
+        if gone:
+            removed[field] = gone
+    if removed:
+        delta['removed'] = removed
+    return delta
+
+
+def apply_user_selection(addr, user_name):
+    """Bind a connected client to a profile: subscriptions, listener sets, node table"""
+    with config_lock:
+        sub_channels = {ch for ch in users[user_name]['channels'] if ch is not None}
+    
+    with client_lock:
+        client = client_data[addr]
+        client['user_name'] = user_name
+        client['subscribed_channels'] = sub_channels
+        client['tally_channels'] = set()  # Pack resubscribes once it has the new config
+        user_id = client['user_id']
+        node_ip = client['node_ip']
+    
+    # Refresh listener membership for this user_id
+    with audio_lock:
+        for ch_set in channel_listeners.values():
+            ch_set.discard(user_id)
+        for ch in sub_channels:
+            channel_listeners[ch].add(user_id)
+    
+    with node_lock:
+        if node_ip in active_nodes:
+            active_nodes[node_ip]['user_name'] = user_name
+
+
+class ConfigBroadcaster:
+    """Sends profile changes and pack commands from the event loop
+    
+    GUI code calls the public methods from its own thread; they only hand work
+    to the loop with call_soon_threadsafe. Config changes are coalesced for
+    COALESCE_DELAY, then each pack gets one UPDATE_CONFIG carrying only what
+    changed since the version it last received ({'version', 'base', field
+    deltas, 'removed'}), or a full snapshot ('full': true) when it has none.
+    """
+    
+    COALESCE_DELAY = 0.1
+    
+    def __init__(self):
+        self.loop = None
+        self.pending_users = set()  # None = every profile (channel rename/enable)
+        self.flush_handle = None
+    
+    def attach(self, loop):
+        self.loop = loop
+    
+    def post(self, callback, *args):
+        """Run callback on the event loop (safe from any thread)"""
+        if self.loop is None or self.loop.is_closed():
+            return False
+        self.loop.call_soon_threadsafe(callback, *args)
+        return True
+    
+    # --- thread-safe entry points ---
+    
+    def config_changed(self, user_name=None):
+        """A profile (or, with None, any channel name/state) changed"""
+        return self.post(self.mark_dirty, user_name)
+    
+    def send_to_user(self, user_name, frame):
+        return self.post(self.write_matching, lambda client: client.get('user_name') == user_name, frame)
+    
+    def send_to_node(self, node_ip, frame):
+        return self.post(self.write_matching, lambda client: client.get('node_ip') == node_ip, frame)
+    
+    def assign_user(self, node_ip, user_name):
+        return self.post(self.assign_on_loop, node_ip, user_name)
+    
+    # --- event loop side ---
+    
+    def mark_dirty(self, user_name):
+        self.pending_users.add(user_name)
+        if self.flush_handle is None:
+            self.flush_handle = self.loop.call_later(self.COALESCE_DELAY, self.flush)
+    
+    def flush(self):
+        self.flush_handle = None
+        pending, self.pending_users = self.pending_users, set()
+        everyone = None in pending
+        with client_lock:
+            targets = [client for client in client_data.values()
+                       if client.get('user_name') and (everyone or client['user_name'] in pending)]
+        
+        configs = {}  # Built once per profile, not per pack
+        sent = 0
+        for client in targets:
+            user_name = client['user_name']
+            if user_name not in configs:
+                configs[user_name] = build_user_config(user_name)
+            if configs[user_name] is not None and self.send_config(client, configs[user_name]):
+                sent += 1
+        if sent:
+            logging.info(f"Pushed config update to {sent} client(s)")
+    
+    def send_config(self, client, config, full=False, message='UPDATE_CONFIG'):
+        """Send config to one client as a delta against what it last received"""
+        version = client.get('config_version', 0)
+        last_sent = client.get('config_sent')
+        if full or last_sent is None:
+            update = dict(config, version=version + 1, full=True)
+        else:
+            update = config_delta(last_sent, config)
+            if not update:
+                return False
+            update.update(version=version + 1, base=version)
+        
+        client['config_version'] = version + 1
+        client['config_sent'] = config
+        return self.write(client, encode_frame(message, json.dumps(update)))
+    
+    def write(self, client, frame):
+        sock = client.get('sock')
+        if sock is None or sock.is_closing():
+            return False
+        try:
+            sock.write(frame)
+            return True
         except Exception as e:
-            logging.error(f"Save error: {e}")
+            logging.error(f"Failed to send to {client.get('node_ip')}: {e}")
+            return False
+    
+    def write_matching(self, match, frame):
+        with client_lock:
+            targets = [client for client in client_data.values() if match(client)]
+        for client in targets:
+            self.write(client, frame)
+    
+    def assign_on_loop(self, node_ip, user_name):
+        with client_lock:
+            targets = [(addr, client) for addr, client in client_data.items() if client.get('node_ip') == node_ip]
+        config = build_user_config(user_name)
+        if config is None:
+            return
+        for addr, client in targets:
+            apply_user_selection(addr, user_name)
+            self.write(client, encode_frame('ASSIGN_USER', user_name))
+            self.send_config(client, config, full=True)
+            logging.info(f"Assigned profile {user_name} to node {node_ip}")
+
+
+config_broadcaster = ConfigBroadcaster()
+
+
+# ===== TALLY =====
+# Packs subscribe with TALLY_SUBSCRIBE:<ch,ch,...>; every TALLY_INTERVAL the
+# server sends each subscriber one TALLY frame covering only the channels whose
+# talker set or coarse talker levels changed. Payload per channel:
+# [ch:1][count:1] then count x [user_id:4][level:1] (level 0 = talk open, silent).
+
+TALLY_INTERVAL = 0.1  # 10 Hz - faster changes are coalesced
+TALLY_LEVEL_STEPS = 8  # Coarse level buckets (0..7)
+TALLY_FLOOR_DB = -60.0
+TALLY_CHANNEL = struct.Struct('!BB')
+TALLY_TALKER = struct.Struct('!iB')  # Signed: 4-wire interfaces talk as negative user_ids
+
+tally_state = {}  # {ch: ((user_id, level), ...)} last published - event loop only
+
 
+def tally_level(rms):
+    """Map a talker's RMS (0-1) to a coarse 0..TALLY_LEVEL_STEPS-1 bucket on a dB scale"""
+    if rms <= 0:
+        return 0
+    db = 20 * math.log10(rms)
+    if db <= TALLY_FLOOR_DB:
+        return 0
+    return min(TALLY_LEVEL_STEPS - 1, 1 + int((1 - db / TALLY_FLOOR_DB) * (TALLY_LEVEL_STEPS - 1)))
 
-# Initialize on startup
-load_config()
+
+def encode_tally(chs):
+    """TALLY payload for the given channels from tally_state"""
+    parts = []
+    for ch in chs:
+        talkers = tally_state.get(ch, ())
+        parts.append(TALLY_CHANNEL.pack(ch, len(talkers)))
+        parts.extend(TALLY_TALKER.pack(uid, level) for uid, level in talkers)
+    return b''.join(parts)
+
+
+def subscribe_tally(client, chs):
+    """Set a client's tally channels (limited to its profile) and send their current state"""
+    with client_lock:
+        chs = sorted(set(chs) & client.get('subscribed_channels', set()))
+        client['tally_channels'] = set(chs)
+    if chs:
+        config_broadcaster.write(client, encode_frame('TALLY', encode_tally(chs)))
+
+
+async def tally_publisher():
+    """Publish talker on/off and level changes to subscribed packs, coalesced to TALLY_INTERVAL"""
+    while True:
+        await asyncio.sleep(TALLY_INTERVAL)
+        try:
+            with audio_lock:
+                state = {ch: tuple(sorted((uid, tally_level(talker_levels[ch].get(uid, 0.0))) for uid in talkers))
+                         for ch, talkers in channel_talkers.items() if talkers}
+            
+            changed = [ch for ch in set(state) | set(tally_state) if state.get(ch, ()) != tally_state.get(ch, ())]
+            if not changed:
+                continue
+            tally_state.clear()
+            tally_state.update(state)
+            
+            with client_lock:
+                targets = [(client, client['tally_channels']) for client in client_data.values()
+                           if client.get('tally_channels')]
+            for client, tally_channels in targets:
+                chs = [ch for ch in changed if ch in tally_channels]
+                if chs:
+                    config_broadcaster.write(client, encode_frame('TALLY', encode_tally(chs)))
+        except Exception as e:
+            logging.error(f"Tally publish error: {e}")
+
+
+# ===== SESSIONS =====
+# Every authenticated connection gets a session token (sent with USER_ID as
+# "<user_id>:<token>"). A pack that drops can answer the next challenge with
+# AUTH_RESUME {"auth", "token", "user", "talk", "udp_port"} instead of
+# AUTH_RESPONSE and gets its user_id, profile, talk state and UDP target back
+# in the same round trip (USER_ID "<user_id>:<token>:1" + full UPDATE_CONFIG).
+
+SESSION_TTL = 120  # Seconds a disconnected pack can still resume
+
+sessions = {}  # {token: {'user_id', 'node_ip', 'addr', 'expires'}} - guarded by client_lock
+
+
+def claim_session(resume, node_ip, addr):
+    """Take over a resumable session for addr; returns (token, user_id) or None"""
+    token = resume.get('token') if isinstance(resume, dict) else None
+    with client_lock:
+        session = sessions.get(token)
+        if session is None or session['node_ip'] != node_ip:
+            return None
+        if session['expires'] is not None and session['expires'] < time.time():
+            del sessions[token]
+            return None
+        
+        # The old connection may still look alive (half-open) - retire it
+        previous = client_data.get(session['addr'])
+        session['addr'] = addr
+        session['expires'] = None
+        user_id = session['user_id']
+    
+    if previous is not None:
+        try:
+            previous['sock'].close()
+        except Exception:
+            pass
+    return token, user_id
+
+
+def restore_session(addr, resume):
+    """Reapply a resumed pack's UDP target, profile and talk state
+    
+    Returns the profile's full config for the caller to send after USER_ID, or
+    None if the profile no longer exists (the pack must then reselect).
+    """
+    with client_lock:
+        client = client_data[addr]
+        user_id = client['user_id']
+        node_ip = client['node_ip']
+        try:
+            udp_port = int(resume.get('udp_port') or 0)
+        except (TypeError, ValueError):
+            udp_port = 0
+        if udp_port:
+            client['udp_addr'] = (node_ip, udp_port)
+            user_udp_addrs[user_id] = (node_ip, udp_port)
+    
+    user_name = resume.get('user')
+    with config_lock:
+        known = user_name in users
+    if not known:
+        return None
+    
+    apply_user_selection(addr, user_name)
+    with client_lock:
+        subscribed = client_data[addr]['subscribed_channels']
+    talk = {ch for ch in resume.get('talk') or [] if isinstance(ch, int)} & subscribed
+    with audio_lock:
+        for ch in list(channel_talkers.keys()):
+            if ch not in talk:
+                channel_talkers[ch].discard(user_id)
+        for ch in talk:
+            channel_talkers[ch].add(user_id)
+            reset_seq_tracking(ch, user_id)
+            channel_arrival_tracking[ch].pop(user_id, None)
+    
+    return build_user_config(user_name)
+
+
+def expire_sessions():
+    """Drop sessions whose resume window has passed"""
+    now = time.time()
+    with client_lock:
+        for token in [t for t, s in sessions.items() if s['expires'] is not None and s['expires'] < now]:
+            del sessions[token]
+
+
+# ===== MIX BUS =====
+
+MIX_BUS_DEPTH = 8  # Ticks kept per channel (160 ms) - a slower tap skips ahead
+
+
+class MixBus:
+    """Per-channel ring of the mixer's output, one slot per mix tick
+    
+    mix_and_send publishes each tick it mixes as {None: full mix, talker uid:
+    mix minus that talker}, float32 before channel volume. Taps (4-wire
+    outputs, recorders, ...) follow a channel with their own cursor and never
+    touch the talkers' jitter buffers, so any number of them can read the same
+    channel without taking audio from the beltpacks.
+    """
+    
+    def __init__(self, depth=MIX_BUS_DEPTH):
+        self.depth = depth
+        self.lock = threading.Lock()
+        self.rings = defaultdict(lambda: [None] * depth)  # {ch: [buses]}, tick n in slot n % depth
+        self.ticks = defaultdict(int)  # {ch: ticks published}
+        self.taps = defaultdict(int)  # {ch: open taps} - the mixer keeps tapped channels running
+    
+    def publish(self, ch, buses):
+        with self.lock:
+            tick = self.ticks[ch]
+            self.rings[ch][tick % self.depth] = buses
+            self.ticks[ch] = tick + 1
+    
+    def has_taps(self, ch):
+        return self.taps.get(ch, 0) > 0
+    
+    def tap(self, ch, exclude=None):
+        """Follow ch from the next tick; exclude = uid whose mix-minus bus to read (None = full mix)"""
+        with self.lock:
+            self.taps[ch] += 1
+            return MixBusTap(self, ch, exclude, self.ticks[ch])
+    
+    def read(self, ch, cursor):
+        """(new cursor, [buses for each tick since cursor])"""
+        with self.lock:
+            end = self.ticks.get(ch, 0)
+            skipped = max(0, end - cursor - self.depth)
+            ring = self.rings.get(ch)
+            slots = [ring[t % self.depth] for t in range(cursor + skipped, end)] if ring else []
+        if skipped:
+            metrics.inc('lancomm_mix_bus_skipped_total', (ch,), skipped)
+        return end, slots
+    
+    def release(self, ch):
+        with self.lock:
+            self.taps[ch] -= 1
+            if self.taps[ch] <= 0:
+                del self.taps[ch]
+
+
+class MixBusTap:
+    """One consumer's cursor into a MixBus channel"""
+    
+    def __init__(self, bus, ch, exclude, cursor):
+        self.bus = bus
+        self.ch = ch
+        self.exclude = exclude
+        self.cursor = cursor
+        self.closed = False
+    
+    def read(self):
+        """Frames (float32[CHUNK]) published since the last read, oldest first"""
+        self.cursor, slots = self.bus.read(self.ch, self.cursor)
+        return [buses.get(self.exclude, buses[None]) for buses in slots]
+    
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.bus.release(self.ch)
+
+
+def build_mix_buses(sources):
+    """{None: full mix, uid: mix minus uid} for one tick of {uid: frame}
+    
+    Each bus is averaged over the talkers it contains, as the listener mixes
+    always have been.
+    """
+    total = np.zeros(CHUNK, dtype=np.float32)
+    for chunk in sources.values():
+        total += chunk
+    count = len(sources)
+    buses = {None: total / count if count > 1 else total}
+    for uid, chunk in sources.items():
+        minus = total - chunk
+        if count - 1 > 1:
+            minus /= count - 1
+        buses[uid] = minus
+    return buses
+
+
+mix_bus = MixBus()
+
+
+# ===== 4-WIRE BRIDGE =====
+
+FOURWIRE_TARGET_FILL = 2 * CHUNK  # Samples queued between a 4-wire card and the mixer (resampler setpoint)
+FOURWIRE_MAX_FILL = 6 * CHUNK  # Backlog beyond this is dropped back to the setpoint
+RESAMPLER_MAX_PPM = 1000  # Correction limit - far outside any working crystal
+RESAMPLER_KP = 4e-3  # Step correction per unit of relative fill error
+RESAMPLER_KI = 2e-6  # Integral gain per read; the integrator settles on the clock offset
+RESAMPLER_SMOOTHING = 0.02  # Fill average weight per read (~1 s at 50 reads/s)
+
+
+class AdaptiveResampler:
+    """FIFO between two audio clocks, resampled so its fill holds a setpoint
+    
+    The producer writes blocks at its clock, the consumer reads fixed counts at
+    its own. Every read steers the step (input samples per output sample) with
+    a PI loop on the smoothed fill and applies it by linear interpolation. The
+    fill is measured as if the producer delivered continuously (the newest
+    block is credited for the time since it arrived), so the sawtooth of
+    block writes does not read as drift while the two clocks slide past each
+    other. The integrator converges on the clock offset, reported as drift_ppm
+    (+ = producer fast).
+    """
+    
+    def __init__(self, target=FOURWIRE_TARGET_FILL, max_fill=FOURWIRE_MAX_FILL):
+        self.target = target
+        self.max_fill = max_fill
+        self.lock = threading.Lock()
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.pos = 0.0  # Fractional read position in pending (< 1 between reads)
+        self.step = 1.0
+        self.drift = 0.0  # Integrator: relative clock offset
+        self.avg_fill = None
+        self.primed = False  # Reads wait for the setpoint after start and after an underrun
+        self.last_write = None  # (perf_counter, samples) of the newest block
+        self.underruns = 0
+        self.overflows = 0
+    
+    def write(self, samples, now=None):
+        with self.lock:
+            self.pending = np.concatenate((self.pending, samples))
+            self.last_write = (time.perf_counter() if now is None else now, len(samples))
+            excess = int(len(self.pending) - self.pos) - self.max_fill
+            if excess > 0:
+                self.pending = self.pending[excess + self.max_fill - self.target:]
+                self.overflows += 1
+    
+    def fill(self, now):
+        """Queued samples as if the producer delivered continuously (lock held)"""
+        fill = len(self.pending) - self.pos
+        if self.last_write is not None:
+            written_at, count = self.last_write
+            fill -= count - min(max(now - written_at, 0.0), count / RATE) * RATE
+        return fill
+    
+    def read(self, n, now=None):
+        """n samples at the consumer clock, or None while filling (start, after an underrun)"""
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            fill = self.fill(now)
+            if not self.primed:
+                if fill < self.target:
+                    return None
+                self.primed = True
+                self.avg_fill = None
+            
+            self.avg_fill = fill if self.avg_fill is None else self.avg_fill + (fill - self.avg_fill) * RESAMPLER_SMOOTHING
+            error = (self.avg_fill - self.target) / self.target
+            limit = RESAMPLER_MAX_PPM * 1e-6
+            self.drift = min(max(self.drift + error * RESAMPLER_KI, -limit), limit)
+            self.step = 1.0 + min(max(self.drift + error * RESAMPLER_KP, -limit), limit)
+            
+            positions = self.pos + self.step * np.arange(n)
+            index = positions.astype(np.intp)
+            if index[-1] + 1 >= len(self.pending):
+                self.primed = False
+                self.underruns += 1
+                return None
+            frac = (positions - index).astype(np.float32)
+            out = self.pending[index] * (1 - frac) + self.pending[index + 1] * frac
+            self.pos += self.step * n
+            consumed = int(self.pos)
+            self.pending = self.pending[consumed:]
+            self.pos -= consumed
+            return out
+    
+    @property
+    def drift_ppm(self):
+        return self.drift * 1e6
+
+
+class FourWireBridge:
+    """One 4-wire interface: callback-mode sound card streams locked to the mixer clock
+    
+    The input card's callback writes into `uplink`, and every mix tick
+    pump_input() reads one CHUNK from it into the channel as talker user_id.
+    After the tick is mixed, pump_output() writes the channel's mix-minus
+    (everyone but this interface) from the mix bus into `downlink`, which the
+    output card's callback reads. Each card runs on its own crystal; the
+    resamplers absorb the offset so neither direction slowly overflows or runs
+    dry, and stats() reports it.
+    """
+    
+    def __init__(self, idx):
+        self.idx = idx
+        self.user_id = -2 - idx  # Unique talker id per interface (-2, -3)
+        self.uplink = AdaptiveResampler()  # Input card -> mixer
+        self.downlink = AdaptiveResampler()  # Mixer -> output card
+        self.tap = None
+        self.stream_in = None
+        self.stream_out = None
+        self.device_xruns = {'in': 0, 'out': 0}  # Callbacks with PortAudio status flags set
+        self.silence = np.zeros(CHUNK, dtype=np.float32)
+        self.closed = False  # The mixer may still hold this bridge for the rest of a tick
+    
+    def start(self, pa):
+        self.stream_in = pa.open(format=pyaudio.paInt16, channels=1, rate=RATE, input=True,
+                                 input_device_index=fourwire_input_device[self.idx],
+                                 frames_per_buffer=CHUNK, stream_callback=self.input_callback)
+        self.stream_out = pa.open(format=pyaudio.paInt16, channels=1, rate=RATE, output=True,
+                                  output_device_index=fourwire_output_device[self.idx],
+                                  frames_per_buffer=CHUNK, stream_callback=self.output_callback)
+    
+    def input_callback(self, in_data, frame_count, time_info, status):
+        if status:
+            self.device_xruns['in'] += 1
+        gain = np.float32(fourwire_input_gain[self.idx] / 32767.0)
+        self.uplink.write(np.frombuffer(in_data, dtype=np.int16) * gain)
+        return (None, pyaudio.paContinue)
+    
+    def output_callback(self, in_data, frame_count, time_info, status):
+        if status:
+            self.device_xruns['out'] += 1
+        frame = self.downlink.read(frame_count)
+        if frame is None:
+            return (bytes(frame_count * 2), pyaudio.paContinue)  # Silence while the FIFO refills
+        return ((np.clip(frame, -1, 1) * 32767).astype(np.int16).tobytes(), pyaudio.paContinue)
+    
+    def pump_input(self):
+        """Mix tick, before mixing: one frame from the input card into the channel"""
+        if self.closed:
+            return
+        frame = self.uplink.read(CHUNK)
+        if frame is None:
+            return
+        ch = fourwire_channel[self.idx]
+        with audio_lock:
+            if self.closed:
+                return  # close() ran after the check above - do not resurrect the talker
+            channel_buffers[ch][self.user_id].append(frame)
+            channel_talkers[ch].add(self.user_id)
+    
+    def pump_output(self):
+        """Mix tick, after mixing: this tick's mix-minus towards the output card"""
+        if self.closed:
+            return
+        ch = fourwire_channel[self.idx]
+        with audio_lock:
+            # Same lock as close(), so a tap is never opened after it has released ours
+            if self.closed:
+                return
+            if self.tap is None or self.tap.ch != ch:
+                if self.tap is not None:
+                    self.tap.close()
+                self.tap = mix_bus.tap(ch, self.user_id)
+            tap = self.tap
+        
+        # Apply output gain and channel volume
+        with config_lock:
+            vol = channel_volumes.get(ch, 0.8)
+        gain = fourwire_output_gain[self.idx] * vol
+        
+        frames = tap.read()
+        if not frames:
+            self.downlink.write(self.silence)  # Quiet tick - the output clock still needs a frame
+        for frame in frames:
+            self.downlink.write(frame * gain)
+    
+    def stats(self):
+        """Per direction: card clock offset from the mixer (ppm, + = card fast) and xrun counts"""
+        return {
+            'in': {'drift_ppm': round(self.uplink.drift_ppm, 1), 'device': self.device_xruns['in'],
+                   'underrun': self.uplink.underruns, 'overflow': self.uplink.overflows},
+            'out': {'drift_ppm': round(-self.downlink.drift_ppm, 1), 'device': self.device_xruns['out'],
+                    'underrun': self.downlink.underruns, 'overflow': self.downlink.overflows},
+        }
+    
+    def close(self):
+        with audio_lock:
+            # pump_input/pump_output re-check closed under this lock before touching shared state
+            self.closed = True
+            if self.tap is not None:
+                self.tap.close()
+                self.tap = None
+            for talkers in channel_talkers.values():
+                talkers.discard(self.user_id)
+        for stream in (self.stream_in, self.stream_out):
+            if stream:
+                try:
+                    stream.stop_stream()
+                    stream.close()
+                except Exception:
+                    pass
+        self.stream_in = self.stream_out = None
 
 
 # ===== NETWORK HANDLERS =====
 
+def reset_seq_tracking(ch, user_id):
+    """Restart a talker's sequence baseline; seqs still missing from the last burst count as lost (audio_lock held)"""
+    channel_seq_tracking[ch].pop(user_id, None)
+    missing = channel_seq_missing[ch].pop(user_id, None)
+    if missing:
+        metrics.inc('lancomm_rx_lost_packets_total', (ch, user_id), len(missing))
+
+
 async def handle_tcp(reader, writer):
     """Handle TCP control connections from clients"""
     addr = writer.get_extra_info('peername')
@@ -208,15 +1391,26 @@ async def handle_tcp(reader, writer):
         # Simple authentication handshake
         import hashlib
         challenge = str(time.time()).encode()
-        writer.write(b"AUTH_CHALLENGE:" + challenge)
+        writer.write(encode_frame('AUTH_CHALLENGE', challenge))
         await writer.drain()
         
+        decoder = FrameDecoder()
+        resume = None
         try:
-            auth_response = await asyncio.wait_for(reader.read(1024), timeout=5.0)
+            frame = await asyncio.wait_for(read_frame(reader, decoder), timeout=5.0)
             expected = hashlib.sha256(challenge + AUTH_KEY.encode()).hexdigest().encode()
-            if auth_response != expected:
+            response = None
+            if frame is not None and frame[0] == 'AUTH_RESPONSE':
+                response = bytes(frame[1])
+            elif frame is not None and frame[0] == 'AUTH_RESUME':
+                try:
+                    resume = json.loads(str(frame[1], 'utf-8'))
+                    response = str(resume['auth']).encode()
+                except (ValueError, KeyError, TypeError):
+                    resume = None
+            if response != expected:
                 logging.warning(f"Authentication failed from {addr}")
-                writer.write(b"AUTH_FAIL")
+                writer.write(encode_frame('AUTH_FAIL'))
                 await writer.drain()
                 writer.close()
                 await writer.wait_closed()
@@ -228,16 +1422,23 @@ async def handle_tcp(reader, writer):
             return
         
         global next_user_id
+        session = claim_session(resume, node_ip, addr) if resume else None
         with client_lock:
-            user_id = next_user_id
-            next_user_id += 1
+            if session is not None:
+                token, user_id = session
+            else:
+                token = secrets.token_hex(16)
+                user_id = next_user_id
+                next_user_id += 1
+                sessions[token] = {'user_id': user_id, 'node_ip': node_ip, 'addr': addr, 'expires': None}
             client_data[addr] = {
                 'user_name': None, 
                 'user_id': user_id, 
                 'subscribed_channels': set(), 
                 'sock': writer, 
                 'last_seen': time.time(),
-                'node_ip': node_ip
+                'node_ip': node_ip,
+                'session': token
             }
         
         # Track this node
@@ -249,23 +1450,34 @@ async def handle_tcp(reader, writer):
                     'user_name': None
                 }
         
-        writer.write(f"USER_ID:{user_id}".encode())
-        await writer.drain()
-        logging.info(f"✓ Authenticated client {addr} as user_id {user_id}")
+        config = restore_session(addr, resume) if session is not None else None
+        if config is not None:
+            # Config pipelined behind USER_ID: the pack is back on air after one round trip
+            writer.write(encode_frame('USER_ID', f'{user_id}:{token}:1'))
+            config_broadcaster.send_config(client_data[addr], config, full=True)
+            await writer.drain()
+            logging.info(f"✓ Resumed session for {addr} as user_id {user_id}")
+        else:
+            if session is not None:
+                # Profile renamed or deleted while away - a plain USER_ID makes the pack reselect
+                logging.info(f"Session for {addr} resumed without profile '{resume.get('user')}'")
+            writer.write(encode_frame('USER_ID', f'{user_id}:{token}'))
+            await writer.drain()
+            logging.info(f"✓ Authenticated client {addr} as user_id {user_id}")
         
         while True:
-            data = await reader.read(1024)
-            if not data:
+            frame = await read_frame(reader, decoder)
+            if frame is None:
                 break
-                
+            
             try:
-                parts = data.decode().strip().split(':')
-                cmd = parts[0]
+                cmd, payload = frame
+                parts = [cmd] + (str(payload, 'utf-8').split(':') if payload else [])
                 
                 if cmd == 'GET_USERS':
                     with config_lock:
                         user_list = ','.join(users.keys())
-                    writer.write(f"USERS:{user_list}".encode())
+                    writer.write(encode_frame('USERS', user_list))
                     await writer.drain()
                 
                 elif cmd == 'SELECT_USER' and len(parts) >= 2:
@@ -274,35 +1486,18 @@ async def handle_tcp(reader, writer):
                         # Check user limit (HelixNet: 64-128, LanComm: 20)
                         active_user_count = sum(1 for c in client_data.values() if c.get('user_name'))
                         if active_user_count >= MAX_USERS and user_name not in [c.get('user_name') for c in client_data.values()]:
-                            writer.write(b"ERROR:MAX_USERS_REACHED")
+                            writer.write(encode_frame('ERROR', 'MAX_USERS_REACHED'))
                             await writer.drain()
                             continue
                         
                         if user_name in users:
                             # Allow multiple belt packs to use same profile
-                            with client_lock:
-                                client_data[addr]['user_name'] = user_name
-                                sub_channels = set([ch for ch in users[user_name]['channels'] if ch is not None])
-                                client_data[addr]['subscribed_channels'] = sub_channels
-                            # Refresh listener membership for this user_id
-                            with audio_lock:
-                                for ch_set in channel_listeners.values():
-                                    ch_set.discard(user_id)
-                                for ch in sub_channels:
-                                    channel_listeners[ch].add(user_id)
-                            
-                            with node_lock:
-                                if node_ip in active_nodes:
-                                    active_nodes[node_ip]['user_name'] = user_name
-                            
+                            apply_user_selection(addr, user_name)
                             # Send channel names AND button modes - only for enabled channels
-                            sub_channels_filtered = {ch for ch in sub_channels if channel_enabled.get(ch, False)}
-                            ch_names = {str(ch): channels.get(ch, f'CH{ch}') for ch in sub_channels_filtered}
-                            button_modes = users[user_name].get('button_modes', {})
-                            config_data = {'channels': ch_names, 'button_modes': button_modes}
-                            writer.write(f"CONFIG:{json.dumps(config_data)}".encode())
+                            config_broadcaster.send_config(client_data[addr], build_user_config(user_name),
+                                                           full=True, message='CONFIG')
                         else:
-                            writer.write(b"ERROR")
+                            writer.write(encode_frame('ERROR'))
                     await writer.drain()
                 
                 elif cmd == 'TOGGLE_TALK' and len(parts) >= 3:
@@ -314,6 +1509,11 @@ async def handle_tcp(reader, writer):
                             with audio_lock:
                                 if enable:
                                     channel_talkers[ch].add(user_id)
+                                    # Talk bursts restart the sequence baseline (no false loss)
+                                    reset_seq_tracking(ch, user_id)
+                                    channel_arrival_tracking[ch].pop(user_id, None)
+                                    talker_levels[ch].pop(user_id, None)
+                                    channel_dtx_talkers[ch].discard(user_id)
                                 else:
                                     channel_talkers[ch].discard(user_id)
                 
@@ -323,27 +1523,25 @@ async def handle_tcp(reader, writer):
                     with config_lock:
                         if user_name in users:
                             users[user_name]['client_addr'] = addr
-                            with client_lock:
-                                client_data[addr]['user_name'] = user_name
-                                sub_channels = set([ch for ch in users[user_name]['channels'] if ch is not None])
-                                client_data[addr]['subscribed_channels'] = sub_channels
-                            # Refresh listener membership for this user_id
-                            with audio_lock:
-                                for ch_set in channel_listeners.values():
-                                    ch_set.discard(user_id)
-                                for ch in sub_channels:
-                                    channel_listeners[ch].add(user_id)
-                            
-                            with node_lock:
-                                if node_ip in active_nodes:
-                                    active_nodes[node_ip]['user_name'] = user_name
-                            
-                            # Send only enabled channels
-                            sub_channels_filtered = {ch for ch in sub_channels if channel_enabled.get(ch, False)}
-                            ch_names = {str(ch): channels.get(ch, f'CH{ch}') for ch in sub_channels_filtered}
-                            writer.write(f"CONFIG:{json.dumps(ch_names)}".encode())
+                            apply_user_selection(addr, user_name)
+                            config_broadcaster.send_config(client_data[addr], build_user_config(user_name),
+                                                           full=True, message='CONFIG')
                         else:
-                            writer.write(b"ERROR")
+                            writer.write(encode_frame('ERROR'))
+                    await writer.drain()
+                
+                elif cmd == 'CONFIG_RESYNC':
+                    # Pack missed a delta - send it a full snapshot
+                    with client_lock:
+                        user_name = client_data.get(addr, {}).get('user_name')
+                    config = build_user_config(user_name) if user_name else None
+                    if config is not None:
+                        config_broadcaster.send_config(client_data[addr], config, full=True)
+                        await writer.drain()
+                
+                elif cmd == 'TALLY_SUBSCRIBE':
+                    # Channels this pack wants talker state for (empty = none)
+                    subscribe_tally(client_data[addr], [int(ch) for ch in parts[1].split(',') if ch] if len(parts) >= 2 else [])
                     await writer.drain()
                 
                 elif cmd == 'PING':
@@ -353,7 +1551,7 @@ async def handle_tcp(reader, writer):
                     with node_lock:
                         if node_ip in active_nodes:
                             active_nodes[node_ip]['last_seen'] = time.time()
-                    writer.write(b"PONG")
+                    writer.write(encode_frame('PONG'))
                     await writer.drain()
 
                 elif cmd == 'SET_UDP' and len(parts) >= 2:
@@ -363,10 +1561,10 @@ async def handle_tcp(reader, writer):
                         with client_lock:
                             client_data[addr]['udp_addr'] = (node_ip, udp_port)
                             user_udp_addrs[user_id] = (node_ip, udp_port)
-                        writer.write(b"UDP_OK")
+                        writer.write(encode_frame('UDP_OK'))
                     except Exception as e:
                         logging.error(f"SET_UDP parse error from {addr}: {e}")
-                        writer.write(b"UDP_FAIL")
+                        writer.write(encode_frame('UDP_FAIL'))
                     await writer.drain()
                     
             except Exception as e:
@@ -379,18 +1577,32 @@ async def handle_tcp(reader, writer):
         with client_lock:
             user_name = client_data.get(addr, {}).get('user_name')
             node_ip = client_data.get(addr, {}).get('node_ip')
+            session = sessions.get(client_data.get(addr, {}).get('session'))
+            if session is not None and session['addr'] != addr:
+                # Session was resumed on a newer connection - its state is no longer ours
+                user_id = None
+                node_ip = None
+            elif session is not None:
+                session['expires'] = time.time() + SESSION_TTL
         
         with audio_lock:
             for ch in list(channel_listeners.keys()):
-                channel_listeners[ch].discard(user_id)
                 if user_id is not None:
+                    channel_listeners[ch].discard(user_id)
                     channel_talkers[ch].discard(user_id)
+                    talker_levels[ch].pop(user_id, None)
+                    channel_dtx_talkers[ch].discard(user_id)
 
         # Remove cached UDP target
         with client_lock:
             if user_id is not None and user_id in user_udp_addrs:
                 user_udp_addrs.pop(user_id, None)
         
+        # Drop per-user metric series so label cardinality stays bounded
+        if user_id is not None:
+            metrics.forget('talker', user_id)
+            metrics.forget('listener', user_id)
+        
         with node_lock:
             if node_ip and node_ip in active_nodes:
                 active_nodes[node_ip]['user_name'] = None
@@ -415,46 +1627,55 @@ async def tcp_server():
 
 
 async def receive_udp(udp_sock):
-    """Receive and buffer audio packets"""
+    """Receive talk packets and fan each one in to its channels' talker buffers"""
     loop = asyncio.get_running_loop()
     
     while True:
         try:
             data, addr = await loop.sock_recvfrom(udp_sock, 8192)
-            if len(data) < 12:
+            if len(data) < UPLINK_HEADER.size:
+                metrics.inc('lancomm_rx_dropped_total', ('malformed',))
                 continue
             
-            ch = int.from_bytes(data[0:4], 'big')
-            user_id = int.from_bytes(data[4:8], 'big')
-            seq = int.from_bytes(data[8:12], 'big')
+            target, user_id, seq = UPLINK_HEADER.unpack_from(data)
+            if target & UPLINK_MULTI_FLAG:
+                mask = target & ~UPLINK_MULTI_FLAG
+                target_channels = [ch for ch in range(MAX_CHANNELS) if mask >> ch & 1]
+                malformed = not target_channels or mask >> MAX_CHANNELS
+            else:
+                target_channels = [target]
+                malformed = target >= MAX_CHANNELS
             
-            if ch < 0 or ch >= MAX_CHANNELS or user_id < 0 or user_id > 10000:
+            if malformed or user_id > 10000:
+                metrics.inc('lancomm_rx_dropped_total', ('malformed',))
                 continue
-
-            # Drop audio for disabled channels
-            with config_lock:
-                if not channel_enabled.get(ch, False):
-                    continue
             
-            with audio_lock:
-                if user_id not in channel_talkers.get(ch, set()):
-                    continue
-                
-                last_seq = channel_seq_tracking[ch].get(user_id, -1)
-                if last_seq >= 0 and seq != (last_seq + 1) % 65536:
-                    # Simple loss detection
-                    pass
-                channel_seq_tracking[ch][user_id] = seq
-            
-            encoded = data[12:]
+            encoded = data[UPLINK_HEADER.size:]
+            if not encoded:
+                # DTX keepalive: talker still here but silent - nothing to mix, seq not consumed
+                talking = False
+                with audio_lock:
+                    for ch in target_channels:
+                        if user_id in channel_talkers.get(ch, set()):
+                            channel_dtx_talkers[ch].add(user_id)
+                            # The silent stretch is not jitter - restart inter-arrival at the next PCM packet
+                            channel_arrival_tracking[ch].pop(user_id, None)
+                            talking = True
+                if talking:
+                    metrics.inc('lancomm_rx_dtx_keepalives_total', (user_id,))
+                else:
+                    metrics.inc('lancomm_rx_dropped_total', ('not_talking',))
+                continue
             if len(encoded) < 10:
+                metrics.inc('lancomm_rx_dropped_total', ('short_payload',))
                 continue
             
             try:
-                # Decode raw PCM (int16)
+                # Decode raw PCM (int16) once, shared by every target channel
                 audio_data = np.frombuffer(encoded, dtype=np.int16).astype(np.float32) / 32767.0
             except Exception as e:
                 logging.error(f"PCM decode error: {e}")
+                metrics.inc('lancomm_rx_dropped_total', ('malformed',))
                 continue
             
             # Ensure correct chunk size
@@ -463,11 +1684,60 @@ async def receive_udp(udp_sock):
             elif len(audio_data) > CHUNK:
                 audio_data = audio_data[:CHUNK]
             
-            with audio_lock:
-                # Add to user's specific buffer queue
-                channel_buffers[ch][user_id].append(audio_data)
-                channel_last_activity[ch] = time.time()
-
+            arrival = time.perf_counter()
+            accepted = False
+            for ch in target_channels:
+                # Drop audio for disabled channels
+                with config_lock:
+                    if not channel_enabled.get(ch, False):
+                        metrics.inc('lancomm_rx_dropped_total', ('disabled_channel',))
+                        continue
+                
+                labels = (ch, user_id)
+                with audio_lock:
+                    if user_id not in channel_talkers.get(ch, set()):
+                        metrics.inc('lancomm_rx_dropped_total', ('not_talking',))
+                        continue
+                    
+                    last_seq = channel_seq_tracking[ch].get(user_id, -1)
+                    gap = (seq - last_seq - 1) % 65536 if last_seq >= 0 else 0
+                    if gap >= 32768:
+                        # Late packet: the baseline stays put, and if it was still missing it is not lost after all
+                        channel_seq_missing[ch][user_id].discard(seq)
+                        metrics.inc('lancomm_rx_reordered_packets_total', labels)
+                    else:
+                        lost = 0
+                        missing = channel_seq_missing[ch][user_id]
+                        if gap:
+                            # Skipped seqs count as lost once SEQ_REORDER_WINDOW newer ones have passed them
+                            lost += max(gap - SEQ_REORDER_WINDOW, 0)
+                            missing.update((seq - k) % 65536 for k in range(1, min(gap, SEQ_REORDER_WINDOW) + 1))
+                        expired = [m for m in missing if (seq - m) % 65536 > SEQ_REORDER_WINDOW]
+                        missing.difference_update(expired)
+                        lost += len(expired)
+                        if lost:
+                            metrics.inc('lancomm_rx_lost_packets_total', labels, lost)
+                        channel_seq_tracking[ch][user_id] = seq
+                    last_arrival = channel_arrival_tracking[ch].get(user_id)
+                    channel_arrival_tracking[ch][user_id] = arrival
+                    
+                    channel_dtx_talkers[ch].discard(user_id)
+                    
+                    # Add to user's specific buffer queue
+                    user_queue = channel_buffers[ch][user_id]
+                    if len(user_queue) == user_queue.maxlen:
+                        metrics.inc('lancomm_buffer_overflows_total', labels)
+                    user_queue.append(audio_data)
+                    channel_last_activity[ch] = time.time()
+                
+                if last_arrival is not None:
+                    metrics.observe('lancomm_rx_interarrival_seconds', arrival - last_arrival, labels)
+                metrics.inc('lancomm_rx_packets_total', labels)
+                accepted = True
+            
+            if not accepted:
+                continue
+            
             # Track the sender's UDP address for return audio
             with client_lock:
                 user_udp_addrs[user_id] = addr
@@ -485,11 +1755,23 @@ async def mix_and_send(udp_sock):
     """Mix audio and send to listeners"""
     loop = asyncio.get_running_loop()
     last_cleanup = time.time()
+    last_tick_start = None
+    downlink_seq = defaultdict(int)  # {ch: next downlink seq} - gaps at the pack mean loss, not silence
+    next_tick = time.perf_counter()
     
     while True:
         try:
+            tick_start = time.perf_counter()
+            if last_tick_start is not None:
+                metrics.observe('lancomm_mix_interval_seconds', tick_start - last_tick_start)
+            last_tick_start = tick_start
             current_time = time.time()
             
+            # 4-wire inputs join as talkers: one frame per tick, resampled onto this clock
+            bridges = [b for b in fourwire_bridges if b is not None]
+            for bridge in bridges:
+                bridge.pump_input()
+            
             if current_time - last_cleanup > 30:
                 with audio_lock:
                     inactive = [ch for ch, t in channel_last_activity.items() 
@@ -498,6 +1780,9 @@ async def mix_and_send(udp_sock):
                         channel_buffers.pop(ch, None)
                         channel_last_activity.pop(ch, None)
                         channel_seq_tracking.pop(ch, None)
+                        channel_seq_missing.pop(ch, None)
+                        channel_arrival_tracking.pop(ch, None)
+                        channel_dtx_talkers.pop(ch, None)
                 last_cleanup = current_time
             
             with audio_lock:
@@ -516,38 +1801,39 @@ async def mix_and_send(udp_sock):
                     current_talkers = set(channel_talkers.get(ch, set()))
                     listeners = list(channel_listeners.get(ch, set()))
                     
-                    if not listeners or not current_talkers:
-                        # Drain buffers if no one is listening or talking
+                    if not current_talkers or not (listeners or mix_bus.has_taps(ch)):
+                        # Drain buffers if no one is listening (or tapping the bus) or talking
                         for uid in list(channel_buffers[ch].keys()):
                             if channel_buffers[ch][uid]:
                                 channel_buffers[ch][uid].popleft()
                         continue
 
-                    # Mix audio from all active talkers
-                    mixed_audio = np.zeros(CHUNK, dtype=np.float32)
-                    active_sources = 0
+                    # Take one frame from each active talker
                     talker_audio_cache = {}  # Cache each talker's audio for null routing
                     
                     for uid in list(current_talkers):
                         user_queue = channel_buffers[ch][uid]
+                        metrics.observe('lancomm_jitter_buffer_frames', len(user_queue), (ch,))
                         if user_queue:
                             # Get next chunk from this user
                             chunk = user_queue.popleft()
                             talker_audio_cache[uid] = chunk  # Cache for null routing
-                            mixed_audio += chunk
-                            active_sources += 1
+                            talker_levels[ch][uid] = float(np.sqrt(np.dot(chunk, chunk) / CHUNK))
                         else:
-                            # User is talking but buffer empty (underrun)
-                            pass
+                            # User is talking but buffer empty (underrun, unless silent by DTX)
+                            if uid not in channel_dtx_talkers[ch]:
+                                metrics.inc('lancomm_underruns_total', (ch, uid))
+                            talker_levels[ch][uid] = 0.0
                 
-                if active_sources == 0:
+                if not talker_audio_cache:
                     continue
                 
-                # Normalize if multiple talkers to prevent clipping
-                if active_sources > 1:
-                    mixed_audio /= active_sources
+                # Full mix plus one mix-minus per talker (null routing), shared by listeners and bus taps
+                buses = build_mix_buses(talker_audio_cache)
+                mix_bus.publish(ch, buses)
                 
                 # Calculate audio level for metering (RMS)
+                mixed_audio = buses[None]
                 audio_level = np.sqrt(np.mean(mixed_audio ** 2))
                 with audio_lock:
                     channel_levels[ch] = float(audio_level)
@@ -555,30 +1841,23 @@ async def mix_and_send(udp_sock):
                 with config_lock:
                     vol = channel_volumes.get(ch, 0.8)
                 
-                # Pre-compute all unique listener mixes (cache by excluded talker)
+                # Encode each bus a listener needs once: talkers get their mix-minus, everyone else the full mix
+                bus_pcm_cache = {}
                 listener_mix_cache = {}
                 
                 for uid in listeners:
-                    # Create custom mix for this listener (exclude their own audio)
-                    listener_mix = np.zeros(CHUNK, dtype=np.float32)
-                    listener_sources = 0
-                    
-                    for talker_uid, talker_chunk in talker_audio_cache.items():
-                        if talker_uid != uid:  # Null out this listener's own audio
-                            listener_mix += talker_chunk
-                            listener_sources += 1
-                    
-                    # Normalize if multiple sources (excluding the listener)
-                    if listener_sources > 1:
-                        listener_mix /= listener_sources
-                    
-                    # Apply channel volume and convert to raw PCM int16
-                    listener_mix *= vol
-                    listener_mix = np.clip(listener_mix, -1, 1)
-                    pcm_data = (listener_mix * 32767).astype(np.int16)
-                    
+                    key = uid if uid in buses else None
+                    pcm_data = bus_pcm_cache.get(key)
+                    if pcm_data is None:
+                        # Apply channel volume and convert to raw PCM int16
+                        listener_mix = np.clip(buses[key] * vol, -1, 1)
+                        pcm_data = bus_pcm_cache[key] = (listener_mix * 32767).astype(np.int16)
                     listener_mix_cache[uid] = pcm_data
                 
+                # One seq per channel frame (shared by all listeners); timestamp lets packs measure jitter
+                header = DOWNLINK_HEADER.pack(ch, int(tick_start * RATE) & 0xFFFFFFFF, downlink_seq[ch])
+                downlink_seq[ch] = (downlink_seq[ch] + 1) & 0xFFFFFFFF
+                
                 # Send raw PCM to each listener (no container overhead)
                 for uid in listeners:
                     with client_lock:
@@ -587,16 +1866,33 @@ async def mix_and_send(udp_sock):
                         continue
                     
                     pcm_data = listener_mix_cache[uid]
-                    # Packet format: [channel:4][reserved:8][raw_pcm:1920]
-                    packet = ch.to_bytes(4, 'big') + b'\x00'*8 + pcm_data.tobytes()
+                    # Packet format: [channel:4][timestamp:4][seq:4][raw_pcm:1920]
+                    packet = header + pcm_data.tobytes()
                     
                     try:
                         await loop.sock_sendto(udp_sock, packet, udp_addr)
+                        metrics.inc('lancomm_tx_packets_total', (ch, uid))
+                        if 'first_mixed_packet' not in startup_marks:
+                            mark_startup('first_mixed_packet')
                     except Exception as e:
-                        pass
+                        metrics.inc('lancomm_tx_send_failures_total', (ch, uid))
+                        logging.debug(f"Send to {udp_addr} failed: {e}")
+            
+            for bridge in bridges:
+                bridge.pump_output()
             
-            # Run at ~50Hz (20ms) to match chunk size
-            await asyncio.sleep(0.02)
+            tick_duration = time.perf_counter() - tick_start
+            metrics.observe('lancomm_mix_tick_seconds', tick_duration)
+            if tick_duration > CHUNK / RATE:
+                metrics.inc('lancomm_mix_tick_overruns_total')
+            
+            # Tick on absolute 20 ms deadlines so the mixer clock runs at exactly RATE (4-wire cards lock to it)
+            next_tick += CHUNK / RATE
+            delay = next_tick - time.perf_counter()
+            if delay < -CHUNK / RATE:
+                next_tick = time.perf_counter()  # Stalled for more than a tick - resync rather than burst
+                delay = 0
+            await asyncio.sleep(max(delay, 0))
         
         except Exception as e:
             logging.error(f"Mix error: {e}")
@@ -665,9 +1961,9 @@ class BroadcastTheme:
             }
             QSlider::handle:vertical:hover { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #52c4ff, stop:1 #20a2e0); }
 
-            QTableWidget { background-color: #161920; border: 1px solid #222733; gridline-color: #222733; color: #e8ecf2; }
-            QTableWidget::item { padding: 10px; }
-            QTableWidget::item:selected { background-color: #0f8ac7; }
+            QTableView { background-color: #161920; border: 1px solid #222733; gridline-color: #222733; color: #e8ecf2; }
+            QTableView::item { padding: 10px; }
+            QTableView::item:selected { background-color: #0f8ac7; }
             QHeaderView::section { background-color: #1d2028; color: #9ca7bd; padding: 9px; border: none; font-weight: 700; border-bottom: 1px solid #222733; }
 
             QScrollBar:vertical { background: #121418; width: 12px; border-radius: 6px; }
@@ -928,6 +2224,90 @@ class AddUserDialog(QDialog):
 
 # ===== CHANNEL STRIP WIDGET =====
 
+class LevelMeter(QWidget):
+    """Vertical level meter with peak hold, painted directly
+    
+    Avoids per-frame setStyleSheet calls (CSS re-parse + re-polish); brushes are
+    cached and repaints happen only when the displayed value changes.
+    """
+    
+    GREEN_ZONE = 60  # Percent - matches the old gradient stops
+    AMBER_ZONE = 80
+    PEAK_DECAY = 0.95  # Per update (20Hz)
+    
+    _brushes = None
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(40)
+        self.setFixedWidth(22)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.level_percent = 0
+        self.peak_decay = 0.0
+        self.shown = (0, 0)  # (level %, peak %) last painted
+        if LevelMeter._brushes is None:
+            LevelMeter._brushes = {
+                'background': QBrush(QColor('#1a1a1d')),
+                'green': QBrush(QColor('#22aa22')),
+                'amber': QBrush(QColor('#ddaa22')),
+                'red': QBrush(QColor('#dd2222')),
+                'peak': QBrush(QColor('#e8ecf2')),
+                'border': QPen(QColor('#3d3d42')),
+                'border_amber': QPen(QColor('#ddaa22')),
+                'border_red': QPen(QColor('#dd2222')),
+            }
+    
+    def set_level(self, level):
+        """Set level (0.0-1.0); returns True if a repaint was scheduled"""
+        level_percent = max(0, min(100, int(level * 100)))
+        
+        # Peak hold with decay
+        self.peak_decay *= self.PEAK_DECAY
+        if self.peak_decay < level_percent:
+            self.peak_decay = level_percent
+        
+        shown = (level_percent, int(self.peak_decay))
+        if shown == self.shown:
+            return False
+        self.level_percent = level_percent
+        self.shown = shown
+        self.update()
+        return True
+    
+    def paintEvent(self, event):
+        brushes = self._brushes
+        painter = QPainter(self)
+        w, h = self.width(), self.height()
+        inner_h = h - 2
+        painter.fillRect(0, 0, w, h, brushes['background'])
+        
+        # Bar, coloured in zones from the bottom up
+        level, peak = self.shown
+        bottom = 1 + inner_h
+        for zone_start, zone_end, brush in ((0, self.GREEN_ZONE, brushes['green']),
+                                            (self.GREEN_ZONE, self.AMBER_ZONE, brushes['amber']),
+                                            (self.AMBER_ZONE, 100, brushes['red'])):
+            if level <= zone_start:
+                break
+            y0 = bottom - inner_h * min(level, zone_end) // 100
+            y1 = bottom - inner_h * zone_start // 100
+            painter.fillRect(2, y0, w - 4, y1 - y0, brush)
+        
+        # Peak hold line
+        if peak > 0:
+            painter.fillRect(2, bottom - inner_h * peak // 100, w - 4, 2, brushes['peak'])
+        
+        # Border colour reflects the current level
+        if level > self.AMBER_ZONE:
+            painter.setPen(brushes['border_red'])
+        elif level > self.GREEN_ZONE:
+            painter.setPen(brushes['border_amber'])
+        else:
+            painter.setPen(brushes['border'])
+        painter.drawRect(0, 0, w - 1, h - 1)
+        painter.end()
+
+
 class ChannelStrip(QFrame):
     """Professional channel strip with fader and naming"""
     
@@ -1009,30 +2389,9 @@ class ChannelStrip(QFrame):
         meter_label.setStyleSheet("font-size: 8pt; color: #a0a0a5; background: transparent;")
         layout.addWidget(meter_label)
         
-        self.level_meter = QProgressBar()
-        self.level_meter.setOrientation(Qt.Orientation.Vertical)
-        self.level_meter.setMinimum(0)
-        self.level_meter.setMaximum(100)
-        self.level_meter.setValue(0)
-        self.level_meter.setMinimumHeight(40)
-        self.level_meter.setTextVisible(False)
-        self.level_meter.setStyleSheet("""
-            QProgressBar {
-                background-color: #1a1a1d; border: 1px solid #3d3d42; border-radius: 3px;
-            }
-            QProgressBar::chunk {
-                background: qlineargradient(x1:0, y1:1, x2:0, y2:0,
-                    stop:0 #2a2, stop:0.6 #2a2, 
-                    stop:0.6 #da2, stop:0.8 #da2,
-                    stop:0.8 #d22, stop:1 #d22);
-                border-radius: 2px;
-            }
-        """)
+        self.level_meter = LevelMeter()
         layout.addWidget(self.level_meter, alignment=Qt.AlignmentFlag.AlignHCenter)
         
-        self.peak_hold = 0.0
-        self.peak_decay = 0.0
-        
         self.setLayout(layout)
         self.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Raised)
         border_color = "#ff9650" if is_program else "#3d3d42"
@@ -1070,43 +2429,198 @@ class ChannelStrip(QFrame):
                 }}
             """)
     
-    def update_level(self, level):
-        """Update audio level meter with peak hold (0.0-1.0)"""
-        level_percent = int(level * 100)
+    def update_level(self, level):
+        """Update audio level meter with peak hold (0.0-1.0)"""
+        self.level_meter.set_level(level)
+
+
+# ===== TABLE MODELS =====
+
+class DiffTableModel(QAbstractTableModel):
+    """Read-only table model updated by diffing keyed rows
+    
+    apply_rows() compares a fresh snapshot against the current rows and emits
+    only row inserts, removals and dataChanged for rows whose values changed,
+    so views keep their selection/scroll and repaint only what moved.
+    """
+    
+    COLUMNS = []
+    KEY_ROLE = Qt.ItemDataRole.UserRole
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []  # [(key, col0, col1, ...)] kept in sort_key order
+    
+    def sort_key(self, key):
+        """Ordering of rows (override for non-string keys)"""
+        return key
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == self.KEY_ROLE:
+            return row[0]
+        if role == Qt.ItemDataRole.DisplayRole and index.column() + 1 < len(row):
+            return row[index.column() + 1]
+        return None
+    
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+    
+    def row_of(self, key):
+        """Row index for a key, or -1"""
+        for row, values in enumerate(self.rows):
+            if values[0] == key:
+                return row
+        return -1
+    
+    def apply_rows(self, new_rows):
+        """Bring the model in line with new_rows [(key, col0, ...)] using minimal changes"""
+        incoming = {values[0]: tuple(values) for values in new_rows}
+        
+        # Removals (bottom-up so row numbers stay valid)
+        for row in range(len(self.rows) - 1, -1, -1):
+            if self.rows[row][0] not in incoming:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                self.endRemoveRows()
+        
+        # In-place updates
+        last_column = len(self.COLUMNS) - 1
+        for row, values in enumerate(self.rows):
+            new_values = incoming.pop(values[0])
+            if new_values != values:
+                self.rows[row] = new_values
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+        
+        # Inserts at their sorted position
+        keys = [self.sort_key(values[0]) for values in self.rows]
+        for key in sorted(incoming, key=self.sort_key):
+            row = bisect.bisect_left(keys, self.sort_key(key))
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.insert(row, incoming[key])
+            keys.insert(row, self.sort_key(key))
+            self.endInsertRows()
+
+
+class NodesTableModel(DiffTableModel):
+    """Beltpack registry: IP, display name, assigned user (+ actions column)"""
+    
+    COLUMNS = ["IP Address", "Hostname", "Assigned User", "Actions"]
+    
+    def sort_key(self, key):
+        try:
+            return tuple(socket.inet_aton(key))
+        except OSError:
+            return (256, key)
+    
+    def snapshot_rows(self):
+        """Current active_nodes as model rows"""
+        with node_lock:
+            nodes_list = [(ip, node_data.get('hostname', 'Unknown'), node_data.get('user_name'))
+                          for ip, node_data in active_nodes.items()]
         
-        # Peak hold with decay
-        if level_percent > self.peak_hold:
-            self.peak_hold = level_percent
-            self.peak_decay = level_percent
-        else:
-            self.peak_decay *= 0.95  # Decay rate
-            if self.peak_decay < level_percent:
-                self.peak_decay = level_percent
+        with config_lock:
+            return [(ip, ip, device_names.get(ip, hostname), user_name if user_name else 'Unassigned')
+                    for ip, hostname, user_name in nodes_list]
+
+
+class UserProfilesModel(DiffTableModel):
+    """User profiles with the number of beltpacks currently using each"""
+    
+    COLUMNS = ["User", "Devices"]
+    
+    def snapshot_rows(self):
+        """Current users as model rows"""
+        with node_lock:
+            device_counts = defaultdict(int)
+            for node_data in active_nodes.values():
+                device_counts[node_data.get('user_name')] += 1
         
-        self.level_meter.setValue(int(self.peak_decay))
+        with config_lock:
+            user_names = list(users.keys())
         
-        # Color-code based on level
-        if level_percent > 80:
-            self.level_meter.setStyleSheet("""
-                QProgressBar { background-color: #1a1a1d; border: 1px solid #d22; border-radius: 3px; }
-                QProgressBar::chunk { background: #d22; border-radius: 2px; }
-            """)
-        elif level_percent > 60:
-            self.level_meter.setStyleSheet("""
-                QProgressBar { background-color: #1a1a1d; border: 1px solid #da2; border-radius: 3px; }
-                QProgressBar::chunk { background: #da2; border-radius: 2px; }
-            """)
-        else:
-            self.level_meter.setStyleSheet("""
-                QProgressBar { background-color: #1a1a1d; border: 1px solid #3d3d42; border-radius: 3px; }
-                QProgressBar::chunk {
-                    background: qlineargradient(x1:0, y1:1, x2:0, y2:0,
-                        stop:0 #2a2, stop:0.6 #2a2, 
-                        stop:0.6 #da2, stop:0.8 #da2,
-                        stop:0.8 #d22, stop:1 #d22);
-                    border-radius: 2px;
-                }
-            """)
+        return [(user_name, user_name, f"📱 {device_counts[user_name]}" if device_counts[user_name] else "")
+                for user_name in user_names]
+
+
+class ActionButtonsDelegate(QStyledItemDelegate):
+    """Paints a row of push buttons inside a cell and reports clicks
+    
+    Replaces per-row QPushButton cell widgets; nothing is created per row, the
+    buttons are drawn on demand for visible cells only.
+    """
+    
+    clicked = pyqtSignal(str, str)  # (action, row key)
+    
+    BUTTON_SPACING = 6
+    MARGIN = 4
+    
+    def __init__(self, actions, parent=None):
+        super().__init__(parent)
+        self.actions = actions  # [(action, label)]
+        self.pressed = None  # (row key, action) while mouse is down
+    
+    def button_rects(self, rect):
+        """Split a cell rect into one rect per action"""
+        inner = rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        count = len(self.actions)
+        width = (inner.width() - self.BUTTON_SPACING * (count - 1)) // count
+        return [QRect(inner.left() + i * (width + self.BUTTON_SPACING), inner.top(), width, inner.height())
+                for i in range(count)]
+    
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        key = index.data(DiffTableModel.KEY_ROLE)
+        for (action, label), rect in zip(self.actions, self.button_rects(option.rect)):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = label
+            button.state = QStyle.StateFlag.State_Enabled
+            if self.pressed == (key, action):
+                button.state |= QStyle.StateFlag.State_Sunken
+            else:
+                button.state |= QStyle.StateFlag.State_Raised
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, widget)
+    
+    def sizeHint(self, option, index):
+        return QSize(90 * len(self.actions), 36)
+    
+    def action_at(self, option, pos):
+        for (action, label), rect in zip(self.actions, self.button_rects(option.rect)):
+            if rect.contains(pos):
+                return action
+        return None
+    
+    def editorEvent(self, event, model, option, index):
+        event_type = event.type()
+        if event_type not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        
+        key = index.data(DiffTableModel.KEY_ROLE)
+        action = self.action_at(option, event.position().toPoint())
+        if event_type == QEvent.Type.MouseButtonPress:
+            self.pressed = (key, action) if action else None
+            return action is not None
+        
+        was_pressed = self.pressed
+        self.pressed = None
+        if action and was_pressed == (key, action):
+            self.clicked.emit(action, key)
+        return was_pressed is not None
 
 
 # ===== MAIN GUI =====
@@ -1114,6 +2628,8 @@ class ChannelStrip(QFrame):
 class ServerGUI(QMainWindow):
     """Commercial-grade intercom server GUI"""
     
+    devices_ready = pyqtSignal()
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("LanComm Server v1.0.0")
@@ -1125,18 +2641,35 @@ class ServerGUI(QMainWindow):
         main_layout.setContentsMargins(10, 10, 10, 10)
         main_layout.setSpacing(8)
         
-        # Tab widget
+        # Widgets owned by lazily-built tabs
+        self.channel_strips = {}
+        self.nodes_table = None
+        self.user_model = None
+        
+        # Tab widget - each tab is built on first view
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)
-        self.tabs.addTab(self.create_matrix_tab(), "� User")
-        self.tabs.addTab(self.create_fourwire_tab(), "🔌 4-Wire")
-        self.tabs.addTab(self.create_mixer_tab(), "🎚️ Mixer")
-        self.tabs.addTab(self.create_nodes_tab(), "📡 Beltpacks")
+        self.tab_builders = {}
+        for builder, title in [(self.create_matrix_tab, "� User"),
+                               (self.create_fourwire_tab, "🔌 4-Wire"),
+                               (self.create_mixer_tab, "🎚️ Mixer"),
+                               (self.create_nodes_tab, "📡 Beltpacks")]:
+            placeholder = QWidget()
+            placeholder_layout = QVBoxLayout(placeholder)
+            placeholder_layout.setContentsMargins(0, 0, 0, 0)
+            index = self.tabs.addTab(placeholder, title)
+            self.tab_builders[index] = builder
+        self.tabs.currentChanged.connect(self.ensure_tab_built)
+        self.ensure_tab_built(self.tabs.currentIndex())
         main_layout.addWidget(self.tabs)
         
         # Status bar
         main_layout.addWidget(self.create_status_bar())
         
+        # Refresh device combos once background enumeration finishes
+        self.devices_ready.connect(self.on_audio_devices_ready)
+        on_audio_devices_ready(self.devices_ready.emit)
+        
         # Update timer - faster for level meters
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_status)
@@ -1147,6 +2680,82 @@ class ServerGUI(QMainWindow):
         self.node_refresh_timer.timeout.connect(self.refresh_nodes_list)
         self.node_refresh_timer.start(2000)  # 2 seconds
     
+    def ensure_tab_built(self, index):
+        """Build a tab's contents the first time it is shown"""
+        builder = self.tab_builders.pop(index, None)
+        if builder is None:
+            return
+        start = time.perf_counter()
+        self.tabs.widget(index).layout().addWidget(builder())
+        logging.debug(f"Built tab '{self.tabs.tabText(index)}' in {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    def fill_device_combo(self, combo, direction, selected, with_channels=False):
+        """Fill an audio device combo from the background device scan
+        
+        Args:
+            direction: 'input' or 'output'
+            selected: device index to select (or None)
+            with_channels: store (index, max_channels) as item data instead of index
+        """
+        combo.blockSignals(True)
+        combo.clear()
+        if not audio_devices_ready.is_set():
+            combo.addItem("Scanning audio devices...", None)
+            combo.setEnabled(False)
+            combo.blockSignals(False)
+            return
+        
+        combo.setEnabled(True)
+        combo.addItem("-- No Device --", None)
+        key = 'max_input' if direction == 'input' else 'max_output'
+        for dev in audio_devices:
+            max_channels = dev[key]
+            if max_channels > 0:
+                if with_channels:
+                    combo.addItem(f"{dev['name']}", (dev['index'], max_channels))
+                else:
+                    combo.addItem(f"{dev['name']} ({max_channels} ch)", dev['index'])
+        
+        if selected is not None:
+            for idx in range(combo.count()):
+                data = combo.itemData(idx)
+                if data is not None and (data[0] if with_channels else data) == selected:
+                    combo.setCurrentIndex(idx)
+                    break
+        combo.blockSignals(False)
+    
+    def sync_program_channel_combo(self):
+        """Rebuild program channel choices for the selected program device"""
+        self.program_channel_combo.blockSignals(True)
+        self.program_channel_combo.clear()
+        device_data = self.program_device_combo.currentData()
+        max_channels = device_data[1] if device_data is not None else 1
+        for i in range(max_channels):
+            self.program_channel_combo.addItem(f"Ch {i+1}", i)
+        
+        with config_lock:
+            idx = self.program_channel_combo.findData(program_audio_channel)
+            if idx >= 0:
+                self.program_channel_combo.setCurrentIndex(idx)
+        self.program_channel_combo.blockSignals(False)
+    
+    def on_audio_devices_ready(self):
+        """Populate device combos on already-built tabs once enumeration is done"""
+        with config_lock:
+            fw_inputs = list(fourwire_input_device)
+            fw_outputs = list(fourwire_output_device)
+            prog_device = program_audio_device
+        
+        if hasattr(self, 'fourwire_input_combo_1'):
+            self.fill_device_combo(self.fourwire_input_combo_1, 'input', fw_inputs[0])
+            self.fill_device_combo(self.fourwire_input_combo_2, 'input', fw_inputs[1])
+            self.fill_device_combo(self.fourwire_output_combo_1, 'output', fw_outputs[0])
+            self.fill_device_combo(self.fourwire_output_combo_2, 'output', fw_outputs[1])
+        
+        if hasattr(self, 'program_device_combo'):
+            self.fill_device_combo(self.program_device_combo, 'input', prog_device, with_channels=True)
+            self.sync_program_channel_combo()
+    
     def create_fourwire_tab(self):
         """4-Wire interface configuration tab"""
         fourwire = QWidget()
@@ -1229,23 +2838,9 @@ class ServerGUI(QMainWindow):
         
         self.fourwire_input_combo_1 = QComboBox()
         self.fourwire_input_combo_1.setMinimumHeight(32)
-        self.fourwire_input_combo_1.addItem("-- No Device --", None)
-        try:
-            if p is not None:
-                for i in range(p.get_device_count()):
-                    info = p.get_device_info_by_index(i)
-                    max_channels = info.get('maxInputChannels', 0)
-                    if isinstance(max_channels, int) and max_channels > 0:
-                        self.fourwire_input_combo_1.addItem(f"{info['name']} ({max_channels} ch)", i)
-        except Exception as e:
-            logging.error(f"Error enumerating input devices: {e}")
-        
         with config_lock:
-            if fourwire_input_device[0] is not None:
-                for idx in range(self.fourwire_input_combo_1.count()):
-                    if self.fourwire_input_combo_1.itemData(idx) == fourwire_input_device[0]:
-                        self.fourwire_input_combo_1.setCurrentIndex(idx)
-                        break
+            selected_device = fourwire_input_device[0]
+        self.fill_device_combo(self.fourwire_input_combo_1, 'input', selected_device)
         
         self.fourwire_input_combo_1.currentIndexChanged.connect(lambda: self.on_fourwire_input_changed(0))
         input_row1.addWidget(self.fourwire_input_combo_1)
@@ -1280,23 +2875,9 @@ class ServerGUI(QMainWindow):
         
         self.fourwire_output_combo_1 = QComboBox()
         self.fourwire_output_combo_1.setMinimumHeight(32)
-        self.fourwire_output_combo_1.addItem("-- No Device --", None)
-        try:
-            if p is not None:
-                for i in range(p.get_device_count()):
-                    info = p.get_device_info_by_index(i)
-                    max_channels = info.get('maxOutputChannels', 0)
-                    if isinstance(max_channels, int) and max_channels > 0:
-                        self.fourwire_output_combo_1.addItem(f"{info['name']} ({max_channels} ch)", i)
-        except Exception as e:
-            logging.error(f"Error enumerating output devices: {e}")
-        
         with config_lock:
-            if fourwire_output_device[0] is not None:
-                for idx in range(self.fourwire_output_combo_1.count()):
-                    if self.fourwire_output_combo_1.itemData(idx) == fourwire_output_device[0]:
-                        self.fourwire_output_combo_1.setCurrentIndex(idx)
-                        break
+            selected_device = fourwire_output_device[0]
+        self.fill_device_combo(self.fourwire_output_combo_1, 'output', selected_device)
         
         self.fourwire_output_combo_1.currentIndexChanged.connect(lambda: self.on_fourwire_output_changed(0))
         output_row1.addWidget(self.fourwire_output_combo_1)
@@ -1386,23 +2967,9 @@ class ServerGUI(QMainWindow):
         
         self.fourwire_input_combo_2 = QComboBox()
         self.fourwire_input_combo_2.setMinimumHeight(32)
-        self.fourwire_input_combo_2.addItem("-- No Device --", None)
-        try:
-            if p is not None:
-                for i in range(p.get_device_count()):
-                    info = p.get_device_info_by_index(i)
-                    max_channels = info.get('maxInputChannels', 0)
-                    if isinstance(max_channels, int) and max_channels > 0:
-                        self.fourwire_input_combo_2.addItem(f"{info['name']} ({max_channels} ch)", i)
-        except Exception as e:
-            logging.error(f"Error enumerating input devices: {e}")
-        
         with config_lock:
-            if fourwire_input_device[1] is not None:
-                for idx in range(self.fourwire_input_combo_2.count()):
-                    if self.fourwire_input_combo_2.itemData(idx) == fourwire_input_device[1]:
-                        self.fourwire_input_combo_2.setCurrentIndex(idx)
-                        break
+            selected_device = fourwire_input_device[1]
+        self.fill_device_combo(self.fourwire_input_combo_2, 'input', selected_device)
         
         self.fourwire_input_combo_2.currentIndexChanged.connect(lambda: self.on_fourwire_input_changed(1))
         input_row2.addWidget(self.fourwire_input_combo_2)
@@ -1437,23 +3004,9 @@ class ServerGUI(QMainWindow):
         
         self.fourwire_output_combo_2 = QComboBox()
         self.fourwire_output_combo_2.setMinimumHeight(32)
-        self.fourwire_output_combo_2.addItem("-- No Device --", None)
-        try:
-            if p is not None:
-                for i in range(p.get_device_count()):
-                    info = p.get_device_info_by_index(i)
-                    max_channels = info.get('maxOutputChannels', 0)
-                    if isinstance(max_channels, int) and max_channels > 0:
-                        self.fourwire_output_combo_2.addItem(f"{info['name']} ({max_channels} ch)", i)
-        except Exception as e:
-            logging.error(f"Error enumerating output devices: {e}")
-        
         with config_lock:
-            if fourwire_output_device[1] is not None:
-                for idx in range(self.fourwire_output_combo_2.count()):
-                    if self.fourwire_output_combo_2.itemData(idx) == fourwire_output_device[1]:
-                        self.fourwire_output_combo_2.setCurrentIndex(idx)
-                        break
+            selected_device = fourwire_output_device[1]
+        self.fill_device_combo(self.fourwire_output_combo_2, 'output', selected_device)
         
         self.fourwire_output_combo_2.currentIndexChanged.connect(lambda: self.on_fourwire_output_changed(1))
         output_row2.addWidget(self.fourwire_output_combo_2)
@@ -1508,30 +3061,11 @@ class ServerGUI(QMainWindow):
         self.program_device_combo = QComboBox()
         self.program_device_combo.setMinimumWidth(200)
         self.program_device_combo.setMinimumHeight(32)
-        self.program_device_combo.addItem("-- No Device --", None)
-        
-        # Get available audio input devices
-        try:
-            if p is not None:
-                for i in range(p.get_device_count()):
-                    info = p.get_device_info_by_index(i)
-                    max_channels = info.get('maxInputChannels', 0)  # type: ignore
-                    if isinstance(max_channels, int) and max_channels > 0:
-                        self.program_device_combo.addItem(f"{info['name']}", (i, max_channels))
-                        logging.debug(f"Found input device: {info['name']} ({info['maxInputChannels']} channels)")
-            else:
-                logging.warning("PyAudio not initialized - no audio devices available")
-        except Exception as e:
-            logging.error(f"Error enumerating audio devices: {e}")
         
-        # Set current device
+        # Devices come from the background scan; refilled when it completes
         with config_lock:
-            if program_audio_device is not None:
-                for idx in range(self.program_device_combo.count()):
-                    data = self.program_device_combo.itemData(idx)
-                    if data is not None and data[0] == program_audio_device:
-                        self.program_device_combo.setCurrentIndex(idx)
-                        break
+            selected_device = program_audio_device
+        self.fill_device_combo(self.program_device_combo, 'input', selected_device, with_channels=True)
         
         self.program_device_combo.currentIndexChanged.connect(self.on_program_device_changed)
         header_layout.addWidget(self.program_device_combo)
@@ -1544,20 +3078,7 @@ class ServerGUI(QMainWindow):
         self.program_channel_combo = QComboBox()
         self.program_channel_combo.setMinimumWidth(80)
         self.program_channel_combo.setMinimumHeight(32)
-        self.program_channel_combo.addItem("Ch 1", 0)
-        
-        # Update channel list based on device
-        device_data = self.program_device_combo.currentData()
-        if device_data is not None:
-            max_channels = device_data[1]
-            self.program_channel_combo.clear()
-            for i in range(max_channels):
-                self.program_channel_combo.addItem(f"Ch {i+1}", i)
-        
-        with config_lock:
-            idx = self.program_channel_combo.findData(program_audio_channel)
-            if idx >= 0:
-                self.program_channel_combo.setCurrentIndex(idx)
+        self.sync_program_channel_combo()
         
         self.program_channel_combo.currentIndexChanged.connect(self.on_program_channel_changed)
         header_layout.addWidget(self.program_channel_combo)
@@ -1617,19 +3138,31 @@ class ServerGUI(QMainWindow):
         title.setStyleSheet("font-size: 12pt; font-weight: bold; color: #5096ff; padding: 4px;")
         layout.addWidget(title)
         
-        # Nodes table
-        self.nodes_table = QTableWidget()
-        self.nodes_table.setColumnCount(4)
-        self.nodes_table.setHorizontalHeaderLabels(["IP Address", "Hostname", "Assigned User", "Actions"])
-        self.nodes_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.nodes_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        # Nodes table - model/view so refreshes only touch rows that changed
+        self.nodes_model = NodesTableModel(self)
+        self.nodes_table = QTableView()
+        self.nodes_table.setModel(self.nodes_model)
+        self.nodes_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.nodes_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.nodes_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.nodes_table.verticalHeader().setDefaultSectionSize(40)
         header = self.nodes_table.horizontalHeader()
         if header:
             header.setStretchLastSection(False)
         self.nodes_table.setColumnWidth(0, 150)
         self.nodes_table.setColumnWidth(1, 150)
         self.nodes_table.setColumnWidth(2, 200)
-        self.nodes_table.setColumnWidth(3, 200)
+        self.nodes_table.setColumnWidth(3, 300)
+        
+        # Actions column - Assign Profile, Rename, Flash painted by a delegate
+        self.node_actions = {'assign': self.assign_profile_to_node,
+                             'rename': self.rename_device,
+                             'flash': self.flash_node}
+        self.nodes_delegate = ActionButtonsDelegate([('assign', "Assign Profile"),
+                                                     ('rename', "Rename"),
+                                                     ('flash', "Flash")], self.nodes_table)
+        self.nodes_delegate.clicked.connect(lambda action, ip: self.node_actions[action](ip))
+        self.nodes_table.setItemDelegateForColumn(3, self.nodes_delegate)
         layout.addWidget(self.nodes_table)
         
         # Refresh button
@@ -1644,56 +3177,15 @@ class ServerGUI(QMainWindow):
         return nodes
     
     def refresh_nodes_list(self):
-        """Update nodes table with current active nodes"""
-        with node_lock:
-            nodes_list = list(active_nodes.items())
+        """Update nodes table with current active nodes (only changed rows repaint)"""
+        # Device counts in the user list follow the same registry
+        if self.user_model is not None:
+            self.user_model.apply_rows(self.user_model.snapshot_rows())
         
-        self.nodes_table.setRowCount(len(nodes_list))
+        if self.nodes_table is None:
+            return  # Beltpacks tab not built yet
         
-        for row, (ip, node_data) in enumerate(nodes_list):
-            # IP Address
-            ip_item = QTableWidgetItem(ip)
-            ip_item.setFlags(ip_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.nodes_table.setItem(row, 0, ip_item)
-            
-            # Hostname - show custom name if available
-            with config_lock:
-                display_name = device_names.get(ip, node_data.get('hostname', 'Unknown'))
-            hostname_item = QTableWidgetItem(display_name)
-            hostname_item.setFlags(hostname_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.nodes_table.setItem(row, 1, hostname_item)
-            
-            # Assigned User
-            user_name = node_data.get('user_name')
-            user_item = QTableWidgetItem(user_name if user_name else 'Unassigned')
-            user_item.setFlags(user_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.nodes_table.setItem(row, 2, user_item)
-            
-            # Actions - Assign Profile, Rename, Flash buttons
-            action_widget = QWidget()
-            action_layout = QHBoxLayout(action_widget)
-            action_layout.setContentsMargins(4, 4, 4, 4)
-            
-            assign_btn = QPushButton("Assign Profile")
-            assign_btn.setMinimumHeight(28)
-            assign_btn.setProperty('node_ip', ip)
-            assign_btn.clicked.connect(lambda checked, n=ip: self.assign_profile_to_node(n))
-            action_layout.addWidget(assign_btn)
-            
-            rename_btn = QPushButton("Rename")
-            rename_btn.setMinimumHeight(28)
-            rename_btn.setProperty('node_ip', ip)
-            rename_btn.clicked.connect(lambda checked, n=ip: self.rename_device(n))
-            action_layout.addWidget(rename_btn)
-            
-            flash_btn = QPushButton("Flash")
-            flash_btn.setMinimumHeight(28)
-            flash_btn.setProperty('node_ip', ip)
-            flash_btn.clicked.connect(lambda checked, n=ip: self.flash_node(n))
-            action_layout.addWidget(flash_btn)
-            
-            action_layout.addStretch()
-            self.nodes_table.setCellWidget(row, 3, action_widget)
+        self.nodes_model.apply_rows(self.nodes_model.snapshot_rows())
     
     def assign_profile_to_node(self, node_ip):
         """Show dialog to assign user profile to a node"""
@@ -1709,23 +3201,16 @@ class ServerGUI(QMainWindow):
                                               user_list, 0, False)
         
         if ok and user_name:
-            # Find the node's client socket and send ASSIGN_USER command
+            # The event loop binds the node's connection and sends ASSIGN_USER + config
             with client_lock:
-                for addr, client in client_data.items():
-                    if client.get('node_ip') == node_ip:
-                        try:
-                            sock = client.get('sock')
-                            if sock:
-                                sock.write(f"ASSIGN_USER:{user_name}".encode())
-                                asyncio.create_task(sock.drain())
-                                self.status_label.setText(f"● Assigned {user_name} to {node_ip}")
-                                logging.info(f"Assigned profile {user_name} to node {node_ip}")
-                                QMessageBox.information(self, "Success", 
-                                                       f"Profile '{user_name}' assigned to node {node_ip}")
-                                self.refresh_nodes_list()
-                                return
-                        except Exception as e:
-                            logging.error(f"Failed to assign profile: {e}")
+                connected = any(client.get('node_ip') == node_ip for client in client_data.values())
+            
+            if connected and config_broadcaster.assign_user(node_ip, user_name):
+                self.status_label.setText(f"● Assigned {user_name} to {node_ip}")
+                QMessageBox.information(self, "Success", 
+                                       f"Profile '{user_name}' assigned to node {node_ip}")
+                self.refresh_nodes_list()
+                return
             
             QMessageBox.warning(self, "Error", f"Node {node_ip} not connected")
     
@@ -1763,20 +3248,14 @@ class ServerGUI(QMainWindow):
     def flash_node(self, node_ip):
         """Send flash command to node to identify it"""
         with client_lock:
-            for addr, client in client_data.items():
-                if client.get('node_ip') == node_ip:
-                    try:
-                        sock = client.get('sock')
-                        if sock:
-                            sock.write(b"FLASH_PACK")
-                            asyncio.create_task(sock.drain())
-                            self.status_label.setText(f"● Flashing node {node_ip}")
-                            logging.info(f"Flash command sent to {node_ip}")
-                            QMessageBox.information(self, "Flash Sent", 
-                                                   f"Flash command sent to node {node_ip}")
-                            return
-                    except Exception as e:
-                        logging.error(f"Failed to flash node: {e}")
+            connected = any(client.get('node_ip') == node_ip for client in client_data.values())
+        
+        if connected and config_broadcaster.send_to_node(node_ip, encode_frame('FLASH_PACK')):
+            self.status_label.setText(f"● Flashing node {node_ip}")
+            logging.info(f"Flash command sent to {node_ip}")
+            QMessageBox.information(self, "Flash Sent", 
+                                   f"Flash command sent to node {node_ip}")
+            return
         
         QMessageBox.warning(self, "Error", f"Node {node_ip} not connected")
     
@@ -1942,26 +3421,35 @@ class ServerGUI(QMainWindow):
         user_list_label.setStyleSheet("font-size: 11pt; font-weight: bold; color: #5096ff; padding: 4px;")
         left_layout.addWidget(user_list_label)
         
-        from PyQt6.QtWidgets import QListWidget
-        self.user_list_widget = QListWidget()
-        self.user_list_widget.setMinimumWidth(200)
-        self.user_list_widget.setStyleSheet("""
-            QListWidget {
+        self.user_model = UserProfilesModel(self)
+        self.user_table = QTableView()
+        self.user_table.setModel(self.user_model)
+        self.user_table.setMinimumWidth(200)
+        self.user_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.user_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.user_table.setShowGrid(False)
+        self.user_table.verticalHeader().hide()
+        self.user_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.user_table.verticalHeader().setDefaultSectionSize(40)
+        self.user_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.user_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        self.user_table.setStyleSheet("""
+            QTableView {
                 background-color: #232326; border: 1px solid #3a3a3f; border-radius: 4px;
                 padding: 4px; color: #e6e6eb; font-size: 11pt;
             }
-            QListWidget::item {
-                padding: 10px; border-radius: 3px; margin: 2px;
+            QTableView::item {
+                padding: 10px;
             }
-            QListWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #2d2d32;
             }
-            QListWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #5096ff; color: #ffffff;
             }
         """)
-        self.user_list_widget.currentItemChanged.connect(self.on_user_selected)
-        left_layout.addWidget(self.user_list_widget)
+        self.user_table.selectionModel().currentRowChanged.connect(self.on_user_selected)
+        left_layout.addWidget(self.user_table)
         
         content_splitter.addWidget(left_panel)
         
@@ -1994,6 +3482,13 @@ class ServerGUI(QMainWindow):
         """)
         self.no_selection_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.settings_layout.addWidget(self.no_selection_label)
+        
+        # Settings widgets are built once and updated in place per user
+        self.settings_user = None
+        self.settings_channel_items = None
+        self.settings_panel = self.create_settings_panel()
+        self.settings_panel.hide()
+        self.settings_layout.addWidget(self.settings_panel)
         self.settings_layout.addStretch()
         
         scroll.setWidget(self.settings_container)
@@ -2009,37 +3504,14 @@ class ServerGUI(QMainWindow):
         
         return matrix
     
-    def push_config_update(self, user_name):
-        """Push updated config to all connected clients using this user profile"""
-        with config_lock:
-            if user_name not in users:
-                return
-            
-            sub_channels = set([ch for ch in users[user_name]['channels'] if ch is not None])
-            # Filter to only enabled channels
-            sub_channels_filtered = {ch for ch in sub_channels if channel_enabled.get(ch, False)}
-            ch_names = {str(ch): channels.get(ch, f'CH{ch}') for ch in sub_channels_filtered}
-            button_modes = users[user_name].get('button_modes', {})
-            config_data = {'channels': ch_names, 'button_modes': button_modes}
-            config_msg = f"UPDATE_CONFIG:{json.dumps(config_data)}".encode()
-        
-        # Send to all connected clients using this profile
-        push_count = 0
-        with client_lock:
-            for addr, client in list(client_data.items()):
-                if client.get('user_name') == user_name:
-                    try:
-                        sock = client.get('sock')
-                        if sock:
-                            sock.write(config_msg)
-                            asyncio.create_task(sock.drain())
-                            push_count += 1
-                    except Exception as e:
-                        logging.error(f"Failed to push config to {addr}: {e}")
-        
-        if push_count > 0:
-            logging.info(f"Pushed config update to {push_count} client(s) for user '{user_name}'")
-            self.status_label.setText(f"● Config pushed to {push_count} device(s)")
+    def push_config_update(self, user_name=None):
+        """Queue a config push for packs on this profile (None = all profiles)
+        
+        The send happens on the event loop; bursts of edits are coalesced into one
+        delta per pack.
+        """
+        if config_broadcaster.config_changed(user_name) and user_name is not None:
+            self.status_label.setText(f"● Config update queued for '{user_name}'")
     
     def create_status_bar(self):
         """Status bar with live info"""
@@ -2055,6 +3527,7 @@ class ServerGUI(QMainWindow):
         
         self.status_label = QLabel("● Ready")
         self.status_label.setStyleSheet("color: #4a4; font-weight: bold; font-size: 10pt;")
+        self.status_online = None
         layout.addWidget(self.status_label)
         
         layout.addStretch()
@@ -2164,67 +3637,44 @@ class ServerGUI(QMainWindow):
                                    "No devices are currently using this profile.")
     
     def refresh_user_list(self):
-        """Update the user list widget"""
-        self.user_list_widget.clear()
-        with config_lock:
-            for user_name in sorted(users.keys()):
-                device_count = self.get_device_count(user_name)
-                display_text = f"{user_name}"
-                if device_count > 0:
-                    display_text += f"  (📱 {device_count})"
-                
-                from PyQt6.QtWidgets import QListWidgetItem
-                item = QListWidgetItem(display_text)
-                item.setData(Qt.ItemDataRole.UserRole, user_name)
-                self.user_list_widget.addItem(item)
+        """Update the user list model (incremental - selection is kept)"""
+        self.user_model.apply_rows(self.user_model.snapshot_rows())
+    
+    def selected_user(self):
+        """Name of the user selected in the list, or None"""
+        index = self.user_table.currentIndex()
+        return index.data(DiffTableModel.KEY_ROLE) if index.isValid() else None
+    
+    def select_user(self, user_name):
+        """Select a user in the list (None clears the selection and settings panel)"""
+        row = self.user_model.row_of(user_name) if user_name is not None else -1
+        if row < 0:
+            self.user_table.setCurrentIndex(QModelIndex())
+            self.clear_settings_panel()
+            return
+        self.user_table.setCurrentIndex(self.user_model.index(row, 0))
     
     def on_user_selected(self, current, previous):
         """Handle user selection in the list"""
-        if not current:
+        if not current.isValid():
             self.clear_settings_panel()
             return
         
-        user_name = current.data(Qt.ItemDataRole.UserRole)
+        user_name = current.data(DiffTableModel.KEY_ROLE)
         self.populate_settings_panel(user_name)
     
     def clear_settings_panel(self):
-        """Clear all widgets from settings panel"""
-        while self.settings_layout.count():
-            item = self.settings_layout.takeAt(0)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widget.deleteLater()
-        
-        # Show placeholder
-        self.no_selection_label = QLabel("← Select a user profile to edit settings")
-        self.no_selection_label.setStyleSheet("""
-            color: #a0a0a5; font-size: 12pt; font-style: italic;
-            padding: 40px; background-color: transparent;
-        """)
-        self.no_selection_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.settings_layout.addWidget(self.no_selection_label)
-        self.settings_layout.addStretch()
+        """Hide the settings widgets and show the placeholder"""
+        self.settings_user = None
+        self.settings_panel.hide()
+        self.no_selection_label.show()
     
-    def populate_settings_panel(self, user_name):
-        """Populate the settings panel with user configuration options"""
-        # Clear existing widgets
-        while self.settings_layout.count():
-            item = self.settings_layout.takeAt(0)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widget.deleteLater()
-        
-        with config_lock:
-            if user_name not in users:
-                return
-            user_channels = users[user_name]['channels'].copy()
-            button_modes = users[user_name].get('button_modes', {}).copy()
-            # Only show enabled/active channels
-            available_channels = {ch_id: name for ch_id, name in channels.items() 
-                                 if channel_enabled.get(ch_id, False)}
-            available_channels[-1] = 'Program'
+    def create_settings_panel(self):
+        """Build the user settings widgets once; populate_settings_panel fills them in"""
+        panel = QWidget()
+        panel_layout = QVBoxLayout(panel)
+        panel_layout.setContentsMargins(0, 0, 0, 0)
+        panel_layout.setSpacing(15)
         
         # Action buttons
         actions_group = QGroupBox("Actions")
@@ -2233,34 +3683,33 @@ class ServerGUI(QMainWindow):
         
         rename_btn = QPushButton("✏️ Rename User")
         rename_btn.setMinimumHeight(35)
-        rename_btn.clicked.connect(lambda: self.rename_user_inline(user_name))
+        rename_btn.clicked.connect(lambda: self.rename_user_inline(self.settings_user))
         actions_layout.addWidget(rename_btn)
         
         duplicate_btn = QPushButton("📋 Duplicate User")
         duplicate_btn.setMinimumHeight(35)
-        duplicate_btn.clicked.connect(lambda: self.duplicate_user_inline(user_name))
+        duplicate_btn.clicked.connect(lambda: self.duplicate_user_inline(self.settings_user))
         actions_layout.addWidget(duplicate_btn)
         
         delete_btn = QPushButton("🗑 Delete User")
         delete_btn.setMinimumHeight(35)
-        delete_btn.clicked.connect(lambda: self.delete_user_inline(user_name))
+        delete_btn.clicked.connect(lambda: self.delete_user_inline(self.settings_user))
         actions_layout.addWidget(delete_btn)
         
         flash_btn = QPushButton("💡 Flash User")
         flash_btn.setMinimumHeight(35)
-        flash_btn.clicked.connect(lambda: self.flash_user_packs(user_name))
+        flash_btn.clicked.connect(lambda: self.flash_user_packs(self.settings_user))
         actions_layout.addWidget(flash_btn)
         
         actions_group.setLayout(actions_layout)
-        self.settings_layout.addWidget(actions_group)
+        panel_layout.addWidget(actions_group)
         
         # Device info
-        device_count = self.get_device_count(user_name)
-        device_info_label = QLabel(f"📱 {device_count} device(s) using this profile")
-        device_info_label.setStyleSheet("color: #5096ff; font-size: 10pt; padding: 5px;")
-        device_info_label.setCursor(Qt.CursorShape.PointingHandCursor)
-        device_info_label.mousePressEvent = lambda ev: self.show_device_list(user_name)
-        self.settings_layout.addWidget(device_info_label)
+        self.device_info_label = QLabel()
+        self.device_info_label.setStyleSheet("color: #5096ff; font-size: 10pt; padding: 5px;")
+        self.device_info_label.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.device_info_label.mousePressEvent = lambda ev: self.show_device_list(self.settings_user)
+        panel_layout.addWidget(self.device_info_label)
         
         # Channel assignments - compact 2x2 grid
         channels_group = QGroupBox("Channel Assignments")
@@ -2268,6 +3717,8 @@ class ServerGUI(QMainWindow):
         channels_grid.setSpacing(6)
         channels_grid.setContentsMargins(8, 8, 8, 8)
         
+        self.slot_channel_combos = []
+        self.slot_mode_combos = []
         for slot in range(MAX_USER_CHANNELS):
             row = slot // 2
             col = slot % 2
@@ -2296,25 +3747,11 @@ class ServerGUI(QMainWindow):
             
             ch_combo = QComboBox()
             ch_combo.setMinimumHeight(26)
-            ch_combo.addItem("-- None --", None)
-            for ch_id in sorted(available_channels.keys()):
-                ch_name = available_channels[ch_id]
-                ch_combo.addItem(ch_name, ch_id)
-            
-            current_ch = None
-            if slot < len(user_channels):
-                current_ch = user_channels[slot]
-            
-            if current_ch is not None:
-                idx_ch = ch_combo.findData(current_ch)
-                if idx_ch >= 0:
-                    ch_combo.setCurrentIndex(idx_ch)
-            
-            ch_combo.setProperty('user_name', user_name)
             ch_combo.setProperty('slot', slot)
             ch_combo.currentIndexChanged.connect(lambda idx, c=ch_combo: self.on_slot_changed(c))
             ch_layout.addWidget(ch_combo)
             slot_layout.addLayout(ch_layout)
+            self.slot_channel_combos.append(ch_combo)
             
             # Latching mode
             mode_layout = QHBoxLayout()
@@ -2323,24 +3760,70 @@ class ServerGUI(QMainWindow):
             mode_label.setStyleSheet("color: #e6e6eb; font-size: 9pt;")
             mode_layout.addWidget(mode_label)
             
-            current_mode = button_modes.get(str(slot), 'latch')
             mode_combo = QComboBox()
             mode_combo.setMinimumHeight(26)
             mode_combo.addItem("Off", "non-latch")
             mode_combo.addItem("On", "latch")
-            mode_combo.setCurrentIndex(1 if current_mode == 'latch' else 0)
-            mode_combo.setProperty('user_name', user_name)
             mode_combo.setProperty('slot', slot)
             mode_combo.currentIndexChanged.connect(lambda idx, c=mode_combo: self.on_mode_changed(c))
             mode_layout.addWidget(mode_combo)
             slot_layout.addLayout(mode_layout)
+            self.slot_mode_combos.append(mode_combo)
             
             channels_grid.addWidget(slot_container, row, col)
         
         channels_group.setLayout(channels_grid)
-        self.settings_layout.addWidget(channels_group)
+        panel_layout.addWidget(channels_group)
         
-        self.settings_layout.addStretch()
+        return panel
+    
+    def populate_settings_panel(self, user_name):
+        """Show a user's configuration in the settings panel (widgets are updated in place)"""
+        with config_lock:
+            if user_name not in users:
+                return
+            user_channels = users[user_name]['channels'].copy()
+            button_modes = users[user_name].get('button_modes', {}).copy()
+            # Only show enabled/active channels
+            available_channels = {ch_id: name for ch_id, name in channels.items() 
+                                 if channel_enabled.get(ch_id, False)}
+            available_channels[-1] = 'Program'
+        
+        self.settings_user = user_name
+        channel_items = [(available_channels[ch_id], ch_id) for ch_id in sorted(available_channels.keys())]
+        
+        for slot in range(MAX_USER_CHANNELS):
+            ch_combo = self.slot_channel_combos[slot]
+            mode_combo = self.slot_mode_combos[slot]
+            ch_combo.blockSignals(True)
+            mode_combo.blockSignals(True)
+            
+            # Channel list only changes when channels are renamed/enabled
+            if channel_items != self.settings_channel_items:
+                ch_combo.clear()
+                ch_combo.addItem("-- None --", None)
+                for ch_name, ch_id in channel_items:
+                    ch_combo.addItem(ch_name, ch_id)
+            
+            current_ch = user_channels[slot] if slot < len(user_channels) else None
+            idx_ch = ch_combo.findData(current_ch) if current_ch is not None else 0
+            ch_combo.setCurrentIndex(idx_ch if idx_ch >= 0 else 0)
+            ch_combo.setProperty('user_name', user_name)
+            
+            current_mode = button_modes.get(str(slot), 'latch')
+            mode_combo.setCurrentIndex(1 if current_mode == 'latch' else 0)
+            mode_combo.setProperty('user_name', user_name)
+            
+            ch_combo.blockSignals(False)
+            mode_combo.blockSignals(False)
+        
+        self.settings_channel_items = channel_items
+        
+        device_count = self.get_device_count(user_name)
+        self.device_info_label.setText(f"📱 {device_count} device(s) using this profile")
+        
+        self.no_selection_label.hide()
+        self.settings_panel.show()
     
     def rename_user_inline(self, user_name):
         """Rename user and refresh both list and panel"""
@@ -2362,11 +3845,7 @@ class ServerGUI(QMainWindow):
             
             self.refresh_user_list()
             # Select the renamed user
-            for i in range(self.user_list_widget.count()):
-                item = self.user_list_widget.item(i)
-                if item and item.data(Qt.ItemDataRole.UserRole) == new_name:
-                    self.user_list_widget.setCurrentItem(item)
-                    break
+            self.select_user(new_name)
             
             self.status_label.setText(f"● Renamed: {user_name} → {new_name}")
             logging.info(f"Renamed user: {user_name} → {new_name}")
@@ -2395,11 +3874,7 @@ class ServerGUI(QMainWindow):
             
             self.refresh_user_list()
             # Select the new user
-            for i in range(self.user_list_widget.count()):
-                item = self.user_list_widget.item(i)
-                if item and item.data(Qt.ItemDataRole.UserRole) == new_name:
-                    self.user_list_widget.setCurrentItem(item)
-                    break
+            self.select_user(new_name)
             
             self.status_label.setText(f"● Duplicated: {user_name} → {new_name}")
             logging.info(f"Duplicated user: {user_name} → {new_name}")
@@ -2416,26 +3891,16 @@ class ServerGUI(QMainWindow):
                     del users[user_name]
             
             self.refresh_user_list()
-            self.clear_settings_panel()
+            self.select_user(None)
             self.status_label.setText(f"● Deleted: {user_name}")
             logging.info(f"Deleted user: {user_name}")
     
     def flash_user_packs(self, user_name):
         """Flash all belt packs that have this user profile loaded"""
         with client_lock:
-            flash_count = 0
-            for addr, client in client_data.items():
-                if client.get('user_name') == user_name:
-                    try:
-                        sock = client.get('sock')
-                        if sock:
-                            sock.write(b"FLASH_PACK")
-                            asyncio.create_task(sock.drain())
-                            flash_count += 1
-                    except Exception as e:
-                        logging.error(f"Failed to flash pack at {addr}: {e}")
+            flash_count = sum(1 for client in client_data.values() if client.get('user_name') == user_name)
         
-        if flash_count > 0:
+        if flash_count > 0 and config_broadcaster.send_to_user(user_name, encode_frame('FLASH_PACK')):
             self.status_label.setText(f"● Flashing {flash_count} pack(s) for user '{user_name}'")
             logging.info(f"Flashed {flash_count} pack(s) for user '{user_name}'")
         else:
@@ -2462,6 +3927,7 @@ class ServerGUI(QMainWindow):
             channels[channel_id] = new_name
         
         self.refresh_matrix()
+        self.push_config_update()
         self.status_label.setText(f"● Renamed CH{channel_id}: {new_name}")
         logging.info(f"Channel {channel_id} renamed to: {new_name}")
     
@@ -2499,23 +3965,26 @@ class ServerGUI(QMainWindow):
                 channel_buffers.pop(channel_id, None)
                 channel_last_activity.pop(channel_id, None)
                 channel_seq_tracking.pop(channel_id, None)
+                channel_seq_missing.pop(channel_id, None)
+                channel_arrival_tracking.pop(channel_id, None)
                 channel_levels.pop(channel_id, None)
+                talker_levels.pop(channel_id, None)
+        
+        # Packs drop/regain the channel
+        self.push_config_update()
         
         # Refresh the settings panel if a user is currently selected
-        current_item = self.user_list_widget.currentItem()
-        if current_item:
-            user_name = current_item.data(Qt.ItemDataRole.UserRole)
+        user_name = self.selected_user()
+        if user_name:
             self.populate_settings_panel(user_name)
     
     def save_preset(self):
         """Save configuration preset to file"""
         filename, _ = QFileDialog.getSaveFileName(self, "Save Preset", "", "JSON Files (*.json)")
         if filename:
-            global CONFIG_FILE
-            old_file = CONFIG_FILE
-            CONFIG_FILE = filename
-            save_config()
-            CONFIG_FILE = old_file
+            if write_config_file(filename, config_snapshot()) is None:
+                QMessageBox.warning(self, "Error", f"Could not save preset to {filename}")
+                return
             QMessageBox.information(self, "Success", f"Preset saved to {filename}")
             self.status_label.setText(f"● Preset saved")
     
@@ -2523,11 +3992,7 @@ class ServerGUI(QMainWindow):
         """Load configuration preset from file"""
         filename, _ = QFileDialog.getOpenFileName(self, "Load Preset", "", "JSON Files (*.json)")
         if filename:
-            global CONFIG_FILE
-            old_file = CONFIG_FILE
-            CONFIG_FILE = filename
-            load_config()
-            CONFIG_FILE = old_file
+            load_config(filename)
             
             # Update mixer channel strips
             with config_lock:
@@ -2546,8 +4011,8 @@ class ServerGUI(QMainWindow):
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         
         if reply == QMessageBox.StandardButton.Yes:
-            # Save current config first
-            save_config()
+            # Save current config first (must land before the reset below)
+            save_config(wait=True)
             
             # Create fresh config
             global users, channels, channel_volumes, channel_enabled, active_channel_count
@@ -2570,7 +4035,7 @@ class ServerGUI(QMainWindow):
             
             # Clear user list
             self.refresh_user_list()
-            self.clear_settings_panel()
+            self.select_user(None)
             
             QMessageBox.information(self, "Success", "New configuration created with 4 active channels")
             self.status_label.setText("● New config created")
@@ -2589,20 +4054,24 @@ class ServerGUI(QMainWindow):
                 self.channel_strips[ch_id].name_input.setText(new_name)
             
             # Refresh user profile settings panel if a user is selected
-            current_item = self.user_list_widget.currentItem()
-            if current_item:
-                user_name = current_item.data(Qt.ItemDataRole.UserRole)
+            user_name = self.selected_user()
+            if user_name:
                 self.populate_settings_panel(user_name)
             
             self.refresh_user_list()
+            self.push_config_update()
             self.status_label.setText(f"● Renamed CH{ch_id}: {new_name}")
             logging.info(f"Channel {ch_id} renamed to: {new_name}")
     
     def save_config(self):
         """Save configuration"""
-        save_config()
+        elapsed = save_config(wait=True)
+        if elapsed is None:
+            QMessageBox.warning(self, "Error", f"Could not save configuration to {CONFIG_FILE} (see log)")
+            self.status_label.setText("● Configuration save failed")
+            return
         QMessageBox.information(self, "Success", f"Configuration saved to {CONFIG_FILE}")
-        self.status_label.setText("● Configuration saved")
+        self.status_label.setText(f"● Configuration saved ({elapsed * 1000:.0f} ms)")
     
     def load_config(self):
         """Load configuration"""
@@ -2623,11 +4092,9 @@ class ServerGUI(QMainWindow):
         filename, _ = QFileDialog.getSaveFileName(self, "Export Configuration", "", "JSON Files (*.json)")
         
         if filename:
-            global CONFIG_FILE
-            old_file = CONFIG_FILE
-            CONFIG_FILE = filename
-            save_config()
-            CONFIG_FILE = old_file
+            if write_config_file(filename, config_snapshot()) is None:
+                QMessageBox.warning(self, "Error", f"Could not export to {filename}")
+                return
             
             QMessageBox.information(self, "Success", f"Exported to {filename}")
             self.status_label.setText(f"● Exported to {filename}")
@@ -2641,20 +4108,28 @@ class ServerGUI(QMainWindow):
             active_talkers = sum(len(v) for v in channel_talkers.values())
             levels_copy = dict(channel_levels)  # Copy for thread safety
         
-        # Update level meters for all channel strips
-        for ch_id, strip in self.channel_strips.items():
-            level = levels_copy.get(ch_id, 0.0)
-            strip.update_level(level)
+        self.update_meters(levels_copy)
         
         self.clients_label.setText(f"Clients: {active_clients}")
         self.talkers_label.setText(f"Talkers: {active_talkers}")
         
-        if active_clients > 0:
-            self.status_label.setText("● Online")
-            self.status_label.setStyleSheet("color: #4a4; font-weight: bold; font-size: 10pt;")
-        else:
-            self.status_label.setText("● Standby")
-            self.status_label.setStyleSheet("color: #ff9650; font-weight: bold; font-size: 10pt;")
+        online = active_clients > 0
+        self.status_label.setText("● Online" if online else "● Standby")
+        # Restyle only on state change - setStyleSheet forces a CSS re-parse
+        if online != self.status_online:
+            self.status_online = online
+            color = "#4a4" if online else "#ff9650"
+            self.status_label.setStyleSheet(f"color: {color}; font-weight: bold; font-size: 10pt;")
+    
+    def update_meters(self, levels):
+        """Apply one frame of channel levels to all meters in a single batch"""
+        if not self.channel_strips:
+            return
+        # Hidden meters are not painted; skip the work until the mixer is shown
+        if not self.tabs.currentWidget().isAncestorOf(next(iter(self.channel_strips.values()))):
+            return
+        for ch_id, strip in self.channel_strips.items():
+            strip.level_meter.set_level(levels.get(ch_id, 0.0))
     
     def on_fourwire_toggled(self, interface_idx):
         """Toggle 4-wire interface on/off"""
@@ -2696,9 +4171,6 @@ class ServerGUI(QMainWindow):
         # If 4-wire is currently enabled, restart with new config
         if fourwire_enabled[interface_idx]:
             self.stop_fourwire_interface(interface_idx)
-            # Wait for thread to terminate (max 1 second)
-            if fourwire_thread[interface_idx] is not None:
-                fourwire_thread[interface_idx].join(timeout=1.0)
             if fourwire_input_device[interface_idx] is not None and fourwire_output_device[interface_idx] is not None:
                 self.start_fourwire_interface(interface_idx)
     
@@ -2714,9 +4186,6 @@ class ServerGUI(QMainWindow):
         # If 4-wire is currently enabled, restart with new config
         if fourwire_enabled[interface_idx]:
             self.stop_fourwire_interface(interface_idx)
-            # Wait for thread to terminate (max 1 second)
-            if fourwire_thread[interface_idx] is not None:
-                fourwire_thread[interface_idx].join(timeout=1.0)
             if fourwire_input_device[interface_idx] is not None and fourwire_output_device[interface_idx] is not None:
                 self.start_fourwire_interface(interface_idx)
     
@@ -2735,123 +4204,33 @@ class ServerGUI(QMainWindow):
             logging.warning(f"4-Wire {interface_idx + 1} devices not configured")
             return
         
-        if p is None:
+        pa = get_pyaudio()
+        if pa is None:
             logging.error(f"4-Wire {interface_idx + 1}: PyAudio not initialized")
             return
         
+        bridge = FourWireBridge(interface_idx)
         try:
-            # Start input stream
-            fourwire_stream_in[interface_idx] = p.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=RATE,
-                input=True,
-                input_device_index=fourwire_input_device[interface_idx],
-                frames_per_buffer=CHUNK
-            )
-            
-            # Start output stream
-            fourwire_stream_out[interface_idx] = p.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=RATE,
-                output=True,
-                output_device_index=fourwire_output_device[interface_idx],
-                frames_per_buffer=CHUNK
-            )
-            
-            fourwire_running[interface_idx] = True
-            fourwire_thread[interface_idx] = threading.Thread(target=lambda: self.fourwire_audio_loop(interface_idx), daemon=True)
-            fourwire_thread[interface_idx].start()
-            
+            # Callback-mode streams - the mixer tick pumps both directions, no thread of our own
+            bridge.start(pa)
+            fourwire_bridges[interface_idx] = bridge
             logging.info(f"✓ 4-Wire {interface_idx + 1} interface started")
         except Exception as e:
             logging.error(f"4-Wire {interface_idx + 1} start error: {e}")
-            self.stop_fourwire_interface(interface_idx)
+            bridge.close()
     
     def stop_fourwire_interface(self, interface_idx):
         """Stop 4-wire audio interface"""
-        fourwire_running[interface_idx] = False
-        
-        if fourwire_stream_in[interface_idx]:
-            try:
-                fourwire_stream_in[interface_idx].stop_stream()
-                fourwire_stream_in[interface_idx].close()
-            except:
-                pass
-            fourwire_stream_in[interface_idx] = None
-        
-        if fourwire_stream_out[interface_idx]:
-            try:
-                fourwire_stream_out[interface_idx].stop_stream()
-                fourwire_stream_out[interface_idx].close()
-            except:
-                pass
-            fourwire_stream_out[interface_idx] = None
-        
-        logging.info(f"✓ 4-Wire {interface_idx + 1} interface stopped")
-    
-    def fourwire_audio_loop(self, interface_idx):
-        """4-Wire audio processing thread - acts as virtual beltpack"""
-        FOURWIRE_USER_ID = -2 - interface_idx  # Unique user ID per interface (-2, -3)
-        
-        while fourwire_running[interface_idx]:
-            try:
-                # INPUT: Read from external system, inject into channel
-                if fourwire_stream_in[interface_idx]:
-                    try:
-                        audio_bytes = fourwire_stream_in[interface_idx].read(CHUNK, exception_on_overflow=False)
-                        audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32767.0
-                        
-                        # Apply input gain
-                        audio_np *= fourwire_input_gain[interface_idx]
-                        
-                        # Inject into channel buffer as if from a beltpack
-                        with audio_lock:
-                            channel_buffers[fourwire_channel[interface_idx]][FOURWIRE_USER_ID].append(audio_np)
-                            channel_talkers[fourwire_channel[interface_idx]].add(FOURWIRE_USER_ID)
-                    except Exception as e:
-                        logging.debug(f"4-Wire {interface_idx + 1} input error: {e}")
-                
-                # OUTPUT: Tap channel mix, send to external system
-                if fourwire_stream_out[interface_idx]:
-                    try:
-                        # Get mixed audio from this channel (for all talkers EXCEPT the 4-wire itself)
-                        mixed_audio = np.zeros(CHUNK, dtype=np.float32)
-                        active_sources = 0
-                        
-                        with audio_lock:
-                            if fourwire_channel[interface_idx] in channel_buffers:
-                                for uid, queue in channel_buffers[fourwire_channel[interface_idx]].items():
-                                    if uid != FOURWIRE_USER_ID and queue:  # Exclude 4-wire's own audio
-                                        try:
-                                            chunk = queue.popleft()
-                                            mixed_audio += chunk
-                                            active_sources += 1
-                                        except:
-                                            pass
-                        
-                        # Normalize if multiple sources
-                        if active_sources > 1:
-                            mixed_audio /= active_sources
-                        
-                        # Apply output gain and channel volume
-                        with config_lock:
-                            vol = channel_volumes.get(fourwire_channel[interface_idx], 0.8)
-                        
-                        mixed_audio *= (fourwire_output_gain[interface_idx] * vol)
-                        mixed_audio = np.clip(mixed_audio, -1, 1)
-                        
-                        # Convert to int16 and send
-                        pcm_data = (mixed_audio * 32767).astype(np.int16)
-                        fourwire_stream_out[interface_idx].write(pcm_data.tobytes())
-                    except Exception as e:
-                        logging.debug(f"4-Wire {interface_idx + 1} output error: {e}")
-                
-                # No sleep needed - PyAudio read() blocks for CHUNK duration
-            except Exception as e:
-                logging.error(f"4-Wire {interface_idx + 1} loop error: {e}")
-                time.sleep(0.02)  # Brief sleep on error
+        bridge = fourwire_bridges[interface_idx]
+        fourwire_bridges[interface_idx] = None
+        if bridge is None:
+            return
+        bridge.close()
+        stats = bridge.stats()
+        xruns = {d: s['device'] + s['underrun'] + s['overflow'] for d, s in stats.items()}
+        logging.info(f"✓ 4-Wire {interface_idx + 1} interface stopped "
+                     f"(drift in {stats['in']['drift_ppm']:+.1f} ppm, out {stats['out']['drift_ppm']:+.1f} ppm; "
+                     f"xruns in {xruns['in']}, out {xruns['out']})")
     
     def closeEvent(self, event):
         """Handle window close"""
@@ -2862,7 +4241,7 @@ class ServerGUI(QMainWindow):
                                      QMessageBox.StandardButton.Cancel)
         
         if reply == QMessageBox.StandardButton.Yes:
-            save_config()
+            save_config(wait=True)
             # Stop 4-wire interfaces
             for i in range(2):
                 if fourwire_enabled[i]:
@@ -2901,11 +4280,33 @@ async def node_cleanup_task():
             for ip in stale_nodes:
                 logging.info(f"Node timeout: {ip}")
                 del active_nodes[ip]
+        expire_sessions()
+
+
+def register_mdns_service():
+    """Advertise the server via mDNS (blocking - run off the event loop)"""
+    global zeroconf_instance, zeroconf_service
+    try:
+        zeroconf_instance = Zeroconf()
+        # Get local IP address
+        local_ip = socket.gethostbyname(socket.gethostname())
+        
+        service_info = ServiceInfo(
+            "_lancomm._tcp.local.",
+            "LanCommServer._lancomm._tcp.local.",
+            addresses=[socket.inet_aton(local_ip)],
+            port=TCP_PORT,
+            properties={'version': '1.0', 'type': 'server'},
+        )
+        zeroconf_instance.register_service(service_info)
+        zeroconf_service = service_info
+        logging.info(f"🌐 mDNS service registered: {local_ip}:{TCP_PORT}")
+    except Exception as e:
+        logging.warning(f"mDNS registration failed: {e}")
 
 
 async def async_main():
     """Main async entry point"""
-    global zeroconf_instance, zeroconf_service
     udp_sock = None
     try:
         udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -2921,33 +4322,22 @@ async def async_main():
         udp_sock.bind((HOST, UDP_PORT))
         udp_sock.setblocking(False)
         
-        # Start mDNS service broadcasting
-        try:
-            zeroconf_instance = Zeroconf()
-            # Get local IP address
-            local_ip = socket.gethostbyname(socket.gethostname())
-            
-            service_info = ServiceInfo(
-                "_lancomm._tcp.local.",
-                "LanCommServer._lancomm._tcp.local.",
-                addresses=[socket.inet_aton(local_ip)],
-                port=TCP_PORT,
-                properties={'version': '1.0', 'type': 'server'},
-            )
-            zeroconf_instance.register_service(service_info)
-            zeroconf_service = service_info
-            logging.info(f"🌐 mDNS service registered: {local_ip}:{TCP_PORT}")
-        except Exception as e:
-            logging.warning(f"mDNS registration failed: {e}")
-        
         logging.info(f"🚀 Server starting on TCP:{TCP_PORT}, UDP:{UDP_PORT}")
         
+        config_broadcaster.attach(asyncio.get_running_loop())
+        
         tasks = [
             asyncio.create_task(receive_udp(udp_sock)),
             asyncio.create_task(mix_and_send(udp_sock)),
             asyncio.create_task(tcp_server()),
-            asyncio.create_task(node_cleanup_task())
+            asyncio.create_task(node_cleanup_task()),
+            asyncio.create_task(metrics_server()),
+            asyncio.create_task(tally_publisher())
         ]
+        mark_startup('audio_engine_started')
+        
+        # mDNS announce blocks for several hundred ms - keep it off the audio loop
+        await asyncio.get_running_loop().run_in_executor(None, register_mdns_service)
         
         await asyncio.gather(*tasks, return_exceptions=True)
     except Exception as e:
@@ -2969,10 +4359,82 @@ async def async_main():
                 pass
 
 
+def run_startup_benchmark(timeout=10.0):
+    """Headless startup benchmark: report time-to-first-mixed-packet
+    
+    Starts the audio engine without the GUI, loops a synthetic talker and
+    listener through the real UDP path on localhost and prints the startup
+    timeline. Returns a process exit code (0 = mixed packet received).
+    """
+    load_config()
+    mark_startup('config_loaded')
+    threading.Thread(target=run_async, daemon=True).start()
+    
+    with config_lock:
+        enabled = [ch for ch in sorted(channel_enabled) if channel_enabled[ch]]
+    ch = enabled[0] if enabled else 0
+    talker_id, listener_id = 9998, 9999
+    
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(('127.0.0.1', 0))
+    probe.settimeout(0.005)
+    with audio_lock:
+        channel_talkers[ch].add(talker_id)
+        channel_listeners[ch].add(listener_id)
+    with client_lock:
+        user_udp_addrs[listener_id] = probe.getsockname()
+    
+    pcm = (np.sin(np.arange(CHUNK) * 2 * np.pi * 1000 / RATE) * 8000).astype(np.int16).tobytes()
+    seq = 0
+    received = False
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline and not received:
+        header = ch.to_bytes(4, 'big') + talker_id.to_bytes(4, 'big') + seq.to_bytes(4, 'big')
+        try:
+            probe.sendto(header + pcm, ('127.0.0.1', UDP_PORT))
+        except OSError:
+            pass  # Engine socket not bound yet
+        seq = (seq + 1) % 65536
+        try:
+            while True:
+                data, _ = probe.recvfrom(8192)
+                if int.from_bytes(data[0:4], 'big') == ch:
+                    mark_startup('first_mixed_packet')
+                    received = True
+                    break
+        except (socket.timeout, OSError):
+            pass
+    probe.close()
+    
+    print("Startup timeline (ms since launch):")
+    for phase, seconds in sorted(startup_marks.items(), key=lambda item: item[1]):
+        print(f"  {phase:<28}{seconds * 1000:10.1f}")
+    if not received:
+        print(f"  first_mixed_packet          not received within {timeout:.0f} s")
+    return 0 if received else 1
+
+
 # ===== MAIN ENTRY POINT =====
 
 if __name__ == "__main__":
+    if '--startup-benchmark' in sys.argv:
+        sys.exit(run_startup_benchmark())
+    
+    if '--headless' in sys.argv:
+        # Audio engine + metrics endpoint only, no GUI (config edits via JSON file)
+        load_config()
+        mark_startup('config_loaded')
+        run_async()
+        sys.exit(0)
+    
     try:
+        load_config()
+        mark_startup('config_loaded')
+        
+        # Start async server first - audio must not wait on GUI construction
+        threading.Thread(target=run_async, daemon=True).start()
+        start_audio_device_scan()
+        
         app = QApplication(sys.argv)
         
         # Apply professional theme
@@ -2981,9 +4443,7 @@ if __name__ == "__main__":
         # Create and show GUI
         window = ServerGUI()
         window.show()
-        
-        # Start async server
-        threading.Thread(target=run_async, daemon=True).start()
+        mark_startup('gui_shown')
         
         # Run Qt event loop
         sys.exit(app.exec())